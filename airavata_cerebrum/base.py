@@ -1,4 +1,5 @@
 import abc
+import asyncio
 import typing
 import traitlets
 
@@ -32,6 +33,62 @@ class DbQuery(abc.ABC):
     def trait_type(cls) -> type[traitlets.HasTraits]:
         return EmptyTraits
 
+    @classmethod
+    def item_wise(cls) -> bool:
+        # True if run yields exactly one output for each input item, in order
+        return False
+
+    @classmethod
+    def per_item(cls) -> bool:
+        # True if run yields at most one output for each input item, in order,
+        # computed from that item only (ex. items may be dropped)
+        return cls.item_wise()
+
+    @classmethod
+    def poolable(cls) -> bool:
+        # True if an instance can be shared by all the workflows that use
+        # the same init params : expensive to construct and run does not
+        # modify the instance.
+        return False
+
+    async def arun(
+        self,
+        in_iter: typing.Iterable | None,
+        semaphore: asyncio.Semaphore | None = None,
+        **params: typing.Any,
+    ) -> typing.Iterable | None:
+        # Async variant of run : by default, run (and the consumption of its
+        # output) is off-loaded to a worker thread as a single request.
+        # Queries issuing one request per item should override this with
+        # arun_items, so that the requests are in flight concurrently.
+        def run_list():
+            out_iter = self.run(in_iter, **params)
+            return list(out_iter) if out_iter is not None else None
+
+        if semaphore is None:
+            return await asyncio.to_thread(run_list)
+        async with semaphore:
+            return await asyncio.to_thread(run_list)
+
+
+async def arun_items(
+    item_fn: typing.Callable[[typing.Any], typing.Any],
+    in_iter: typing.Iterable,
+    semaphore: asyncio.Semaphore | None = None,
+) -> typing.List:
+    """
+    Apply the blocking function item_fn to each item in a worker thread;
+    at most semaphore's value of calls are in flight at a time. Outputs
+    are in the order of in_iter.
+    """
+    async def arun_item(in_item):
+        if semaphore is None:
+            return await asyncio.to_thread(item_fn, in_item)
+        async with semaphore:
+            return await asyncio.to_thread(item_fn, in_item)
+
+    return list(await asyncio.gather(*(arun_item(x) for x in in_iter)))
+
 
 # Abstract interface for XFormer operations
 class OpXFormer(abc.ABC):
@@ -47,3 +104,37 @@ class OpXFormer(abc.ABC):
     @abc.abstractmethod
     def trait_type(cls) -> type[traitlets.HasTraits]:
         return EmptyTraits
+
+    @classmethod
+    def item_wise(cls) -> bool:
+        # True if xform yields exactly one output for each input item, in order
+        return False
+
+    @classmethod
+    def per_item(cls) -> bool:
+        # True if xform yields at most one output for each input item, in order,
+        # computed from that item only (ex. items may be dropped)
+        return cls.item_wise()
+
+    @classmethod
+    def supports_batch(cls) -> bool:
+        # True if xform_batch is implemented without going through xform
+        return False
+
+    @classmethod
+    def pushdown_filters(
+        cls, **params: typing.Any
+    ) -> typing.List[typing.Tuple[typing.Tuple[str, ...], str, typing.Any]] | None:
+        # For filters that select input items without modifying them : the
+        # conditions as (path, bin_op, value) triples, which can be pushed
+        # down to a columnar store (see util.colstore). None otherwise.
+        return None
+
+    def xform_batch(
+        self,
+        in_batch: typing.List,
+        **params: typing.Any,
+    ) -> typing.List:
+        # Apply xform to a chunk of items and return the output chunk
+        out_iter = self.xform(in_batch, **params)
+        return list(out_iter) if out_iter else []
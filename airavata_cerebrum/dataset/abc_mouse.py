@@ -1007,6 +1007,10 @@ class ABCDbMERFISH_CCFQuery(base.DbQuery):
     def trait_type(cls) -> type[traitlets.HasTraits]:
         return cls.QryTraits
 
+    @classmethod
+    def poolable(cls) -> bool:
+        return True
+
 
 #
 # ------- Query and Xform Registers -----
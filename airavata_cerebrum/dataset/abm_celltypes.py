@@ -1,11 +1,12 @@
+import asyncio
 import json
 import os
+import pathlib
 import typing
 import logging
 import allensdk.core.cell_types_cache
 import allensdk.api.queries.cell_types_api
 import allensdk.api.queries.glif_api
-from numba.cuda.cudadrv.driver import pathlib
 import traitlets
 
 from .. import base
@@ -155,36 +156,62 @@ class CTDbGlifApiQuery(base.DbQuery):
         """
         if not in_iter:
             return None
+        first = self.init_args(params)
+        return iter(self.neuronal_models(x, first) for x in in_iter if x)
+
+    def init_args(self, params) -> bool:
         default_args = {"first": False, "key": None}
         rarg = {**default_args, **params} if params else default_args
         _log().debug("CTDbGlifApiQuery Args : %s", rarg)
         if rarg["key"]:
             self.key_fn = lambda x: x[rarg["key"]]
-        if bool(rarg["first"]) is False:
-            return iter(
-                {
-                    "ct": x,
-                    "glif": self.glif_api.get_neuronal_models(self.key_fn(x)),
-                }
-                for x in in_iter
-                if x
-            )
-        else:
-            return iter(
-                {
-                    "ct": x,
-                    "glif": next(
-                        iter(self.glif_api.get_neuronal_models(self.key_fn(x))), None
-                    ),
-                }
-                for x in in_iter
-                if x
-            )
+        return bool(rarg["first"])
+
+    def neuronal_models(self, x, first: bool) -> typing.Dict[str, typing.Any]:
+        if first is False:
+            return {
+                "ct": x,
+                "glif": self.glif_api.get_neuronal_models(self.key_fn(x)),
+            }
+        return {
+            "ct": x,
+            "glif": next(
+                iter(self.glif_api.get_neuronal_models(self.key_fn(x))), None
+            ),
+        }
+
+    async def arun(
+        self,
+        in_iter: typing.Iterable | None,
+        semaphore: asyncio.Semaphore | None = None,
+        **params,
+    ) -> typing.Iterable | None:
+        """
+        Async variant of run : the GlifApi requests of the specimens are
+        issued concurrently (limited by semaphore); order is preserved.
+        """
+        if not in_iter:
+            return None
+        first = self.init_args(params)
+        return await base.arun_items(
+            lambda x: self.neuronal_models(x, first),
+            [x for x in in_iter if x],
+            semaphore,
+        )
 
     @classmethod
     def trait_type(cls) -> type[traitlets.HasTraits]:
         return cls.QryTraits
 
+    @classmethod
+    def item_wise(cls) -> bool:
+        # Items without specimen ids are dropped : outputs are not 1:1
+        return False
+
+    @classmethod
+    def per_item(cls) -> bool:
+        return True
+
 
 class CTDbGlifApiModelConfigQry(base.DbQuery):
     class QryTraits(traitlets.HasTraits):
@@ -210,18 +237,43 @@ class CTDbGlifApiModelConfigQry(base.DbQuery):
     def run(self, in_iter: typing.Iterable | None, **params) -> typing.Iterable | None:
         if not in_iter:
             return None
+        self.init_args(params)
+        return iter(self.download_model_config(rcx) for rcx in in_iter if rcx)
+
+    def init_args(self, params) -> None:
         self.suffix = params["suffix"]
         self.output_dir = params["output_dir"]
-        _log().debug("CTDbGlifApiQuery Args : %s", params)
+        _log().debug("CTDbGlifApiModelConfigQry Args : %s", params)
         # Create Config
         if not os.path.exists(self.output_dir):
             os.makedirs(self.output_dir)
-        return iter(self.download_model_config(rcx) for rcx in in_iter if rcx)
+
+    async def arun(
+        self,
+        in_iter: typing.Iterable | None,
+        semaphore: asyncio.Semaphore | None = None,
+        **params,
+    ) -> typing.Iterable | None:
+        if not in_iter:
+            return None
+        self.init_args(params)
+        return await base.arun_items(
+            self.download_model_config, [rcx for rcx in in_iter if rcx], semaphore
+        )
 
     @classmethod
     def trait_type(cls) -> type[traitlets.HasTraits]:
         return cls.QryTraits
 
+    @classmethod
+    def item_wise(cls) -> bool:
+        # Empty records are dropped : outputs are not 1:1
+        return False
+
+    @classmethod
+    def per_item(cls) -> bool:
+        return True
+
 
 #
 # ------- Query and Xform Registers -----
@@ -158,6 +158,10 @@ class AISynPhysQuery(base.DbQuery):
     def trait_type(cls) -> type[traitlets.HasTraits]:
         return cls.QryTraits
 
+    @classmethod
+    def poolable(cls) -> bool:
+        return True
+
 
 #
 # ------- Query and Xform Registers -----
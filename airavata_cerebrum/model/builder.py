@@ -2,6 +2,7 @@ import typing
 import numpy as np
 from bmtk.builder import NetworkBuilder
 from . import structure
+from .columnar import NetworkColumns
 
 
 def generate_random_pos(N: int, params: typing.Dict) -> np.ndarray:
@@ -15,28 +16,54 @@ def generate_random_pos(N: int, params: typing.Dict) -> np.ndarray:
     return positions
 
 
-def add_network_nodes(net_model: structure.Network, out_file: str) -> NetworkBuilder:
-    net = NetworkBuilder(net_model.name)
+def node_populations(
+    net_model: structure.Network | NetworkColumns,
+) -> typing.Iterator[typing.Tuple[str, typing.Dict, str, int, str, typing.Dict]]:
+    # (location, location dims, population name, N, ei, population dims)
+    if isinstance(net_model, NetworkColumns):
+        region_keys = net_model.regions.values("key")
+        region_dims = net_model.regions.values("dims")
+        neuron_cols = [
+            net_model.neurons.values(col) for col in ("key", "N", "ei", "dims")
+        ]
+        for rx, nx in net_model.region_neurons():
+            yield (region_keys[rx], region_dims[rx]) + tuple(
+                ncol[nx] for ncol in neuron_cols
+            )
+        return
     for location, loc_region in net_model.locations.items():
         for pop_name, pop_neurons in loc_region.neurons.items():
-            N = pop_neurons.N
-            params = {"location": loc_region.dims,
-                      "population": pop_neurons.dims}
-            positions = generate_random_pos(N, params)
-            ei = pop_neurons.ei
-            node_props = {
-                "N": N,
-                "model_type": "point_process",
-                "ei": ei,
-                "location": location,
-                "pop_name": pop_name,
-                "population": net_model.name,
-                "x": positions[:, 0],
-                "y": positions[:, 1],
-                "z": positions[:, 2],
-                "tuning_angle": np.linspace(0.0, 360.0, N, endpoint=False),
-            }
-            net.add_nodes(**node_props)
+            yield (
+                location,
+                loc_region.dims,
+                pop_name,
+                pop_neurons.N,
+                pop_neurons.ei,
+                pop_neurons.dims,
+            )
+
+
+def add_network_nodes(
+    net_model: structure.Network | NetworkColumns, out_file: str
+) -> NetworkBuilder:
+    net = NetworkBuilder(net_model.name)
+    for location, loc_dims, pop_name, N, ei, pop_dims in node_populations(net_model):
+        params = {"location": loc_dims,
+                  "population": pop_dims}
+        positions = generate_random_pos(N, params)
+        node_props = {
+            "N": N,
+            "model_type": "point_process",
+            "ei": ei,
+            "location": location,
+            "pop_name": pop_name,
+            "population": net_model.name,
+            "x": positions[:, 0],
+            "y": positions[:, 1],
+            "z": positions[:, 2],
+            "tuning_angle": np.linspace(0.0, 360.0, N, endpoint=False),
+        }
+        net.add_nodes(**node_props)
     net.save(out_file)
     return net
 
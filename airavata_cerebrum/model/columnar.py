@@ -0,0 +1,432 @@
+import json
+import typing
+
+import numpy as np
+
+from . import structure
+
+#
+# Columnar view of structure.Network : one table per struct type (regions,
+# neurons, neuron models, connections, connection models and external
+# networks), with a NumPy array per field. Strings are interned in a
+# string table shared by all the tables and stored as int32 codes; dicts
+# (dims, property_map) are stored as codes of their JSON text. Rows of the
+# child tables refer to the parent row by its index; row order is the
+# order of the dicts in the tree, so conversions are lossless.
+#
+
+# Column kinds
+STR = "str"
+JSON = "json"
+INT = "int"
+FLOAT = "float"
+INDEX = "index"  # row index in the parent table; -1 for none
+
+KIND_DTYPES = {
+    STR: np.int32,
+    JSON: np.int32,
+    INT: np.int64,
+    FLOAT: np.float64,
+    INDEX: np.int32,
+}
+
+# Columns of the tables : key of the struct in the parent dict, index of
+# the parent, and the fields of the struct
+EXT_NETWORK_COLUMNS = {
+    "key": STR,
+    "name": STR,
+    "ncells": INT,
+}
+REGION_COLUMNS = {
+    "key": STR,
+    "network": INDEX,  # row in ext_networks; -1 for the main network
+    "name": STR,
+    "inh_fraction": FLOAT,
+    "region_fraction": FLOAT,
+    "ncells": INT,
+    "inh_ncells": INT,
+    "exc_ncells": INT,
+    "dims": JSON,
+}
+NEURON_COLUMNS = {
+    "key": STR,
+    "region": INDEX,
+    "name": STR,
+    "N": INT,
+    "fraction": FLOAT,
+    "ei": STR,
+    "dims": JSON,
+}
+NEURON_MODEL_COLUMNS = {
+    "key": STR,
+    "neuron": INDEX,
+    "name": STR,
+    "N": INT,
+    "id": STR,
+    "proportion": FLOAT,
+    "m_type": STR,
+    "template": STR,
+    "dynamics_params": STR,
+    "property_map": JSON,
+    "data_connect": JSON,
+}
+CONNECTION_COLUMNS = {
+    "key": STR,
+    "network": INDEX,
+    "name": STR,
+    "pre_region": STR,
+    "pre_neuron": STR,
+    "post_region": STR,
+    "post_neuron": STR,
+    "probability": FLOAT,
+    "property_map": JSON,
+}
+CONNECT_MODEL_COLUMNS = {
+    "key": STR,
+    "connection": INDEX,
+    "name": STR,
+    "target_model_id": STR,
+    "source_model_id": STR,
+    "weight_max": FLOAT,
+    "delay": FLOAT,
+    "dynamics_params": STR,
+    "property_map": JSON,
+}
+
+
+class StringTable:
+    def __init__(self):
+        self.strings: typing.List[str] = []
+        self.codes: typing.Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+    def intern(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.strings)
+            self.codes[value] = code
+            self.strings.append(value)
+        return code
+
+    def code(self, value: str) -> int:
+        # -1 if the string is not in the table
+        return self.codes.get(value, -1)
+
+
+class StructTable:
+    """
+    Table of structs : {column : np.ndarray}. Columns are returned as the
+    arrays themselves, so they can be updated in place (ex.
+    table["N"][mask] = 0); values assigned to a column are cast to its dtype.
+    """
+
+    def __init__(
+        self,
+        schema: typing.Dict[str, str],
+        strings: StringTable,
+        columns: typing.Dict[str, np.ndarray] | None = None,
+    ):
+        self.schema = schema
+        self.strings = strings
+        self.columns = columns if columns is not None else {
+            col: np.zeros(0, dtype=KIND_DTYPES[kind]) for col, kind in schema.items()
+        }
+
+    @classmethod
+    def from_rows(
+        cls,
+        schema: typing.Dict[str, str],
+        strings: StringTable,
+        rows: typing.List[typing.Dict[str, typing.Any]],
+    ) -> "StructTable":
+        columns = {}
+        for col, kind in schema.items():
+            match kind:
+                case "str":
+                    values = [strings.intern(row[col]) for row in rows]
+                case "json":
+                    values = [strings.intern(json.dumps(row[col])) for row in rows]
+                case _:
+                    values = [row[col] for row in rows]
+            columns[col] = np.array(values, dtype=KIND_DTYPES[kind])
+        return cls(schema, strings, columns)
+
+    def __len__(self) -> int:
+        return len(self.columns["key"])
+
+    def __getitem__(self, col: str) -> np.ndarray:
+        return self.columns[col]
+
+    def __setitem__(self, col: str, values: typing.Any) -> None:
+        self.columns[col][...] = values
+
+    def values(self, col: str) -> typing.List[typing.Any]:
+        # Column as a list of python values
+        match self.schema[col]:
+            case "str":
+                return [self.strings.strings[cx] for cx in self.columns[col].tolist()]
+            case "json":
+                # Parsed for each row, so that rows do not share the dicts
+                return [
+                    json.loads(self.strings.strings[cx])
+                    for cx in self.columns[col].tolist()
+                ]
+            case _:
+                return self.columns[col].tolist()
+
+    def records(self) -> typing.List[typing.Dict[str, typing.Any]]:
+        col_values = {col: self.values(col) for col in self.schema}
+        return [
+            dict(zip(col_values.keys(), row_values))
+            for row_values in zip(*col_values.values())
+        ]
+
+    def equals(self, col: str, value: typing.Any) -> np.ndarray:
+        """
+        Mask of the rows with the value in the column; strings and dicts
+        are compared by their codes.
+        """
+        match self.schema[col]:
+            case "str":
+                return self.columns[col] == self.strings.code(value)
+            case "json":
+                return self.columns[col] == self.strings.code(json.dumps(value))
+            case _:
+                return self.columns[col] == value
+
+
+class NetworkColumns:
+    """
+    Columnar view of a structure.Network; see from_network and to_network.
+
+    Attributes
+    ----------
+    strings : StringTable
+       Interned strings of all the tables
+    ext_networks, regions, neurons, neuron_models, connections,
+    connect_models : StructTable
+       Tables of the structs
+    """
+
+    def __init__(
+        self,
+        name: str = "",
+        ncells: int = 0,
+        dims: typing.Dict[str, typing.Any] | None = None,
+        strings: StringTable | None = None,
+    ):
+        self.name = name
+        self.ncells = ncells
+        self.dims = dims if dims is not None else {}
+        self.strings = strings if strings is not None else StringTable()
+        self.ext_networks = StructTable(EXT_NETWORK_COLUMNS, self.strings)
+        self.regions = StructTable(REGION_COLUMNS, self.strings)
+        self.neurons = StructTable(NEURON_COLUMNS, self.strings)
+        self.neuron_models = StructTable(NEURON_MODEL_COLUMNS, self.strings)
+        self.connections = StructTable(CONNECTION_COLUMNS, self.strings)
+        self.connect_models = StructTable(CONNECT_MODEL_COLUMNS, self.strings)
+
+    @classmethod
+    def from_network(cls, net_struct: structure.Network) -> "NetworkColumns":
+        table_rows = {
+            "ext_networks": [],
+            "regions": [],
+            "neurons": [],
+            "neuron_models": [],
+            "connections": [],
+            "connect_models": [],
+        }
+
+        def add_regions(net_index, locations):
+            for rkey, region in locations.items():
+                region_index = len(table_rows["regions"])
+                table_rows["regions"].append(
+                    {"key": rkey, "network": net_index}
+                    | {col: getattr(region, col) for col in REGION_COLUMNS
+                       if col not in ("key", "network")}
+                )
+                for nkey, neuron in region.neurons.items():
+                    neuron_index = len(table_rows["neurons"])
+                    table_rows["neurons"].append(
+                        {"key": nkey, "region": region_index}
+                        | {col: getattr(neuron, col) for col in NEURON_COLUMNS
+                           if col not in ("key", "region")}
+                    )
+                    for mkey, nmodel in neuron.neuron_models.items():
+                        table_rows["neuron_models"].append(
+                            {
+                                "key": mkey,
+                                "neuron": neuron_index,
+                                "data_connect": nmodel.data_connect.model_dump(),
+                            }
+                            | {col: getattr(nmodel, col) for col in NEURON_MODEL_COLUMNS
+                               if col not in ("key", "neuron", "data_connect")}
+                        )
+
+        def add_connections(net_index, connections):
+            for ckey, connect in connections.items():
+                conn_index = len(table_rows["connections"])
+                table_rows["connections"].append(
+                    {
+                        "key": ckey,
+                        "network": net_index,
+                        "name": connect.name,
+                        "pre_region": connect.pre[0],
+                        "pre_neuron": connect.pre[1],
+                        "post_region": connect.post[0],
+                        "post_neuron": connect.post[1],
+                        "probability": connect.probability,
+                        "property_map": connect.property_map,
+                    }
+                )
+                for mkey, cmodel in connect.connect_models.items():
+                    table_rows["connect_models"].append(
+                        {"key": mkey, "connection": conn_index}
+                        | {col: getattr(cmodel, col) for col in CONNECT_MODEL_COLUMNS
+                           if col not in ("key", "connection")}
+                    )
+
+        add_regions(-1, net_struct.locations)
+        add_connections(-1, net_struct.connections)
+        for ekey, ext_net in net_struct.ext_networks.items():
+            ext_index = len(table_rows["ext_networks"])
+            table_rows["ext_networks"].append(
+                {"key": ekey, "name": ext_net.name, "ncells": ext_net.ncells}
+            )
+            add_regions(ext_index, ext_net.locations)
+            add_connections(ext_index, ext_net.connections)
+        #
+        net_cols = cls(
+            name=net_struct.name,
+            ncells=net_struct.ncells,
+            dims=json.loads(json.dumps(net_struct.dims)),
+        )
+        for table_name, rows in table_rows.items():
+            table = getattr(net_cols, table_name)
+            setattr(
+                net_cols,
+                table_name,
+                StructTable.from_rows(table.schema, net_cols.strings, rows),
+            )
+        return net_cols
+
+    def to_network(self) -> structure.Network:
+        # Build the tree bottom-up; children are added in row order
+        def children(records, parent_col, nparents, build_fn):
+            child_maps = [{} for _ in range(nparents)]
+            for rcd in records:
+                child_maps[rcd[parent_col]][rcd["key"]] = build_fn(rcd)
+            return child_maps
+
+        def fields(rcd, schema, skip):
+            return {col: rcd[col] for col in schema if col not in skip}
+
+        neuron_models = children(
+            self.neuron_models.records(),
+            "neuron",
+            len(self.neurons),
+            lambda rcd: structure.NeuronModel(
+                data_connect=structure.DataLink(**rcd["data_connect"]),
+                **fields(rcd, NEURON_MODEL_COLUMNS, ("key", "neuron", "data_connect")),
+            ),
+        )
+        neuron_records = self.neurons.records()
+        for nx, rcd in enumerate(neuron_records):
+            rcd["neuron_models"] = neuron_models[nx]
+        neurons = children(
+            neuron_records,
+            "region",
+            len(self.regions),
+            lambda rcd: structure.Neuron(
+                neuron_models=rcd["neuron_models"],
+                **fields(rcd, NEURON_COLUMNS, ("key", "region")),
+            ),
+        )
+        region_records = self.regions.records()
+        for rx, rcd in enumerate(region_records):
+            rcd["neurons"] = neurons[rx]
+        connect_models = children(
+            self.connect_models.records(),
+            "connection",
+            len(self.connections),
+            lambda rcd: structure.ConnectionModel(
+                **fields(rcd, CONNECT_MODEL_COLUMNS, ("key", "connection")),
+            ),
+        )
+        connect_records = self.connections.records()
+        for cx, rcd in enumerate(connect_records):
+            rcd["connect_models"] = connect_models[cx]
+        # Regions and connections of the main network (-1) are in the last slot
+        nslots = len(self.ext_networks) + 1
+        locations = [{} for _ in range(nslots)]
+        for rcd in region_records:
+            locations[rcd["network"]][rcd["key"]] = structure.Region(
+                neurons=rcd["neurons"],
+                **fields(rcd, REGION_COLUMNS, ("key", "network")),
+            )
+        connections = [{} for _ in range(nslots)]
+        for rcd in connect_records:
+            connections[rcd["network"]][rcd["key"]] = structure.Connection(
+                name=rcd["name"],
+                pre=(rcd["pre_region"], rcd["pre_neuron"]),
+                post=(rcd["post_region"], rcd["post_neuron"]),
+                probability=rcd["probability"],
+                property_map=rcd["property_map"],
+                connect_models=rcd["connect_models"],
+            )
+        ext_networks = {
+            rcd["key"]: structure.ExtNetwork(
+                name=rcd["name"],
+                ncells=rcd["ncells"],
+                locations=locations[ex],
+                connections=connections[ex],
+            )
+            for ex, rcd in enumerate(self.ext_networks.records())
+        }
+        return structure.Network(
+            name=self.name,
+            ncells=self.ncells,
+            dims=json.loads(json.dumps(self.dims)),
+            locations=locations[-1],
+            connections=connections[-1],
+            ext_networks=ext_networks,
+        )
+
+    #
+    # Bulk updates
+    def populate_ncells(self, N: int) -> "NetworkColumns":
+        """
+        Vectorized structure.Network.populate_ncells : populate the cell
+        counts of the regions and neurons of the main network from the
+        fractions.
+        """
+        self.ncells = N
+        main_regions = self.regions["network"] == -1
+        ncells_region = (self.regions["region_fraction"] * N).astype(np.int64)
+        ncells_inh = (self.regions["inh_fraction"] * ncells_region).astype(np.int64)
+        ncells_exc = ncells_region - ncells_inh
+        self.regions["ncells"][main_regions] = ncells_region[main_regions]
+        self.regions["inh_ncells"][main_regions] = ncells_inh[main_regions]
+        self.regions["exc_ncells"][main_regions] = ncells_exc[main_regions]
+        neuron_region = self.neurons["region"]
+        ncells = np.where(
+            self.neurons.equals("ei", "i"),
+            ncells_inh[neuron_region],
+            ncells_exc[neuron_region],
+        )
+        ncells = (ncells * self.neurons["fraction"]).astype(np.int64)
+        # Counts are not updated when zero, as in Network.populate_ncells
+        update_mask = main_regions[neuron_region] & (ncells != 0)
+        self.neurons["N"][update_mask] = ncells[update_mask]
+        return self
+
+    def region_neurons(
+        self, network: int = -1
+    ) -> typing.Iterator[typing.Tuple[int, int]]:
+        # (region row, neuron row) of the neurons in the network
+        neuron_region = self.neurons["region"]
+        in_network = self.regions["network"][neuron_region] == network
+        for nx in np.flatnonzero(in_network).tolist():
+            yield int(neuron_region[nx]), nx
@@ -1,3 +1,4 @@
+import concurrent.futures
 import logging
 import pathlib
 import typing
@@ -6,9 +7,17 @@ import os
 import pydantic
 
 from ..util import io as cbmio
+from ..util import jindex
+from ..util import checksum
+from ..util import class_qual_name
+from ..util.cache import StepCache, digest
+from ..util.checkpoint import Checkpoint
+from ..util.colstore import ColumnarData, ColumnarStore
+from ..util.policy import CancelToken
+from ..util.trace import Tracer
 from ..util.desc_config import CfgKeys, ModelDescConfig
-from . import structure
-from .. import workflow
+from . import patch, structure
+from .. import workflow, planner
 
 
 def _log():
@@ -18,6 +27,25 @@ def _log():
 # File paths
 class DescPaths:
     DESCRIPTION_DIR = "description"
+    CHECKPOINT_DIR = "checkpoints"
+    PIPELINE_STATE = "pipeline_state.json"
+
+
+# Pipeline stages, in the order of execution
+class DescStages:
+    DOWNLOAD = "download_db_data"
+    POST_OPS = "db_post_ops"
+    MAP_SRC = "map_source_data"
+    NET_STRUCT = "build_net_struct"
+    CUSTOM_MOD = "apply_custom_mod"
+    BMTK = "build_bmtk"
+    #
+    ORDER = [DOWNLOAD, POST_OPS, MAP_SRC, NET_STRUCT, CUSTOM_MOD, BMTK]
+
+
+# Network outputs, written with a checksum so that they can be loaded without
+# validation if unchanged (checksum_load)
+CHECKSUM_OUTPUTS = [CfgKeys.NETWORK_MAPPED, CfgKeys.NETWORK_STRUCT]
 
 
 class ModelDescription(pydantic.BaseModel):
@@ -28,8 +56,33 @@ class ModelDescription(pydantic.BaseModel):
     network_builder: typing.Type
     custom_mod: str | pathlib.Path | None = None
     save_flag: bool = True
-    out_format: typing.Literal["json", "yaml", "yml"] = "json"
+    async_save: bool = True
+    stream_flag: bool = False
+    stream_window: int = 64
+    db_workers: int = 0
+    map_workers: int = 0
+    async_requests: int = 0
+    cache_dir: str | pathlib.Path | None = None
+    cache_size: int = 2**30
+    dedup_flag: bool = False
+    trace_flag: bool = False
+    checkpoint_flag: bool = False
+    columnar_flag: bool = False
+    index_flag: bool = False
+    checksum_load: bool = False
+    batch_size: int = 0
+    out_format: typing.Literal[
+        "json", "yaml", "yml", "msgpack", "msgpack.zst", "json.zst"
+    ] = "json"
     network_struct: structure.Network = structure.Network(name="empty")
+    _tracer: Tracer = pydantic.PrivateAttr(default_factory=Tracer)
+    _cancel_token: CancelToken = pydantic.PrivateAttr(default_factory=CancelToken)
+    _stage_outputs: typing.Dict[str, typing.Any] = pydantic.PrivateAttr(
+        default_factory=dict
+    )
+    _writer: cbmio.BackgroundWriter = pydantic.PrivateAttr(
+        default_factory=cbmio.BackgroundWriter
+    )
 
     def output_location(self, key: str) -> pathlib.Path:
         file_name = self.config.out_prefix(key)
@@ -38,88 +91,316 @@ class ModelDescription(pydantic.BaseModel):
             os.makedirs(out_path.parent)
         return out_path.with_suffix("." + self.out_format)
 
-    def download_db_data(self) -> typing.Dict[str, typing.Any]:
+    def columnar_store(self, key: str) -> ColumnarStore:
+        return ColumnarStore(
+            self.output_location(key).with_name(
+                self.config.out_prefix(key) + ".parquet"
+            )
+        )
+
+    def load_source_data(self, key: str) -> typing.Mapping[str, typing.Any] | None:
+        # Output of db_connect/post_ops : from the columnar store, if present
+        # and written along with the current output
+        if self.columnar_flag:
+            col_store = self.columnar_store(key)
+            if col_store.valid(self.output_location(key)):
+                return ColumnarData(col_store)
+            if col_store.exists():
+                _log().info("Skipping stale columnar store of [%s]", key)
+        return self.load_output(key)
+
+    def load_output(self, key: str) -> typing.Mapping[str, typing.Any] | None:
+        # With index_flag, indexed outputs are loaded lazily
+        if self.index_flag and self.out_format == "json":
+            return jindex.load_lazy(self.output_location(key))
+        return cbmio.load(self.output_location(key))
+
+    def save_output(self, out_data: typing.Dict[str, typing.Any], key: str) -> None:
+        if self.index_flag and self.out_format == "json":
+            jindex.dump_json_indexed(out_data, self.output_location(key), indent=4)
+        else:
+            cbmio.dump(out_data, self.output_location(key), indent=4)
+
+    #
+    # Hand-off of the stage outputs : the output of a stage is kept in memory
+    # and passed to the next stage, and saved in the background
+    def write_output(
+        self, out_data: typing.Dict[str, typing.Any], key: str, columnar: bool = False
+    ) -> None:
+        self.save_output(out_data, key)
+        if key in CHECKSUM_OUTPUTS:
+            checksum.write_checksum(
+                self.output_location(key), structure.schema_version()
+            )
+        if columnar and self.columnar_flag:
+            self.columnar_store(key).dump(
+                out_data, source_file=self.output_location(key)
+            )
+
+    def load_network(self, file_name: str | pathlib.Path) -> structure.Network:
+        """
+        Load a Network; with checksum_load, files written by the pipeline
+        that still match their checksum are loaded without validation.
+        Other files (ex. user-authored or edited) are fully validated. The
+        checksum detects stale or edited outputs; it is not a signature and
+        does not make files from untrusted sources safe to load.
+        """
+        net_data = cbmio.load(file_name)
+        if self.checksum_load and checksum.verify_checksum(
+            file_name, structure.schema_version()
+        ):
+            return structure.construct_struct(structure.Network, net_data)
+        return structure.Network.model_validate(net_data)
+
+    def persist_output(
+        self, out_data: typing.Dict[str, typing.Any], key: str, columnar: bool = False
+    ) -> None:
+        # With async_save, the write runs in the background; see wait_saved.
+        # out_data is written as is, so callers pass data they no longer
+        # modify (ex. the output of model_dump)
+        if not self.save_flag:
+            return
+        if self.async_save:
+            # Failures of the earlier writes are raised before this one
+            self._writer.check()
+            self._writer.submit(self.write_output, out_data, key, columnar)
+        else:
+            self.write_output(out_data, key, columnar)
+
+    def keep_output(
+        self, out_data: typing.Dict[str, typing.Any], key: str, columnar: bool = False
+    ) -> None:
+        self._stage_outputs[key] = out_data
+        self.persist_output(out_data, key, columnar)
+
+    def take_output(
+        self, key: str, columnar: bool = False
+    ) -> typing.Mapping[str, typing.Any] | None:
+        """
+        Input of a stage : the output kept in memory by the previous stage,
+        if it ran in this process, and the saved output otherwise. Kept
+        outputs are handed over only once, since stages may modify their
+        input in place; later calls load the saved output. Kept outputs
+        that are still being written are handed over as copies.
+        """
+        if key in self._stage_outputs:
+            out_data = self._stage_outputs.pop(key)
+            # Failed writes are raised before the next stage runs
+            self._writer.check()
+            if self._writer.pending():
+                return cbmio.copy_containers(out_data)
+            return out_data
+        self.wait_saved()
+        if columnar:
+            return self.load_source_data(key)
+        return self.load_output(key)
+
+    def wait_saved(self) -> None:
+        # Wait for the background writes; raises the error of a failed write
+        self._writer.wait()
+
+    def workflow_context(self) -> workflow.WorkflowContext:
+        step_cache = None
+        if self.cache_dir:
+            step_cache = StepCache(self.cache_dir, self.cache_size)
+        checkpoint = None
+        if self.checkpoint_flag:
+            checkpoint = Checkpoint(
+                pathlib.Path(
+                    self.config.model_dir,
+                    DescPaths.DESCRIPTION_DIR,
+                    DescPaths.CHECKPOINT_DIR,
+                )
+            )
+        return workflow.WorkflowContext(
+            step_cache=step_cache,
+            tracer=self._tracer if self.trace_flag else None,
+            checkpoint=checkpoint,
+            batch_size=self.batch_size,
+            cancel_token=self._cancel_token,
+        )
+
+    @property
+    def tracer(self) -> Tracer:
+        return self._tracer
+
+    @property
+    def cancel_token(self) -> CancelToken:
+        return self._cancel_token
+
+    def cancel(self) -> None:
+        """
+        Stop the running workflows at the next step, item or retry; reset
+        cancel_token before starting another run.
+        """
+        self._cancel_token.cancel()
+
+    def trace_summary(self) -> str:
+        return self._tracer.summary_table()
+
+    def export_trace(
+        self, file_name: str | pathlib.Path | None = None
+    ) -> pathlib.Path:
+        """
+        Export the step traces in Chrome trace-event JSON format
+        (viewable in chrome://tracing or Perfetto).
+        """
+        trace_path = pathlib.Path(
+            file_name
+            if file_name
+            else self.output_location("trace").with_name(
+                self.config.out_prefix("trace") + ".json"
+            )
+        )
+        self._tracer.export_chrome(trace_path)
+        return trace_path
+
+    def download_db_data(self) -> typing.Dict[str, typing.Any] | None:
         db_src_config = self.config.get_config(CfgKeys.SRC_DATA)
         _log().info("Start Query and Download Data")
-        db_connect_output = workflow.run_db_connect_workflows(db_src_config)
-        if self.save_flag:
-            cbmio.dump(
-                db_connect_output,
+        if self.stream_flag and self.save_flag:
+            # Outputs are written as they arrive and are not kept in memory
+            self._stage_outputs.pop(CfgKeys.DB_CONNECT, None)
+            self.wait_saved()
+            cbmio.dump_stream(
+                workflow.stream_db_connect_workflows(
+                    db_src_config, self.workflow_context()
+                ),
                 self.output_location(CfgKeys.DB_CONNECT),
                 indent=4,
+                window=self.stream_window,
+            )
+            _log().info("Completed Query and Download Data")
+            return None
+        if self.async_requests > 0:
+            # Queries of all the databases share the event loop
+            db_connect_output = workflow.run_async_db_connect_workflows(
+                db_src_config, self.async_requests, self.workflow_context()
+            )
+        elif self.db_workers > 0:
+            # One worker process per source database
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=min(self.db_workers, len(db_src_config))
+            ) as db_executor:
+                db_connect_output = workflow.run_db_connect_workflows(
+                    db_src_config, db_executor, self.workflow_context()
+                )
+        else:
+            db_connect_output = workflow.run_db_connect_workflows(
+                db_src_config, wf_ctx=self.workflow_context()
             )
+        self.keep_output(db_connect_output, CfgKeys.DB_CONNECT, columnar=True)
         _log().info("Completed Query and Download Data")
         return db_connect_output
 
     def db_post_ops(self):
         db_connect_key = CfgKeys.DB_CONNECT
         db_datasrc_key = CfgKeys.SRC_DATA
-        db_connect_data = cbmio.load(self.output_location(db_connect_key))
+        db_connect_data = self.take_output(db_connect_key, columnar=True)
         db_src_config = self.config.get_config(CfgKeys.SRC_DATA)
         db_post_op_data = None
+        if db_connect_data and self.stream_flag and self.save_flag:
+            self._stage_outputs.pop(db_datasrc_key, None)
+            self.wait_saved()
+            cbmio.dump_stream(
+                workflow.stream_ops_workflows(
+                    db_connect_data,
+                    db_src_config,
+                    CfgKeys.POST_OPS,
+                    self.workflow_context(),
+                ),
+                self.output_location(db_datasrc_key),
+                indent=4,
+                window=self.stream_window,
+            )
+            return None
         if db_connect_data:
             db_post_op_data = workflow.run_ops_workflows(
-                db_connect_data, db_src_config, CfgKeys.POST_OPS
+                db_connect_data,
+                db_src_config,
+                CfgKeys.POST_OPS,
+                self.workflow_context(),
             )
-        if self.save_flag and db_post_op_data:
-            cbmio.dump(db_post_op_data, self.output_location(db_datasrc_key), indent=4)
+        if db_post_op_data:
+            self.keep_output(db_post_op_data, db_datasrc_key, columnar=True)
         return db_post_op_data
 
     def map_source_data(self):
         db2model_map = self.config.get_config(CfgKeys.DB2MODEL_MAP)
         db_lox_map = db2model_map[CfgKeys.LOCATIONS]
         db_conn_map = db2model_map[CfgKeys.CONNECTIONS]
-        db_source_data = cbmio.load(self.output_location(CfgKeys.SRC_DATA))
+        db_source_data = self.take_output(CfgKeys.SRC_DATA, columnar=True)
         srcdata_map_output = None
-        if db_source_data:
+        if db_source_data and self.dedup_flag:
+            srcdata_map_output = planner.map_srcdata(
+                db_source_data, db2model_map, self.workflow_context()
+            )
+        elif db_source_data:
+            wf_ctx = self.workflow_context()
             db2location_output = workflow.map_srcdata_locations(
-                db_source_data, db_lox_map
+                db_source_data, db_lox_map, wf_ctx
             )
             db2connect_output = workflow.map_srcdata_connections(
-                db_source_data, db_conn_map
+                db_source_data, db_conn_map, wf_ctx
             )
             srcdata_map_output = {
                 "locations": db2location_output,
                 "connections": db2connect_output,
             }
-        if self.save_flag and srcdata_map_output:
-            cbmio.dump(
-                srcdata_map_output,
-                self.output_location(CfgKeys.DB2MODEL_MAP),
-                indent=4,
-            )
+        if srcdata_map_output:
+            self.keep_output(srcdata_map_output, CfgKeys.DB2MODEL_MAP)
         return srcdata_map_output
 
     def build_net_struct(self):
-        network_desc_output = cbmio.load(self.output_location(CfgKeys.DB2MODEL_MAP))
+        network_desc_output = self.take_output(CfgKeys.DB2MODEL_MAP)
         if not network_desc_output:
             return None
-        self.network_struct = structure.srcdata2network(
-            network_desc_output,
-            self.config.name,
-            self.region_mapper,
-            self.neuron_mapper,
-            self.connection_mapper,
+        if self.map_workers > 0:
+            # Regions and chunks of connections are mapped in worker processes
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.map_workers
+            ) as map_executor:
+                self.network_struct = structure.srcdata2network(
+                    network_desc_output,
+                    self.config.name,
+                    self.region_mapper,
+                    self.neuron_mapper,
+                    self.connection_mapper,
+                    executor=map_executor,
+                )
+        else:
+            self.network_struct = structure.srcdata2network(
+                network_desc_output,
+                self.config.name,
+                self.region_mapper,
+                self.neuron_mapper,
+                self.connection_mapper,
+            )
+        self.persist_output(
+            self.network_struct.model_dump(), CfgKeys.NETWORK_MAPPED
         )
         return self.network_struct
 
     def custom_mod_struct(self):
         if self.custom_mod:
-            return structure.Network.model_validate(cbmio.load(self.custom_mod))
+            return self.load_network(self.custom_mod)
         return None
 
     def apply_custom_mod(self):
         mod_struct = self.custom_mod_struct()
         if mod_struct:
-            # Update user preference
-            self.network_struct = self.network_struct.apply_mod(mod_struct)
+            # Update user preference : patch with the changes of the mod,
+            # which is validated before it is compared with the network
+            mod_changes = patch.apply_patch(
+                self.network_struct, patch.mod_patch(self.network_struct, mod_struct)
+            )
+            _log().info("Custom mod changed [%d] entities", len(mod_changes))
+            _log().debug("Custom mod changes : %s", mod_changes)
         # Estimate NCells from the fractions
         self.network_struct.populate_ncells(30000)
-        if self.save_flag and self.network_struct:
-            cbmio.dump(
-                self.network_struct.model_dump(),
-                self.output_location(CfgKeys.NETWORK_STRUCT),
-                indent=4,
+        if self.network_struct:
+            self.persist_output(
+                self.network_struct.model_dump(), CfgKeys.NETWORK_STRUCT
             )
         return self.network_struct
 
@@ -129,4 +410,146 @@ class ModelDescription(pydantic.BaseModel):
         bmtk_net = net_builder.build()
         bmtk_net.save(str(self.config.network_dir))
         net_builder.bkg_net.save(str(self.config.network_dir))
+        self.wait_saved()
         return net_builder
+
+    #
+    # Incremental execution of the pipeline
+    def stage_dependencies(self, stage: str) -> typing.Any:
+        """
+        Configuration sections that the output of the stage depends on,
+        excluding the upstream stages.
+        """
+        match stage:
+            case DescStages.DOWNLOAD:
+                return {
+                    db_name: db_cfg[CfgKeys.DB_CONNECT]
+                    for db_name, db_cfg in self.config.get_config(
+                        CfgKeys.SRC_DATA
+                    ).items()
+                }
+            case DescStages.POST_OPS:
+                return {
+                    db_name: db_cfg.get(CfgKeys.POST_OPS)
+                    for db_name, db_cfg in self.config.get_config(
+                        CfgKeys.SRC_DATA
+                    ).items()
+                }
+            case DescStages.MAP_SRC:
+                return self.config.get_config(CfgKeys.DB2MODEL_MAP)
+            case DescStages.NET_STRUCT:
+                return [
+                    class_qual_name(self.region_mapper),
+                    class_qual_name(self.neuron_mapper),
+                    class_qual_name(self.connection_mapper),
+                ]
+            case DescStages.CUSTOM_MOD:
+                return cbmio.load(self.custom_mod) if self.custom_mod else None
+            case DescStages.BMTK:
+                return class_qual_name(self.network_builder)
+        return None
+
+    def stage_fingerprints(self) -> typing.Dict[str, str]:
+        """
+        Fingerprint of each stage : digest of the stage's dependencies and
+        the fingerprint of the previous stage. A stage's fingerprint changes
+        iff its configuration or that of any upstream stage changes.
+        """
+        stage_fps = {}
+        prev_fp = ""
+        for stage in DescStages.ORDER:
+            prev_fp = digest([prev_fp, self.stage_dependencies(stage)])
+            stage_fps[stage] = prev_fp
+        return stage_fps
+
+    def stage_output_key(self, stage: str) -> str | None:
+        match stage:
+            case DescStages.DOWNLOAD:
+                return CfgKeys.DB_CONNECT
+            case DescStages.POST_OPS:
+                return CfgKeys.SRC_DATA
+            case DescStages.MAP_SRC:
+                return CfgKeys.DB2MODEL_MAP
+            case DescStages.NET_STRUCT:
+                return CfgKeys.NETWORK_MAPPED
+            case DescStages.CUSTOM_MOD:
+                return CfgKeys.NETWORK_STRUCT
+        return None
+
+    def stage_output_exists(self, stage: str) -> bool:
+        if stage == DescStages.BMTK:
+            net_dir = self.config.network_dir
+            return os.path.exists(net_dir) and len(os.listdir(net_dir)) > 0
+        out_key = self.stage_output_key(stage)
+        if out_key is None:
+            return False
+        return os.path.exists(self.output_location(out_key))
+
+    def restore_stage(self, stage: str) -> None:
+        # Load the in-memory result of a skipped stage
+        if stage not in (DescStages.NET_STRUCT, DescStages.CUSTOM_MOD):
+            return
+        out_key = self.stage_output_key(stage)
+        self.network_struct = self.load_network(self.output_location(out_key))
+
+    def pipeline_state_location(self) -> pathlib.Path:
+        return pathlib.Path(
+            self.output_location(CfgKeys.DB_CONNECT).parent, DescPaths.PIPELINE_STATE
+        )
+
+    def load_pipeline_state(self) -> typing.Dict[str, str]:
+        state_file = self.pipeline_state_location()
+        if not os.path.exists(state_file):
+            return {}
+        return cbmio.load_json(state_file)
+
+    def stage_state(self, stage: str, stage_fp: str) -> str:
+        # Stages that take the network struct also depend on its contents,
+        # which may differ from the upstream outputs (ex. edited outputs)
+        if stage in (DescStages.CUSTOM_MOD, DescStages.BMTK):
+            return digest([stage_fp, self.network_struct.fingerprint()])
+        return stage_fp
+
+    def run_pipeline(self, force: bool = False) -> typing.Dict[str, bool]:
+        """
+        Run the stages of the pipeline whose configuration, input network or
+        upstream stages changed since the last run, or whose outputs are
+        missing; once a stage runs, all the stages after it run. Requires
+        save_flag, since skipped stages are restored from their outputs;
+        with force set, all the stages are run.
+
+        Returns
+        -------
+        dict : {stage : bool}
+           True for the stages that were run
+        """
+        stage_fps = self.stage_fingerprints()
+        pipeline_state = {} if force else self.load_pipeline_state()
+        stage_runs: typing.Dict[str, bool] = {}
+        upstream_ran = not self.save_flag
+        prev_stage = None
+        for stage in DescStages.ORDER:
+            if prev_stage and not stage_runs[prev_stage]:
+                # Input of the stage, also needed for its state
+                self.restore_stage(prev_stage)
+            prev_stage = stage
+            stage_state = self.stage_state(stage, stage_fps[stage])
+            stage_runs[stage] = (
+                upstream_ran
+                or pipeline_state.get(stage) != stage_state
+                or not self.stage_output_exists(stage)
+            )
+            if not stage_runs[stage]:
+                _log().info("Skip up-to-date stage [%s]", stage)
+                continue
+            upstream_ran = True
+            _log().info("Run stage [%s]", stage)
+            getattr(self, stage)()
+            if self.save_flag:
+                # Record the stage once its output is saved
+                self.wait_saved()
+                pipeline_state[stage] = stage_state
+                cbmio.dump_json(
+                    pipeline_state, self.pipeline_state_location(), indent=4
+                )
+        return stage_runs
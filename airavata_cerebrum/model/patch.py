@@ -0,0 +1,251 @@
+import typing
+
+import pydantic
+
+from . import structure
+
+#
+# Structural patches of structure.Network.
+#
+# A patch is a list of PatchOp : the path of a value in the network (struct
+# fields and dict keys, ex. ('locations', 'VISp4', 'neurons', 'IT', 'N'))
+# and its new value, or its removal. Patches are computed from a
+# modification (mod_patch, with the semantics of Network.apply_mod) or as
+# the difference of two networks (diff), and contain only the values that
+# change. apply_patch validates only the values it sets.
+#
+
+
+class PatchOp(typing.NamedTuple):
+    path: typing.Tuple[str, ...]
+    value: typing.Any = None
+    remove: bool = False
+
+
+# Markers of the entities added or removed by a patch, in the change report
+ENTITY_ADDED = "<added>"
+ENTITY_REMOVED = "<removed>"
+
+# Fields that are dicts of structs, and the type of the structs
+STRUCT_FIELDS: typing.Dict[type, typing.Dict[str, type]] = {
+    struct_cls: {
+        field: child_cls
+        for field, (child_cls, is_dict) in nested_fields.items()
+        if is_dict
+    }
+    for struct_cls, nested_fields in structure.NESTED_FIELDS.items()
+}
+
+# Rules of apply_mod : how a field of the modification updates the struct
+ALWAYS = "always"  # replaces the value
+POSITIVE = "positive"  # replaces the value if > 0
+TRUTHY = "truthy"  # replaces the value if not empty
+PAIR = "pair"  # (x, y) replaces the value if x and y are not empty
+MERGE_KEYS = "merge_keys"  # keys are added, or replaced if not empty
+UPDATE_KEYS = "update_keys"  # keys are added or replaced if not empty
+STRUCTS = "structs"  # structs are added, or modified recursively
+
+MOD_RULES: typing.Dict[type, typing.Dict[str, str]] = {
+    structure.NeuronModel: {
+        "name": ALWAYS,
+        "m_type": ALWAYS,
+        "template": ALWAYS,
+        "dynamics_params": ALWAYS,
+        "property_map": MERGE_KEYS,
+    },
+    structure.Neuron: {
+        "fraction": POSITIVE,
+        "N": POSITIVE,
+        "dims": MERGE_KEYS,
+        "neuron_models": STRUCTS,
+    },
+    structure.Region: {
+        "inh_fraction": POSITIVE,
+        "region_fraction": POSITIVE,
+        "ncells": POSITIVE,
+        "inh_ncells": POSITIVE,
+        "exc_ncells": POSITIVE,
+        "dims": UPDATE_KEYS,
+        "neurons": STRUCTS,
+    },
+    structure.ConnectionModel: {
+        "target_model_id": TRUTHY,
+        "source_model_id": TRUTHY,
+        "delay": POSITIVE,
+        "weight_max": POSITIVE,
+        "property_map": MERGE_KEYS,
+    },
+    structure.Connection: {
+        "pre": PAIR,
+        "post": PAIR,
+        "probability": POSITIVE,
+        "property_map": MERGE_KEYS,
+        "connect_models": STRUCTS,
+    },
+    structure.ExtNetwork: {
+        "ncells": POSITIVE,
+        "locations": STRUCTS,
+        "connections": STRUCTS,
+    },
+    structure.Network: {
+        "dims": UPDATE_KEYS,
+        "locations": STRUCTS,
+        "connections": STRUCTS,
+        "ext_networks": STRUCTS,
+    },
+}
+
+_MISSING = object()
+
+
+def mod_patch(
+    net_struct: structure.StructBase,
+    mod_obj: structure.StructBase | typing.Dict[str, typing.Any],
+    path: typing.Tuple[str, ...] = (),
+) -> typing.List[PatchOp]:
+    """
+    Patch with the changes of net_struct.apply_mod(mod_obj). Only the
+    modification is traversed, and the values that it does not change are
+    left out of the patch.
+
+    Parameters
+    ----------
+    net_struct : StructBase
+       Struct to be modified (ex. Network)
+    mod_obj : StructBase | dict
+       Modification; can be the dict loaded from a custom mod file, which
+       is validated as a struct of the type of net_struct, so that its
+       values are compared as apply_mod compares them
+    """
+    if not isinstance(mod_obj, pydantic.BaseModel):
+        mod_obj = type(net_struct).model_validate(mod_obj)
+    patch_ops = []
+    struct_cls = type(net_struct)
+    for field, rule in MOD_RULES[struct_cls].items():
+        mod_value = getattr(mod_obj, field)
+        cur_value = getattr(net_struct, field)
+        fpath = path + (field,)
+        match rule:
+            case "always":
+                if mod_value != cur_value:
+                    patch_ops.append(PatchOp(fpath, mod_value))
+            case "positive":
+                if mod_value > 0 and mod_value != cur_value:
+                    patch_ops.append(PatchOp(fpath, mod_value))
+            case "truthy":
+                if mod_value and mod_value != cur_value:
+                    patch_ops.append(PatchOp(fpath, mod_value))
+            case "pair":
+                if mod_value[0] and mod_value[1] and mod_value != cur_value:
+                    patch_ops.append(PatchOp(fpath, mod_value))
+            case "merge_keys":
+                for mkey, mvalue in mod_value.items():
+                    if mkey in cur_value and (not mvalue or cur_value[mkey] == mvalue):
+                        continue
+                    patch_ops.append(PatchOp(fpath + (mkey,), mvalue))
+            case "update_keys":
+                for mkey, mvalue in mod_value.items():
+                    if mvalue and cur_value.get(mkey, _MISSING) != mvalue:
+                        patch_ops.append(PatchOp(fpath + (mkey,), mvalue))
+            case "structs":
+                for mkey, mchild in mod_value.items():
+                    if mkey not in cur_value:
+                        patch_ops.append(PatchOp(fpath + (mkey,), mchild))
+                    else:
+                        patch_ops.extend(
+                            mod_patch(cur_value[mkey], mchild, fpath + (mkey,))
+                        )
+    return patch_ops
+
+
+def diff(
+    old_struct: structure.StructBase,
+    new_struct: structure.StructBase,
+    path: typing.Tuple[str, ...] = (),
+) -> typing.List[PatchOp]:
+    """
+    Minimal patch that transforms old_struct into new_struct : structs and
+    dict keys are added or removed, and the other values are set if they
+    differ.
+    """
+    patch_ops = []
+    struct_fields = STRUCT_FIELDS.get(type(old_struct), {})
+    for field in type(old_struct).model_fields:
+        old_value = getattr(old_struct, field)
+        new_value = getattr(new_struct, field)
+        fpath = path + (field,)
+        if field in struct_fields:
+            for okey in old_value:
+                if okey not in new_value:
+                    patch_ops.append(PatchOp(fpath + (okey,), remove=True))
+            for nkey, nchild in new_value.items():
+                if nkey not in old_value:
+                    patch_ops.append(PatchOp(fpath + (nkey,), nchild))
+                else:
+                    patch_ops.extend(diff(old_value[nkey], nchild, fpath + (nkey,)))
+        elif isinstance(old_value, dict) and isinstance(new_value, dict):
+            for okey in old_value:
+                if okey not in new_value:
+                    patch_ops.append(PatchOp(fpath + (okey,), remove=True))
+            for nkey, nvalue in new_value.items():
+                if old_value.get(nkey, _MISSING) != nvalue:
+                    patch_ops.append(PatchOp(fpath + (nkey,), nvalue))
+        elif old_value != new_value:
+            patch_ops.append(PatchOp(fpath, new_value))
+    return patch_ops
+
+
+def apply_patch(
+    net_struct: structure.StructBase,
+    patch_ops: typing.Iterable[PatchOp],
+) -> typing.Dict[typing.Tuple[str, ...], typing.Set[str]]:
+    """
+    Apply the patch to net_struct in place. Field values are validated by
+    the field's validator and the structs added to the dicts by their type;
+    the rest of the network is not revalidated.
+
+    Returns
+    -------
+    dict : {entity path : set of changed fields}
+       Structs changed by the patch (the network is at path ()); added and
+       removed structs have the fields ENTITY_ADDED and ENTITY_REMOVED.
+    """
+    changes: typing.Dict[typing.Tuple[str, ...], typing.Set[str]] = {}
+    for pop in patch_ops:
+        # Walk down to the parent of the value : a struct or a dict, which is
+        # the value of field dict_field of the struct owner
+        parent = net_struct
+        owner, owner_path, dict_field = net_struct, (), ""
+        for sx, seg in enumerate(pop.path[:-1]):
+            if isinstance(parent, pydantic.BaseModel):
+                owner, owner_path, dict_field = parent, pop.path[:sx], seg
+                parent = getattr(parent, seg)
+            else:
+                parent = parent[seg]
+        last_seg = pop.path[-1]
+        if isinstance(parent, pydantic.BaseModel):
+            if pop.remove:
+                raise ValueError("Struct fields can not be removed : {}".format(pop.path))
+            type(parent).__pydantic_validator__.validate_assignment(
+                parent, last_seg, pop.value
+            )
+            # The validator sets the value without the struct's __setattr__
+            parent.reset_fingerprint()
+            changes.setdefault(pop.path[:-1], set()).add(last_seg)
+            continue
+        child_cls = STRUCT_FIELDS.get(type(owner), {}).get(dict_field)
+        if pop.remove:
+            parent.pop(last_seg, None)
+            if child_cls:
+                changes.setdefault(pop.path, set()).add(ENTITY_REMOVED)
+        else:
+            value = pop.value
+            if child_cls:
+                value = child_cls.model_validate(value)
+                changes.setdefault(pop.path, set()).add(ENTITY_ADDED)
+            parent[last_seg] = value
+        owner.reset_fingerprint()
+        changes.setdefault(owner_path, set()).add(dict_field)
+    if changes and isinstance(net_struct, structure.Network):
+        net_struct.reindex()
+    return changes
@@ -1,12 +1,25 @@
+import concurrent.futures
+import copy
+import functools
+import itertools
 import json
 import pydantic
 import traitlets
 import typing
+import weakref
 import abc
 
+from ..util.cache import digest
+
 
 class StructBase(pydantic.BaseModel, abc.ABC):
     name: str = ""
+    # Fingerprint, and the structs whose fingerprint was computed from it
+    # ({id : weak reference}), which are reset with it
+    _fingerprint: str | None = pydantic.PrivateAttr(default=None)
+    _parents: typing.Dict[int, weakref.ref] | None = pydantic.PrivateAttr(
+        default=None
+    )
 
     class StructBaseTrait(traitlets.HasTraits):
         name = traitlets.Unicode()
@@ -23,6 +36,98 @@ class StructBase(pydantic.BaseModel, abc.ABC):
     def trait_ui(cls) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
         return {}
 
+    def fingerprint(self) -> str:
+        """
+        Content digest of the struct, independent of the order of its dicts.
+        Computed bottom-up : the digest of the field values, with the nested
+        structs replaced by their fingerprints. The fingerprint is kept
+        until the struct is modified, when it is reset along with those of
+        the structs containing it; re-hashing after an edit only hashes the
+        structs on the path to the edit.
+
+        Field assignments, apply_mod and patch.apply_patch reset the
+        fingerprint; other in-place edits of the dicts of a struct require
+        reset_fingerprint().
+        """
+        # Private attributes are accessed directly : pydantic's __getattr__
+        # is the bulk of the cost for large networks
+        fp_private = self.__pydantic_private__
+        if fp_private["_fingerprint"] is None:
+            parent_ref = weakref.ref(self)
+            fp_values = self.__dict__.copy()
+            for field, _, is_dict in construct_plan(type(self))[0]:
+                fvalue = fp_values[field]
+                fp_values[field] = (
+                    {
+                        skey: sobj._child_fingerprint(parent_ref)
+                        for skey, sobj in fvalue.items()
+                    }
+                    if is_dict
+                    else fvalue._child_fingerprint(parent_ref)
+                )
+            fp_private["_fingerprint"] = digest([type(self).__name__, fp_values])
+        return fp_private["_fingerprint"]
+
+    def _child_fingerprint(self, parent_ref: weakref.ref) -> str:
+        fp_private = self.__pydantic_private__
+        if fp_private["_parents"] is None:
+            fp_private["_parents"] = {}
+        fp_private["_parents"][id(parent_ref())] = parent_ref
+        return self.fingerprint()
+
+    def reset_fingerprint(self) -> None:
+        fp_private = self.__pydantic_private__
+        if fp_private["_fingerprint"] is None:
+            # Structs containing it have been reset or not computed
+            return
+        parent_refs = fp_private["_parents"] or {}
+        fp_private["_fingerprint"] = None
+        fp_private["_parents"] = None
+        for parent_ref in parent_refs.values():
+            parent = parent_ref()
+            if parent is not None:
+                parent.reset_fingerprint()
+
+    def __setattr__(self, name: str, value: typing.Any) -> None:
+        super().__setattr__(name, value)
+        if name in type(self).model_fields:
+            self.reset_fingerprint()
+
+    def __eq__(self, other: typing.Any) -> bool:
+        # Field values only : private attributes are caches
+        if not isinstance(other, pydantic.BaseModel):
+            return NotImplemented
+        return type(self) is type(other) and self.__dict__ == other.__dict__
+
+    def private_defaults(self) -> typing.Dict[str, typing.Any]:
+        return {
+            pname: pattr.get_default()
+            for pname, pattr in self.__private_attributes__.items()
+        }
+
+    # Private attributes are caches (fingerprint, index), which are rebuilt
+    # on use and are not copied or pickled
+    def __copy__(self) -> "StructBase":
+        struct_copy = super().__copy__()
+        object.__setattr__(
+            struct_copy, "__pydantic_private__", self.private_defaults()
+        )
+        return struct_copy
+
+    def __deepcopy__(
+        self, memo: typing.Dict[int, typing.Any] | None = None
+    ) -> "StructBase":
+        struct_copy = self.__copy__()
+        object.__setattr__(
+            struct_copy, "__dict__", copy.deepcopy(self.__dict__, memo)
+        )
+        return struct_copy
+
+    def __getstate__(self) -> typing.Dict[str, typing.Any]:
+        struct_state = super().__getstate__()
+        struct_state["__pydantic_private__"] = self.private_defaults()
+        return struct_state
+
 
 class DataLink(StructBase):
     property_map: typing.Dict = {}
@@ -145,6 +250,7 @@ class NeuronModel(StructBase):
                 self.property_map[pkey] = pvalue
             elif pvalue:
                 self.property_map[pkey] = pvalue
+        self.reset_fingerprint()
         return self
 
     @classmethod
@@ -207,6 +313,7 @@ class Neuron(StructBase):
                 self.neuron_models[mx_name] = neuron_mx
             else:
                 self.neuron_models[mx_name].apply_mod(neuron_mx)
+        self.reset_fingerprint()
         return self
 
     def exclude_set(self) -> typing.Set[str]:
@@ -283,6 +390,7 @@ class Region(StructBase):
                 self.neurons[nx_name] = nx_obj
             else:
                 self.neurons[nx_name].apply_mod(nx_obj)
+        self.reset_fingerprint()
         return self
 
     def find_neuron(self, neuron_name) -> Neuron | None:
@@ -351,6 +459,7 @@ class ConnectionModel(StructBase):
                 self.property_map[pkey] = pvalue
             elif pvalue:
                 self.property_map[pkey] = pvalue
+        self.reset_fingerprint()
         return self
 
 
@@ -418,6 +527,7 @@ class Connection(StructBase):
                 self.connect_models[mx_name] = mx_obj
             else:
                 self.connect_models[mx_name].apply_mod(mx_obj)
+        self.reset_fingerprint()
         return self
 
 
@@ -458,15 +568,54 @@ class ExtNetwork(StructBase):
                 self.connections[c_name] = o_cnx
                 continue
             self.connections[c_name].apply_mod(o_cnx)
+        self.reset_fingerprint()
         return self
 
 
+class NetworkIndex:
+    """
+    Secondary indexes of the regions and connections of a network (not
+    including its external networks). Entries list the structs in the
+    order of the network's dicts.
+    """
+
+    def __init__(
+        self,
+        locations: typing.Dict[str, Region],
+        connections: typing.Dict[str, Connection],
+    ):
+        # Neurons by their key in the regions, neuron models by id
+        self.neurons: typing.Dict[str, typing.List[Neuron]] = {}
+        self.neuron_models: typing.Dict[str, typing.List[NeuronModel]] = {}
+        for region in locations.values():
+            for nx_name, neuron in region.neurons.items():
+                self.neurons.setdefault(nx_name, []).append(neuron)
+                for nx_model in neuron.neuron_models.values():
+                    self.neuron_models.setdefault(nx_model.id, []).append(nx_model)
+        # Connections by (pre, post), connection models by target model id
+        self.connections: typing.Dict[
+            typing.Tuple[typing.Tuple[str, str], typing.Tuple[str, str]],
+            typing.List[Connection],
+        ] = {}
+        self.connect_models: typing.Dict[str, typing.List[ConnectionModel]] = {}
+        for connect in connections.values():
+            self.connections.setdefault(
+                (tuple(connect.pre), tuple(connect.post)), []
+            ).append(connect)
+            for cx_model in connect.connect_models.values():
+                self.connect_models.setdefault(
+                    cx_model.target_model_id, []
+                ).append(cx_model)
+
+
 class Network(StructBase):
     ncells: int = 0
     locations: typing.Dict[str, Region] = {}
     connections: typing.Dict[str, Connection] = {}
     dims: typing.Dict[str, typing.Any] = {}
     ext_networks: typing.Dict[str, ExtNetwork] = {}
+    # Built on first lookup; reset when the network is modified
+    _index: NetworkIndex | None = pydantic.PrivateAttr(default=None)
 
     class DataTrait(StructBase.StructBaseTrait):
         ncells = traitlets.Int(0)
@@ -517,6 +666,8 @@ class Network(StructBase):
                 self.ext_networks[e_name] = e_net
                 continue
             self.ext_networks[e_name].apply_mod(e_net)
+        self.reset_fingerprint()
+        self.reindex()
         return self
 
     def populate_ncells(self, N: int) -> "Network":
@@ -540,12 +691,126 @@ class Network(StructBase):
                 self.locations[lx].neurons[nx].N = ncells
         return self
 
+    #
+    # Lookups with the indexes
+    def index(self) -> NetworkIndex:
+        if self._index is None:
+            self._index = NetworkIndex(self.locations, self.connections)
+        return self._index
+
+    def reindex(self) -> None:
+        """
+        Reset the indexes; required after adding, removing or renaming the
+        regions, neurons, models or connections other than by apply_mod.
+        """
+        self._index = None
+
     def find_neuron(self, neuron_name) -> Neuron | None:
-        for lx, lrx in self.locations.items():
-            neuron_obj = lrx.find_neuron(neuron_name)
-            if neuron_obj:
-                return neuron_obj
-        return None
+        neuron_list = self.index().neurons.get(neuron_name)
+        return neuron_list[0] if neuron_list else None
+
+    def find_neuron_model(self, model_id: str) -> NeuronModel | None:
+        model_list = self.index().neuron_models.get(model_id)
+        return model_list[0] if model_list else None
+
+    def find_connections(
+        self,
+        pre: typing.Tuple[str, str],
+        post: typing.Tuple[str, str],
+    ) -> typing.List[Connection]:
+        return self.index().connections.get((tuple(pre), tuple(post)), [])
+
+    def find_connect_models(self, target_model_id: str) -> typing.List[ConnectionModel]:
+        return self.index().connect_models.get(target_model_id, [])
+
+
+#
+# Construction without validation, for trusted data (ex. outputs written
+# by the pipeline that match their checksum; see util.checksum)
+#
+# Fields with struct values : {struct type : {field : (type, dict of structs)}}
+NESTED_FIELDS: typing.Dict[type, typing.Dict[str, typing.Tuple[type, bool]]] = {
+    Network: {
+        "locations": (Region, True),
+        "connections": (Connection, True),
+        "ext_networks": (ExtNetwork, True),
+    },
+    ExtNetwork: {
+        "locations": (Region, True),
+        "connections": (Connection, True),
+    },
+    Region: {"neurons": (Neuron, True)},
+    Neuron: {"neuron_models": (NeuronModel, True)},
+    NeuronModel: {"data_connect": (DataLink, False)},
+    Connection: {"connect_models": (ConnectionModel, True)},
+}
+# Tuple fields, which are lists in the JSON data
+TUPLE_FIELDS: typing.Dict[type, typing.Tuple[str, ...]] = {
+    Connection: ("pre", "post"),
+}
+
+
+@functools.cache
+def construct_plan(
+    struct_cls: type[StructBase],
+) -> typing.Tuple[typing.List[typing.Tuple[str, type, bool]], typing.Tuple[str, ...], typing.FrozenSet[str]]:
+    return (
+        [
+            (field, child_cls, is_dict)
+            for field, (child_cls, is_dict) in NESTED_FIELDS.get(struct_cls, {}).items()
+        ],
+        TUPLE_FIELDS.get(struct_cls, ()),
+        frozenset(struct_cls.model_fields),
+    )
+
+
+def construct_struct(
+    struct_cls: type[StructBase], struct_data: typing.Dict[str, typing.Any]
+) -> StructBase:
+    """
+    Build the struct and its nested structs from struct_data, which must be
+    a model_dump of a valid struct; the data is not validated, and its dicts
+    are used by the structs (not copied).
+
+    Instances are set up as by model_construct, which is not used since it
+    processes the defaults of each field; data missing some of the fields
+    is passed to model_construct to fill in the defaults.
+    """
+    nested_fields, tuple_fields, field_names = construct_plan(struct_cls)
+    for field, child_cls, is_dict in nested_fields:
+        if field not in struct_data:
+            continue
+        if is_dict:
+            struct_data[field] = {
+                ckey: construct_struct(child_cls, cdata)
+                for ckey, cdata in struct_data[field].items()
+            }
+        else:
+            struct_data[field] = construct_struct(child_cls, struct_data[field])
+    for field in tuple_fields:
+        if field in struct_data:
+            struct_data[field] = tuple(struct_data[field])
+    if struct_data.keys() != field_names:
+        return struct_cls.model_construct(**struct_data)
+    struct_obj = struct_cls.__new__(struct_cls)
+    object.__setattr__(struct_obj, "__dict__", struct_data)
+    object.__setattr__(struct_obj, "__pydantic_fields_set__", set(field_names))
+    object.__setattr__(struct_obj, "__pydantic_extra__", None)
+    object.__setattr__(
+        struct_obj,
+        "__pydantic_private__",
+        {
+            pname: pattr.get_default()
+            for pname, pattr in struct_cls.__private_attributes__.items()
+        } or None,
+    )
+    return struct_obj
+
+
+@functools.cache
+def schema_version() -> str:
+    # Changes with the fields of any of the structs in a Network
+    return digest(Network.model_json_schema())
 
 
 #
@@ -587,28 +852,99 @@ class ConnectionMapper(abc.ABC):
 
 #
 #
+def map_region(
+    region: str,
+    region_desc: typing.Dict,
+    desc2region_mapper: type[RegionMapper],
+    desc2neuron_mapper: type[NeuronMapper],
+) -> Region | None:
+    drx_mapper = desc2region_mapper(region, region_desc)
+    neuron_struct = {}
+    for neuron in drx_mapper.neuron_names():
+        if neuron not in region_desc:
+            continue
+        neuron_desc = region_desc[neuron]
+        dn_mapper = desc2neuron_mapper(neuron, neuron_desc)
+        neuron_struct[neuron] = dn_mapper.map()
+    return drx_mapper.map(neuron_struct)
+
+
+def map_connections(
+    connect_items: typing.List[typing.Tuple[str, typing.Dict]],
+    desc2connection_mapper: type[ConnectionMapper],
+) -> typing.List[Connection | None]:
+    return [
+        desc2connection_mapper(cname, connect_desc).map()
+        for cname, connect_desc in connect_items
+    ]
+
+
 def srcdata2network(
     network_desc: typing.Dict,
     model_name: str,
     desc2region_mapper: type[RegionMapper],
     desc2neuron_mapper: type[NeuronMapper],
     desc2connection_mapper: type[ConnectionMapper],
+    executor: concurrent.futures.Executor | None = None,
+    chunk_size: int = 64,
 ) -> Network:
-    loc_struct = {}
-    for region, region_desc in network_desc["locations"].items():
-        drx_mapper = desc2region_mapper(region, region_desc)
-        neuron_struct = {}
-        for neuron in drx_mapper.neuron_names():
-            if neuron not in region_desc:
-                continue
-            neuron_desc = region_desc[neuron]
-            dn_mapper = desc2neuron_mapper(neuron, neuron_desc)
-            neuron_struct[neuron] = dn_mapper.map()
-        loc_struct[region] = drx_mapper.map(neuron_struct)
-    conn_struct = {}
-    for cname, connect_desc in network_desc["connections"].items():
-        crx_mapper = desc2connection_mapper(cname, connect_desc)
-        conn_struct[cname] = crx_mapper.map()
+    """
+    Map the data2model output to a Network.
+
+    Parameters
+    ----------
+    executor : concurrent.futures.Executor (optional)
+       If given, the regions (with their neurons) and chunks of chunk_size
+       connections are mapped concurrently in the executor; the mapper
+       types and descriptions must be picklable for process pools. The
+       network is assembled in the order of the descriptions, as in the
+       sequential mapping.
+    """
+    if executor is None:
+        loc_struct = {
+            region: map_region(
+                region, region_desc, desc2region_mapper, desc2neuron_mapper
+            )
+            for region, region_desc in network_desc["locations"].items()
+        }
+        connect_items = list(network_desc["connections"].items())
+        conn_struct = dict(
+            zip(
+                (cname for cname, _ in connect_items),
+                map_connections(connect_items, desc2connection_mapper),
+            )
+        )
+    else:
+        region_futures = {
+            region: executor.submit(
+                map_region,
+                region,
+                region_desc,
+                desc2region_mapper,
+                desc2neuron_mapper,
+            )
+            for region, region_desc in network_desc["locations"].items()
+        }
+        connect_items = list(network_desc["connections"].items())
+        connect_futures = [
+            executor.submit(
+                map_connections,
+                connect_items[cx : cx + chunk_size],
+                desc2connection_mapper,
+            )
+            for cx in range(0, len(connect_items), chunk_size)
+        ]
+        loc_struct = {
+            region: rfuture.result() for region, rfuture in region_futures.items()
+        }
+        conn_struct = dict(
+            zip(
+                (cname for cname, _ in connect_items),
+                itertools.chain.from_iterable(
+                    cfuture.result() for cfuture in connect_futures
+                ),
+            )
+        )
     return Network(
         name=model_name,
         locations=loc_struct,
@@ -616,33 +952,237 @@ def srcdata2network(
     )
 
 
-def subset_network(net_stats: Network, region_list: typing.List[str]) -> Network:
-    sub_locs = {k: v for k, v in net_stats.locations.items() if k in region_list}
-    return Network(name=net_stats.name, dims=net_stats.dims, locations=sub_locs)
+#
+# Network operations with structural sharing : the result references the
+# structs of its inputs that it does not change, and only the structs on
+# the path to a change are copied (shallow). Since the structs are shared,
+# modifying the result in place (ex. apply_mod) also modifies the inputs;
+# use model_copy(deep=True) on the result before modifying it.
+#
+# Connection end points (pre, post) refer to the neurons of the regions
+# by the key repr(tuple(end point)), ex. ('4', 'Rorb') -> "('4', 'Rorb')".
+#
+def shared_copy(
+    struct_obj: StructBase, updates: typing.Dict[str, typing.Any]
+) -> StructBase:
+    if not updates:
+        return struct_obj
+    # Copies do not keep the caches (fingerprint, index) of struct_obj
+    return struct_obj.model_copy(update=updates)
 
 
-def map_node_paramas(model_struct, node_map):
-    pass
+def endpoint_key(end_point: typing.Tuple[str, str]) -> str:
+    return repr(tuple(end_point))
 
 
-def filter_node_params(model_struct, filter_predicate):
-    pass
+def neuron_keys(locations: typing.Dict[str, Region]) -> typing.Set[str]:
+    return set(
+        itertools.chain.from_iterable(
+            region.neurons.keys() for region in locations.values()
+        )
+    )
 
 
-def map_edge_paramas(model_struct, node_map):
-    pass
+def merge_structs(
+    struct_dict1: typing.Dict[str, StructBase],
+    struct_dict2: typing.Dict[str, StructBase],
+) -> typing.Dict[str, StructBase]:
+    # Structs of both the dicts; structs with the same key are merged
+    if not struct_dict2 or struct_dict1 is struct_dict2:
+        return struct_dict1
+    if not struct_dict1:
+        return struct_dict2
+    merged_dict = dict(struct_dict1)
+    for skey, struct2 in struct_dict2.items():
+        struct1 = struct_dict1.get(skey)
+        merged_dict[skey] = (
+            struct2 if struct1 is None else merge_struct(struct1, struct2)
+        )
+    return merged_dict
+
+
+def merge_struct(struct1: StructBase, struct2: StructBase) -> StructBase:
+    """
+    Merge of struct2 into struct1 : values of struct1 take precedence, and
+    the dicts of struct1 get the keys of struct2 that they do not have;
+    dicts of structs are merged recursively.
+    """
+    if struct1 is struct2:
+        return struct1
+    nested_fields = NESTED_FIELDS.get(type(struct1), {})
+    updates = {}
+    for field in type(struct1).model_fields:
+        value1 = getattr(struct1, field)
+        value2 = getattr(struct2, field)
+        if field in nested_fields and nested_fields[field][1]:
+            merged = merge_structs(value1, value2)
+        elif isinstance(value1, dict) and isinstance(value2, dict):
+            merged = value1 if value2.keys() <= value1.keys() else value2 | value1
+        else:
+            continue
+        if merged is not value1:
+            updates[field] = merged
+    return shared_copy(struct1, updates)
 
 
-def filter_edge_params(model_struct, filter_predicate):
-    pass
+def subset_network(net_stats: Network, region_list: typing.List[str]) -> Network:
+    """
+    Sub-network of the regions in region_list, with the connections between
+    the neurons of these regions. Regions and connections are shared with
+    net_stats.
+    """
+    sub_locs = {k: v for k, v in net_stats.locations.items() if k in region_list}
+    sub_neurons = neuron_keys(sub_locs)
+    sub_connects = {
+        cname: connect
+        for cname, connect in net_stats.connections.items()
+        if endpoint_key(connect.pre) in sub_neurons
+        and endpoint_key(connect.post) in sub_neurons
+    }
+    return Network(
+        name=net_stats.name,
+        dims=net_stats.dims,
+        locations=sub_locs,
+        connections=sub_connects,
+    )
 
 
-def union_network(model_struct1, model_struct2):
-    pass
+def map_node_paramas(
+    model_struct: Network,
+    node_map: typing.Callable[[str, str, Neuron], Neuron],
+) -> Network:
+    """
+    Network with each neuron replaced by node_map(region name, neuron name,
+    neuron). Neurons returned unchanged (the same object), and regions with
+    only unchanged neurons, are shared with model_struct.
+    """
+    new_locs = {}
+    for rname, region in model_struct.locations.items():
+        new_neurons = {
+            nname: node_map(rname, nname, neuron)
+            for nname, neuron in region.neurons.items()
+        }
+        if all(new_neurons[nname] is neuron for nname, neuron in region.neurons.items()):
+            new_locs[rname] = region
+        else:
+            new_locs[rname] = shared_copy(region, {"neurons": new_neurons})
+    if all(new_locs[rname] is region for rname, region in model_struct.locations.items()):
+        return model_struct
+    return shared_copy(model_struct, {"locations": new_locs})
+
+
+def filter_node_params(
+    model_struct: Network,
+    filter_predicate: typing.Callable[[str, str, Neuron], bool],
+) -> Network:
+    """
+    Network with the neurons for which filter_predicate(region name, neuron
+    name, neuron) is true, and without the connections to or from the
+    removed neurons. Regions with all their neurons are shared with
+    model_struct.
+    """
+    new_locs = {}
+    removed_keys = set()
+    for rname, region in model_struct.locations.items():
+        new_neurons = {
+            nname: neuron
+            for nname, neuron in region.neurons.items()
+            if filter_predicate(rname, nname, neuron)
+        }
+        if len(new_neurons) == len(region.neurons):
+            new_locs[rname] = region
+            continue
+        removed_keys.update(region.neurons.keys() - new_neurons.keys())
+        new_locs[rname] = shared_copy(region, {"neurons": new_neurons})
+    if not removed_keys:
+        return model_struct
+    # Neuron keys removed from a region may still be in another region
+    removed_keys -= neuron_keys(new_locs)
+    new_connects = {
+        cname: connect
+        for cname, connect in model_struct.connections.items()
+        if endpoint_key(connect.pre) not in removed_keys
+        and endpoint_key(connect.post) not in removed_keys
+    }
+    return shared_copy(
+        model_struct, {"locations": new_locs, "connections": new_connects}
+    )
 
 
-def join_network(model_struct1, model_struct2):
-    pass
+def map_edge_paramas(
+    model_struct: Network,
+    edge_map: typing.Callable[[str, Connection], Connection],
+) -> Network:
+    """
+    Network with each connection replaced by edge_map(connection name,
+    connection). Connections returned unchanged (the same object) are
+    shared with model_struct.
+    """
+    new_connects = {
+        cname: edge_map(cname, connect)
+        for cname, connect in model_struct.connections.items()
+    }
+    if all(
+        new_connects[cname] is connect
+        for cname, connect in model_struct.connections.items()
+    ):
+        return model_struct
+    return shared_copy(model_struct, {"connections": new_connects})
+
+
+def filter_edge_params(
+    model_struct: Network,
+    filter_predicate: typing.Callable[[str, Connection], bool],
+) -> Network:
+    """
+    Network with the connections for which filter_predicate(connection
+    name, connection) is true.
+    """
+    new_connects = {
+        cname: connect
+        for cname, connect in model_struct.connections.items()
+        if filter_predicate(cname, connect)
+    }
+    if len(new_connects) == len(model_struct.connections):
+        return model_struct
+    return shared_copy(model_struct, {"connections": new_connects})
+
+
+def union_network(model_struct1: Network, model_struct2: Network) -> Network:
+    """
+    Union of the regions, connections and external networks of the two
+    networks (see merge_struct). Values of model_struct1 take precedence,
+    so that sub-models can be composed with functools.reduce :
+    the regions, neurons and connections in only one of the inputs are
+    shared, and only the structs present in both are copied.
+    """
+    return merge_struct(model_struct1, model_struct2)
+
+
+def join_network(
+    model_struct1: Network,
+    model_struct2: Network,
+    connections: typing.Dict[str, Connection] | None = None,
+) -> Network:
+    """
+    Composition of two networks with disjoint regions, connections and
+    external networks (a ValueError is raised for keys in both that are not
+    the same struct), and the given connections between them.
+    """
+    for field in ("locations", "connections", "ext_networks"):
+        dict1 = getattr(model_struct1, field)
+        dict2 = getattr(model_struct2, field)
+        conflicts = [
+            skey for skey in dict2 if skey in dict1 and dict1[skey] is not dict2[skey]
+        ]
+        if conflicts:
+            raise ValueError("Networks share the {} : {}".format(field, conflicts))
+    net_join = merge_struct(model_struct1, model_struct2)
+    if connections:
+        net_join = shared_copy(
+            net_join, {"connections": net_join.connections | connections}
+        )
+    return net_join
 
 
 #
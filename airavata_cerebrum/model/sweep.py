@@ -0,0 +1,199 @@
+import concurrent.futures
+import copy
+import logging
+import os
+import typing
+
+from ..util.trace import Tracer
+from ..util import io as cbmio
+from .desc import DescStages, ModelDescription
+from . import structure
+
+
+def _log():
+    return logging.getLogger(__name__)
+
+
+#
+# Parameter sweeps : variants of a model description, each defined by a set
+# of overrides. The leading stages with the same fingerprint in all the
+# variants are run once, and only the remaining stages are run per variant.
+#
+# Override set : fields of ModelDescription (ex. custom_mod, neuron_mapper),
+# and the optional keys
+#   name   : name of the variant model (default: <base name>_v<index>)
+#   config : {config section : dict}, merged into the sections of the
+#            variant's configuration (ex. {"db2model_map": {...}})
+#
+SWEEP_NAME = "name"
+SWEEP_CONFIG = "config"
+
+
+def variant_description(
+    base_desc: ModelDescription,
+    overrides: typing.Dict[str, typing.Any],
+    index: int,
+) -> ModelDescription:
+    overrides = dict(overrides)
+    var_name = overrides.pop(
+        SWEEP_NAME, "{}_v{}".format(base_desc.config.name, index)
+    )
+    var_config = base_desc.config.model_copy(update={"name": var_name}, deep=True)
+    for cfg_key, cdict in overrides.pop(SWEEP_CONFIG, {}).items():
+        var_config.update_config(copy.deepcopy(cdict), cfg_key)
+    unknown = [okey for okey in overrides if okey not in type(base_desc).model_fields]
+    if unknown:
+        raise ValueError("Unknown description fields : {}".format(unknown))
+    if var_config.create_model_dir and not os.path.exists(var_config.model_dir):
+        os.makedirs(var_config.model_dir)
+    var_desc = base_desc.model_copy(update={"config": var_config} | overrides)
+    # Stage outputs, traces and writes are not shared with the base;
+    # the cancel token is, so that cancelling the base stops the sweep
+    var_desc._stage_outputs = {}
+    var_desc._tracer = Tracer()
+    var_desc._writer = cbmio.BackgroundWriter()
+    return var_desc
+
+
+def shared_stages(var_descs: typing.List[ModelDescription]) -> typing.List[str]:
+    """
+    Leading stages whose fingerprint is the same in all the variants. The
+    last stage (build_bmtk) writes the variant's network, and is not shared.
+    """
+    var_fps = [vdesc.stage_fingerprints() for vdesc in var_descs]
+    shared = []
+    for stage in DescStages.ORDER[:-1]:
+        if any(vfps[stage] != var_fps[0][stage] for vfps in var_fps[1:]):
+            break
+        shared.append(stage)
+    return shared
+
+
+def run_stages(
+    md_desc: ModelDescription,
+    stages: typing.List[str],
+) -> ModelDescription:
+    for stage in stages:
+        _log().info("Run stage [%s] of [%s]", stage, md_desc.config.name)
+        md_desc.cancel_token.check()
+        getattr(md_desc, stage)()
+    md_desc.wait_saved()
+    return md_desc
+
+
+def run_variant(
+    var_desc: ModelDescription,
+    stages: typing.List[str],
+    network_struct: structure.Network,
+    handoff_key: str | None,
+    handoff_data: typing.Any,
+    copy_inputs: bool = True,
+) -> ModelDescription:
+    """
+    Run the stages of the variant on the outputs of the shared stages,
+    which are copied when the variant starts (stages modify their inputs);
+    the copies are released once the variant is done.
+    """
+    var_desc.network_struct = (
+        network_struct.model_copy(deep=True) if copy_inputs else network_struct
+    )
+    if handoff_key and handoff_data is not None:
+        var_desc._stage_outputs[handoff_key] = (
+            copy.deepcopy(handoff_data) if copy_inputs else handoff_data
+        )
+    run_stages(var_desc, stages)
+    if handoff_key:
+        var_desc._stage_outputs.pop(handoff_key, None)
+    return var_desc
+
+
+def run_sweep(
+    base_desc: ModelDescription,
+    override_sets: typing.List[typing.Dict[str, typing.Any]],
+    max_workers: int = 0,
+) -> typing.Dict[str, ModelDescription]:
+    """
+    Build the variants of the base description given by the override sets.
+
+    The shared stages (see shared_stages) are run once, and their outputs
+    are saved in the base model directory. Their result is handed over to
+    each variant, which then runs the remaining stages.
+
+    Parameters
+    ----------
+    base_desc : ModelDescription
+       Description the variants are derived from
+    override_sets : List of dict
+       Overrides of each variant; see variant_description
+    max_workers : int
+       If > 0, the variants run in a pool of max_workers processes;
+       the description types (mappers, builder) must be picklable
+
+    Returns
+    -------
+    dict : {variant name : ModelDescription}
+       The variant descriptions after running their stages
+    """
+    var_descs = [
+        variant_description(base_desc, overrides, vx)
+        for vx, overrides in enumerate(override_sets)
+    ]
+    var_names = [vdesc.config.name for vdesc in var_descs]
+    if len(set(var_names)) != len(var_names):
+        raise ValueError("Variant names are not unique : {}".format(var_names))
+    if not var_descs:
+        return {}
+    shared = shared_stages(var_descs)
+    var_stages = DescStages.ORDER[len(shared):]
+    _log().info(
+        "Sweep of [%d] variants; shared stages : %s", len(var_descs), shared
+    )
+    # Shared stages run with the overrides of the first variant (all the
+    # variants agree on these stages), in the base model directory
+    shared_desc = variant_description(
+        base_desc, override_sets[0] | {SWEEP_NAME: base_desc.config.name}, 0
+    )
+    run_stages(shared_desc, shared)
+    handoff_key = shared_desc.stage_output_key(shared[-1]) if shared else None
+    handoff_data = None
+    if handoff_key and shared[-1] in (
+        DescStages.DOWNLOAD,
+        DescStages.POST_OPS,
+        DescStages.MAP_SRC,
+    ):
+        handoff_data = shared_desc.take_output(
+            handoff_key, columnar=shared[-1] != DescStages.MAP_SRC
+        )
+    if max_workers <= 0:
+        # The last variant takes the shared outputs without a copy
+        return {
+            vdesc.config.name: run_variant(
+                vdesc,
+                var_stages,
+                shared_desc.network_struct,
+                handoff_key,
+                handoff_data,
+                copy_inputs=vx < len(var_descs) - 1,
+            )
+            for vx, vdesc in enumerate(var_descs)
+        }
+    # Processes get their copies by pickling, when the variant is sent to
+    # a worker
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=min(max_workers, len(var_descs))
+    ) as sweep_executor:
+        var_futures = [
+            sweep_executor.submit(
+                run_variant,
+                vdesc,
+                var_stages,
+                shared_desc.network_struct,
+                handoff_key,
+                handoff_data,
+                False,
+            )
+            for vdesc in var_descs
+        ]
+        return {
+            vname: vfuture.result() for vname, vfuture in zip(var_names, var_futures)
+        }
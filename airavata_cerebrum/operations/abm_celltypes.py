@@ -80,22 +80,33 @@ class CTPropertyFilter(base.OpXFormer):
     def __init__(self, **params):
         self.cell_attr_filter = IterAttrFilter(**params)
 
-    def xform(self, in_iter, **params):
-        key = params["key"] if "key" in params else None
+    @staticmethod
+    def attr_filters(params):
         filters = []
         for pkey, valx in params.items():
             if pkey in CTPropertyFilter.QUERY_FILTER_MAP:
                 filter_attr = CTPropertyFilter.QUERY_FILTER_MAP[pkey].copy()
                 filter_attr.append(str(valx))
                 filters.append(filter_attr)
+        return filters
+
+    def xform(self, in_iter, **params):
+        key = params["key"] if "key" in params else None
         return self.cell_attr_filter.xform(in_iter,
                                            key=key,
-                                           filters=filters)
+                                           filters=self.attr_filters(params))
 
     @classmethod
     def trait_type(cls) -> type[traitlets.HasTraits]:
         return cls.FilterTraits
 
+    @classmethod
+    def pushdown_filters(cls, **params):
+        key = params["key"] if "key" in params else None
+        return IterAttrFilter.pushdown_filters(
+            key=key, filters=cls.attr_filters(params)
+        )
+
 
 #
 # ------- Query and Xform Registers -----
@@ -49,10 +49,22 @@ class IterAttrMapper(base.OpXFormer):
             return None
         return iter(x[self.attr] for x in in_iter)
 
+    def xform_batch(self, in_batch: typing.List, **params) -> typing.List:
+        attr = self.attr
+        return [x[attr] for x in in_batch]
+
     @classmethod
     def trait_type(cls):
         return cls.MapperTraits
 
+    @classmethod
+    def item_wise(cls) -> bool:
+        return True
+
+    @classmethod
+    def supports_batch(cls) -> bool:
+        return True
+
 
 class IterAttrFilter(base.OpXFormer):
     class FilterTraits(traitlets.HasTraits):
@@ -103,10 +115,46 @@ class IterAttrFilter(base.OpXFormer):
             )
         ) if in_iter else None
 
+    def xform_batch(
+        self,
+        in_batch: typing.List,
+        **params: typing.Any,
+    ) -> typing.List:
+        filters_itr = params["filters"]
+        key = params["key"] if "key" in params else None
+        if key:
+            return [
+                x
+                for x in in_batch
+                if x and all(
+                    getattr(x[key][attr], bin_op)(val)
+                    for attr, bin_op, val in filters_itr
+                )
+            ]
+        return [
+            x
+            for x in in_batch
+            if x and all(
+                getattr(x[attr], bin_op)(val) for attr, bin_op, val in filters_itr
+            )
+        ]
+
     @classmethod
     def trait_type(cls) -> type[traitlets.HasTraits]:
         return cls.FilterTraits
 
+    @classmethod
+    def supports_batch(cls) -> bool:
+        return True
+
+    @classmethod
+    def pushdown_filters(cls, **params: typing.Any):
+        key = params["key"] if "key" in params else None
+        return [
+            ((key, attr) if key else (attr,), bin_op, val)
+            for attr, bin_op, val in params["filters"]
+        ]
+
 
 #
 # ------- Query and Xform Registers -----
@@ -120,10 +120,23 @@ class IterJPatchFilter(base.OpXFormer):
             else None
         )
 
+    def xform_batch(
+        self,
+        in_batch: typing.List,
+        **params: typing.Any,
+    ) -> typing.List:
+        filter_exp = params["filter_exp"]
+        dest_path = params["dest_path"]
+        return [self.patch(x, filter_exp, dest_path) for x in in_batch if x]
+
     @classmethod
     def trait_type(cls) -> type[traitlets.HasTraits]:
         return cls.FilterTraits
 
+    @classmethod
+    def supports_batch(cls) -> bool:
+        return True
+
 
 class IterJPointerFilter(base.OpXFormer):
     class FilterTraits(traitlets.HasTraits):
@@ -163,10 +176,23 @@ class IterJPointerFilter(base.OpXFormer):
             iter(x for x in in_iter if x and self.exists(x, fpath)) if in_iter else None
         )
 
+    def xform_batch(
+        self,
+        in_batch: typing.List,
+        **params: typing.Any,
+    ) -> typing.List:
+        # Pointer is parsed once for the whole chunk
+        jptr = jsonpath.JSONPointer(params["path"])
+        return [x for x in in_batch if x and jptr.exists(x)]
+
     @classmethod
     def trait_type(cls) -> type[traitlets.HasTraits]:
         return cls.FilterTraits
 
+    @classmethod
+    def supports_batch(cls) -> bool:
+        return True
+
 #
 # ----- Mapper, Filter and Query Registers ------
 #
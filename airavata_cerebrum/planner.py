@@ -0,0 +1,197 @@
+import json
+import logging
+import typing
+
+from . import workflow
+from .util.cache import digest
+from .util.desc_config import CfgKeys
+
+
+def _log():
+    return logging.getLogger(__name__)
+
+
+def step_signature(wf_step: typing.Dict[str, typing.Any]) -> str:
+    # Labels are only for display; two steps with the same type, name
+    # and parameters compute the same output for the same input.
+    return json.dumps(
+        [
+            wf_step[CfgKeys.TYPE],
+            wf_step[CfgKeys.NAME],
+            wf_step[CfgKeys.INIT_PARAMS],
+            wf_step[CfgKeys.EXEC_PARAMS],
+        ],
+        sort_keys=True,
+        default=str,
+    )
+
+
+class DAGNode:
+    def __init__(
+        self,
+        wf_step: typing.Dict[str, typing.Any] | None = None,
+        parent: "DAGNode | None" = None,
+    ):
+        self.wf_step = wf_step
+        self.parent = parent
+        self.children: typing.Dict[str, DAGNode] = {}
+        # Number of workflows that end at this node
+        self.nrefs: int = 0
+        self.output: typing.List | None = None
+
+    def child(self, wf_step: typing.Dict[str, typing.Any]) -> "DAGNode":
+        skey = step_signature(wf_step)
+        if skey not in self.children:
+            self.children[skey] = DAGNode(wf_step, self)
+        return self.children[skey]
+
+
+class WorkflowDAG:
+    """
+    DAG of the ops workflows applied to the source data.
+
+    Workflows over the same source database that share a prefix of
+    identical steps share the nodes of that prefix, so that each unique
+    sub-workflow is evaluated only once and its output is fanned out to all
+    the workflows that contain it.
+    """
+
+    def __init__(self):
+        self.roots: typing.Dict[str, DAGNode] = {}
+        self.nsteps: int = 0
+
+    def add(
+        self,
+        src_db: str,
+        workflow_steps: typing.List[typing.Dict[str, typing.Any]],
+    ) -> DAGNode:
+        if src_db not in self.roots:
+            self.roots[src_db] = DAGNode()
+        wf_node = self.roots[src_db]
+        for wf_step in workflow_steps:
+            wf_node = wf_node.child(wf_step)
+            self.nsteps += 1
+        wf_node.nrefs += 1
+        return wf_node
+
+    def nunique(self) -> int:
+        ncount = 0
+        node_stack = list(self.roots.values())
+        while node_stack:
+            wf_node = node_stack.pop()
+            node_stack.extend(wf_node.children.values())
+            ncount += len(wf_node.children)
+        return ncount
+
+    def evaluate(
+        self,
+        db_data: typing.Dict[str, typing.Any],
+        wf_ctx: workflow.WorkflowContext | None = None,
+    ) -> None:
+        _log().info(
+            "Evaluating [%d] unique steps for [%d] workflow steps",
+            self.nunique(),
+            self.nsteps,
+        )
+        step_cache = wf_ctx.step_cache if wf_ctx else None
+        for src_db, root_node in self.roots.items():
+            root_node.output = db_data[src_db]
+            in_digest = digest(root_node.output) if step_cache else ""
+            self.evaluate_node(root_node, in_digest, wf_ctx)
+
+    def evaluate_node(
+        self,
+        wf_node: DAGNode,
+        in_digest: str,
+        wf_ctx: workflow.WorkflowContext | None,
+    ) -> None:
+        step_cache = wf_ctx.step_cache if wf_ctx else None
+        tracer = wf_ctx.tracer if wf_ctx else None
+        cancel_token = wf_ctx.cancel_token if wf_ctx else None
+        for child_node in wf_node.children.values():
+            if step_cache:
+                child_out, out_digest = workflow.run_cached_step(
+                    child_node.wf_step,  # type: ignore
+                    wf_node.output,
+                    in_digest,
+                    step_cache,
+                    tracer,
+                    cancel_token,
+                )
+            else:
+                child_out = workflow.run_step(
+                    child_node.wf_step,  # type: ignore
+                    wf_node.output,
+                    tracer,
+                    cancel_token,
+                )
+                out_digest = in_digest
+            # Outputs are materialized since they may be consumed by
+            # several children
+            child_node.output = list(child_out) if child_out is not None else []
+            self.evaluate_node(child_node, out_digest, wf_ctx)
+        # Release intermediate outputs once all the children are complete
+        if wf_node.nrefs == 0:
+            wf_node.output = None
+
+
+def map_srcdata(
+    source_data: typing.Dict[str, typing.Any],
+    data2model_map: typing.Dict[str, typing.Any],
+    wf_ctx: workflow.WorkflowContext | None = None,
+) -> typing.Dict[str, typing.Any]:
+    """
+    Equivalent to workflow.map_srcdata_locations and
+    workflow.map_srcdata_connections applied to the locations and
+    connections of data2model_map, but each unique sub-workflow is
+    evaluated only once.
+    """
+    wf_dag = WorkflowDAG()
+    # 1. Plan : Add all the workflows to the DAG
+    loc_nodes = {
+        location: {
+            neuron: {
+                src_db: wf_dag.add(src_db, op_desc[CfgKeys.WORKFLOW])
+                for src_db, op_desc in neuron_dcfg[CfgKeys.SRC_DATA].items()
+            }
+            for neuron, neuron_dcfg in location_desc.items()
+        }
+        for location, location_desc in data2model_map[CfgKeys.LOCATIONS].items()
+    }
+    conn_nodes = {
+        connx: {
+            src_db: wf_dag.add(src_db, op_desc[CfgKeys.WORKFLOW])
+            for src_db, op_desc in connx_desc[CfgKeys.SRC_DATA].items()
+        }
+        for connx, connx_desc in data2model_map[CfgKeys.CONNECTIONS].items()
+    }
+    # 2. Evaluate
+    wf_dag.evaluate(source_data, wf_ctx)
+    # 3. Fan out the outputs
+    net_locations = {}
+    for location, location_desc in data2model_map[CfgKeys.LOCATIONS].items():
+        neuron_desc_map = {}
+        for neuron, neuron_dcfg in location_desc.items():
+            neuron_dc_map = {
+                src_db: list(wf_node.output)  # type: ignore
+                for src_db, wf_node in loc_nodes[location][neuron].items()
+            }
+            for dkey in neuron_dcfg.keys():
+                if dkey != CfgKeys.SRC_DATA:
+                    neuron_dc_map[dkey] = neuron_dcfg[dkey]
+            neuron_desc_map[neuron] = neuron_dc_map
+        net_locations[location] = neuron_desc_map
+    net_connections = {}
+    for connx, connx_desc in data2model_map[CfgKeys.CONNECTIONS].items():
+        conn_desc_map = {
+            src_db: list(wf_node.output)  # type: ignore
+            for src_db, wf_node in conn_nodes[connx].items()
+        }
+        for dkey in connx_desc.keys():
+            if dkey != CfgKeys.SRC_DATA:
+                conn_desc_map[dkey] = connx_desc[dkey]
+        net_connections[connx] = conn_desc_map
+    return {
+        CfgKeys.LOCATIONS: net_locations,
+        CfgKeys.CONNECTIONS: net_connections,
+    }
@@ -1,16 +1,17 @@
-import itertools
+import collections
+import functools
+import importlib
+import importlib.metadata
+import logging
+import threading
 import typing
 from . import base
-from .dataset import abc_mouse as abc_mouse_db
-from .dataset import abm_celltypes as abm_celltypes_db
-from .dataset import ai_synphys as ai_synphys_db
-from .operations import abc_mouse as abc_mouse_ops
-from .operations import abm_celltypes as abm_celltypes_ops
-from .operations import ai_synphys as ai_synphys_ops
-from .operations import json_filter
-from .operations import dict_filter
-from .operations import xform
 from .util import class_qual_name
+from .util.cache import digest
+
+
+def _log():
+    return logging.getLogger(__name__)
 
 
 #
@@ -19,58 +20,195 @@ from .util import class_qual_name
 RCType = typing.TypeVar("RCType")
 
 
+class InstancePool:
+    """
+    Pool of shared instances of poolable classes, keyed by the register key
+    and the digest of the init params. When more than max_size instances
+    are pooled, the least recently used instance is evicted.
+    """
+
+    def __init__(self, max_size: int = 16) -> None:
+        self.max_size = max_size
+        self.instances: collections.OrderedDict[str, typing.Any] = (
+            collections.OrderedDict()
+        )
+        self.lock = threading.RLock()
+        # Locks of the instances being constructed, by pool key
+        self.init_locks: typing.Dict[str, threading.Lock] = {}
+
+    @staticmethod
+    def pool_key(register_key: str, init_params: typing.Dict[str, typing.Any]) -> str:
+        return register_key + ":" + digest(init_params)
+
+    def lookup(self, pkey: str) -> typing.Any | None:
+        with self.lock:
+            if pkey in self.instances:
+                self.instances.move_to_end(pkey)
+                return self.instances[pkey]
+            return None
+
+    def get(
+        self,
+        register_key: str,
+        init_params: typing.Dict[str, typing.Any],
+        factory: typing.Callable[..., typing.Any],
+    ) -> typing.Any:
+        """
+        Pooled instance of register_key, constructed with factory on the
+        first request. Instances are constructed outside the pool lock : a
+        slow constructor blocks only the other requests of the same key.
+        """
+        pkey = self.pool_key(register_key, init_params)
+        instance = self.lookup(pkey)
+        if instance is not None:
+            return instance
+        with self.lock:
+            init_lock = self.init_locks.setdefault(pkey, threading.Lock())
+        with init_lock:
+            # Constructed by another thread while waiting for the lock
+            instance = self.lookup(pkey)
+            if instance is not None:
+                return instance
+            _log().info("Initializing pooled instance : [%s]", register_key)
+            instance = factory(**init_params)
+            with self.lock:
+                self.instances[pkey] = instance
+                self.init_locks.pop(pkey, None)
+                while len(self.instances) > self.max_size:
+                    evict_key, _ = self.instances.popitem(last=False)
+                    _log().info("Evicting pooled instance : [%s]", evict_key)
+            return instance
+
+    def evict(self, register_key: str) -> int:
+        # Evict all the instances of register_key; returns the count
+        with self.lock:
+            evict_keys = [
+                pkey
+                for pkey in self.instances
+                if pkey.rsplit(":", 1)[0] == register_key
+            ]
+            for pkey in evict_keys:
+                del self.instances[pkey]
+            return len(evict_keys)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.instances.clear()
+
+    def __len__(self) -> int:
+        return len(self.instances)
+
+
+INSTANCE_POOL = InstancePool()
+
+
+#
+# Modules providing query_register() and xform_register() functions.
+# A module is imported only when a key of one of its classes is first
+# resolved; the key of a class is its qualified name.
+REGISTER_MODULES = [
+    "airavata_cerebrum.dataset.abc_mouse",
+    "airavata_cerebrum.dataset.abm_celltypes",
+    "airavata_cerebrum.dataset.ai_synphys",
+    "airavata_cerebrum.operations.xform",
+    "airavata_cerebrum.operations.json_filter",
+    "airavata_cerebrum.operations.dict_filter",
+    "airavata_cerebrum.operations.abc_mouse",
+    "airavata_cerebrum.operations.abm_celltypes",
+    "airavata_cerebrum.operations.ai_synphys",
+]
+# Plugin packages add their modules as entry points of this group
+REGISTER_ENTRY_POINTS = "airavata_cerebrum.register"
+
+
+@functools.cache
+def register_modules() -> typing.List[str]:
+    plugin_modules = [
+        ept.module
+        for ept in importlib.metadata.entry_points(group=REGISTER_ENTRY_POINTS)
+    ]
+    return REGISTER_MODULES + [
+        mname for mname in plugin_modules if mname not in REGISTER_MODULES
+    ]
+
+
 class TypeRegister(typing.Generic[RCType]):
     register_map: typing.Dict[str, typing.Type[RCType]]
 
     def __init__(
-        self, register_lst: typing.Iterable[type[RCType]], base_class: type[RCType]
+        self,
+        register_fn: str,
+        base_class: type[RCType],
+        instance_pool: InstancePool | None = None,
     ) -> None:
-        self.register_map = {
-            class_qual_name(clsx): clsx
-            for clsx in register_lst
-            if issubclass(clsx, base_class)
-        }
+        self.register_fn = register_fn
+        self.base_class = base_class
+        self.register_map = {}
+        self.loaded_modules: typing.Set[str] = set()
+        self.instance_pool = instance_pool
+        self.lock = threading.RLock()
+
+    def register(self, register_lst: typing.Iterable[type[RCType]]) -> None:
+        for clsx in register_lst:
+            if issubclass(clsx, self.base_class):
+                self.register_map[class_qual_name(clsx)] = clsx
+
+    def load_module(self, module_name: str) -> None:
+        with self.lock:
+            if module_name in self.loaded_modules:
+                return
+            _log().debug("Loading register module : [%s]", module_name)
+            reg_module = importlib.import_module(module_name)
+            self.register(getattr(reg_module, self.register_fn)())
+            self.loaded_modules.add(module_name)
+
+    def load_all(self) -> None:
+        for module_name in register_modules():
+            try:
+                self.load_module(module_name)
+            except ImportError as ierr:
+                _log().warning(
+                    "Failed to load register module [%s] : %s", module_name, ierr
+                )
+
+    def resolve(self, query_key: str) -> typing.Type[RCType] | None:
+        if query_key in self.register_map:
+            return self.register_map[query_key]
+        module_name = query_key.rsplit(".", 1)[0]
+        if module_name in register_modules():
+            self.load_module(module_name)
+        else:
+            # Class is not in the module that registers it
+            self.load_all()
+        return self.register_map.get(query_key)
+
+    def keys(self) -> typing.List[str]:
+        # All the registered keys : requires loading all the modules
+        self.load_all()
+        return list(self.register_map.keys())
 
     def get_object(
         self, query_key: str, **init_params: typing.Any
     ) -> RCType | None:
-        if query_key not in self.register_map:
+        reg_class = self.resolve(query_key)
+        if reg_class is None:
             return None
-        return self.register_map[query_key](**init_params)
+        if self.instance_pool is not None and reg_class.poolable():  # type: ignore
+            return self.instance_pool.get(query_key, init_params, reg_class)
+        return reg_class(**init_params)
 
     def get_type(self, query_key: str) -> typing.Type[RCType] | None:
-        if query_key not in self.register_map:
-            return None
-        return self.register_map[query_key]
+        return self.resolve(query_key)
 
 
 QUERY_REGISTER: TypeRegister[base.DbQuery] = TypeRegister(
-    itertools.chain(
-        abc_mouse_db.query_register(),
-        abm_celltypes_db.query_register(),
-        ai_synphys_db.query_register(),
-        xform.query_register(),
-        json_filter.query_register(),
-        dict_filter.query_register(),
-        abc_mouse_ops.query_register(),
-        abm_celltypes_ops.query_register(),
-        ai_synphys_ops.query_register(),
-    ),
+    "query_register",
     base.DbQuery,
+    INSTANCE_POOL,
 )
 
 XFORM_REGISTER: TypeRegister[base.OpXFormer] = TypeRegister(
-    itertools.chain(
-        abc_mouse_db.xform_register(),
-        abm_celltypes_db.xform_register(),
-        ai_synphys_db.xform_register(),
-        xform.xform_register(),
-        json_filter.xform_register(),
-        dict_filter.xform_register(),
-        abc_mouse_ops.xform_register(),
-        abm_celltypes_ops.xform_register(),
-        ai_synphys_ops.xform_register(),
-    ),
+    "xform_register",
     base.OpXFormer,
 )
 
@@ -0,0 +1,108 @@
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import pickle
+import time
+import typing
+
+
+def _log():
+    return logging.getLogger(__name__)
+
+
+def digest(in_obj: typing.Any) -> str:
+    """
+    SHA-256 digest of the canonical JSON form of in_obj (sorted keys,
+    non-JSON values converted with str).
+    """
+    json_str = json.dumps(in_obj, sort_keys=True, default=str)
+    return hashlib.sha256(json_str.encode()).hexdigest()
+
+
+class StepCache:
+    """
+    Persistent, content-addressed cache of workflow step outputs.
+
+    Entries are pickled to files under cache_dir, named by the digest of
+    (registry key, init params, exec params, input digest). When the total
+    size exceeds max_bytes, the least recently used entries are evicted.
+    """
+
+    SUFFIX = ".pkl"
+
+    def __init__(
+        self,
+        cache_dir: str | pathlib.Path,
+        max_bytes: int = 2**30,
+    ):
+        self.cache_dir = pathlib.Path(cache_dir)
+        self.max_bytes = max_bytes
+        if not os.path.exists(self.cache_dir):
+            os.makedirs(self.cache_dir)
+
+    def step_key(
+        self,
+        register_key: str,
+        init_params: typing.Dict[str, typing.Any],
+        exec_params: typing.Dict[str, typing.Any],
+        in_digest: str,
+    ) -> str:
+        return digest([register_key, init_params, exec_params, in_digest])
+
+    def entry_path(self, step_key: str) -> pathlib.Path:
+        return pathlib.Path(self.cache_dir, step_key[:2], step_key + self.SUFFIX)
+
+    def get(self, step_key: str) -> typing.Tuple[bool, typing.Any]:
+        epath = self.entry_path(step_key)
+        if not os.path.exists(epath):
+            return False, None
+        try:
+            with open(epath, "rb") as in_fptr:
+                step_output = pickle.load(in_fptr)
+        except (OSError, pickle.UnpicklingError, EOFError) as ex:
+            _log().warning("Failed to read cache entry [%s] : %s", epath, ex)
+            return False, None
+        self.touch(epath)
+        return True, step_output
+
+    def put(self, step_key: str, step_output: typing.Any) -> None:
+        epath = self.entry_path(step_key)
+        if not os.path.exists(epath.parent):
+            os.makedirs(epath.parent)
+        tmp_path = epath.with_suffix(".tmp")
+        with open(tmp_path, "wb") as out_fptr:
+            pickle.dump(step_output, out_fptr)
+        os.replace(tmp_path, epath)
+        self.touch(epath)
+        self.evict()
+
+    @staticmethod
+    def touch(epath: pathlib.Path) -> None:
+        # Access time for LRU eviction, as the mtime; set explicitly since
+        # file times have the (coarse) resolution of the kernel clock
+        now_ns = time.time_ns()
+        os.utime(epath, ns=(now_ns, now_ns))
+
+    def entries(self) -> typing.List[typing.Tuple[pathlib.Path, os.stat_result]]:
+        return [
+            (epath, epath.stat())
+            for epath in self.cache_dir.glob("*/*" + self.SUFFIX)
+        ]
+
+    def evict(self) -> None:
+        cache_entries = self.entries()
+        total_bytes = sum(estat.st_size for _, estat in cache_entries)
+        if total_bytes <= self.max_bytes:
+            return
+        for epath, estat in sorted(cache_entries, key=lambda x: x[1].st_mtime_ns):
+            if total_bytes <= self.max_bytes:
+                break
+            _log().debug("Evicting cache entry [%s]", epath)
+            epath.unlink(missing_ok=True)
+            total_bytes -= estat.st_size
+
+    def clear(self) -> None:
+        for epath, _ in self.entries():
+            epath.unlink(missing_ok=True)
@@ -0,0 +1,153 @@
+import itertools
+import logging
+import os
+import pathlib
+import pickle
+import shutil
+import typing
+
+
+def _log():
+    return logging.getLogger(__name__)
+
+
+class WorkflowCheckpoint:
+    """
+    Checkpoints of the steps of one workflow run.
+
+    Step outputs are written as a stream of pickled records : a header
+    followed by one record per output item. Items of lazy step outputs are
+    appended to '<step>.part' as they are produced, as records (number of
+    input items consumed, output item); once the output is exhausted the
+    file is renamed to '<step>.done'.
+    """
+
+    def __init__(self, ckpt_dir: str | pathlib.Path):
+        self.ckpt_dir = pathlib.Path(ckpt_dir)
+        if not os.path.exists(self.ckpt_dir):
+            os.makedirs(self.ckpt_dir)
+
+    def done_path(self, step_index: int) -> pathlib.Path:
+        return pathlib.Path(self.ckpt_dir, "{}.done".format(step_index))
+
+    def part_path(self, step_index: int) -> pathlib.Path:
+        return pathlib.Path(self.ckpt_dir, "{}.part".format(step_index))
+
+    def last_done(self, nsteps: int) -> int:
+        for step_index in reversed(range(nsteps)):
+            if os.path.exists(self.done_path(step_index)):
+                return step_index
+        return -1
+
+    @staticmethod
+    def read_records(
+        file_name: pathlib.Path,
+    ) -> typing.Tuple[typing.Any, typing.List, int]:
+        # Returns the header, the complete records and the file offset at
+        # the end of the last complete record
+        header = None
+        records = []
+        offset = 0
+        with open(file_name, "rb") as in_fptr:
+            try:
+                header = pickle.load(in_fptr)
+                offset = in_fptr.tell()
+                while True:
+                    records.append(pickle.load(in_fptr))
+                    offset = in_fptr.tell()
+            except (EOFError, pickle.UnpicklingError):
+                pass
+        return header, records, offset
+
+    def load_done(self, step_index: int) -> typing.Iterable:
+        header, records, _ = self.read_records(self.done_path(step_index))
+        if header and header["sized"]:
+            return records
+        return iter(out_item for _, out_item in records)
+
+    def save_done(self, step_index: int, step_output: typing.List) -> None:
+        part_path = self.part_path(step_index)
+        with open(part_path, "wb") as out_fptr:
+            pickle.dump({"sized": True}, out_fptr)
+            for out_item in step_output:
+                pickle.dump(out_item, out_fptr)
+        os.replace(part_path, self.done_path(step_index))
+
+    def load_part(self, step_index: int) -> typing.List[typing.Tuple[int, typing.Any]]:
+        # Records (number of input items consumed, output item) of the
+        # items completed before the interruption
+        part_path = self.part_path(step_index)
+        if not os.path.exists(part_path):
+            return []
+        _, records, offset = self.read_records(part_path)
+        # Drop the record that was being written at the interruption
+        with open(part_path, "r+b") as out_fptr:
+            out_fptr.truncate(offset)
+        return records
+
+    def drop_part(self, step_index: int) -> None:
+        self.part_path(step_index).unlink(missing_ok=True)
+
+    def item_writer(
+        self,
+        step_index: int,
+        out_iter: typing.Iterable,
+        replay: typing.List[typing.Tuple[int, typing.Any]],
+        in_counter: "ItemCounter | None" = None,
+    ) -> typing.Iterator:
+        """
+        Yield the replayed items followed by the items of out_iter, which
+        are appended to the step's partial checkpoint as they are produced,
+        with the number of input items in_counter has consumed by then.
+        """
+        part_path = self.part_path(step_index)
+        new_part = not replay or not os.path.exists(part_path)
+        with open(part_path, "wb" if new_part else "ab") as out_fptr:
+            if new_part:
+                pickle.dump({"sized": False}, out_fptr)
+                for in_out in replay:
+                    pickle.dump(in_out, out_fptr)
+                out_fptr.flush()
+            yield from (out_item for _, out_item in replay)
+            for out_item in out_iter:
+                pickle.dump(
+                    (in_counter.count if in_counter else -1, out_item), out_fptr
+                )
+                out_fptr.flush()
+                yield out_item
+        os.replace(part_path, self.done_path(step_index))
+
+    def clear(self) -> None:
+        shutil.rmtree(self.ckpt_dir, ignore_errors=True)
+
+
+class Checkpoint:
+    """
+    Checkpoint store : each workflow run gets a sub-directory named by the
+    key of the workflow (digest of its steps and input).
+    """
+
+    def __init__(self, ckpt_dir: str | pathlib.Path):
+        self.ckpt_dir = pathlib.Path(ckpt_dir)
+
+    def workflow(self, wf_key: str) -> WorkflowCheckpoint:
+        return WorkflowCheckpoint(pathlib.Path(self.ckpt_dir, wf_key))
+
+
+class ItemCounter:
+    """
+    Iterator over the items of in_iter after the first nskip, which counts
+    the items consumed (including the skipped ones).
+    """
+
+    def __init__(self, in_iter: typing.Iterable, nskip: int = 0):
+        self.in_iter = itertools.islice(iter(in_iter), nskip, None)
+        self.count = nskip
+
+    def __iter__(self) -> "ItemCounter":
+        return self
+
+    def __next__(self) -> typing.Any:
+        in_item = next(self.in_iter)
+        self.count += 1
+        return in_item
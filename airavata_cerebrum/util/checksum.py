@@ -0,0 +1,67 @@
+import hashlib
+import json
+import os
+import pathlib
+import typing
+
+#
+# Checksums of the outputs written by the pipeline : a sidecar file
+# '<output>.checksum' with the SHA-256 digest of the output and the version
+# of the schema it was written with. An output whose content and schema
+# still match its checksum was not edited since the pipeline wrote it, and
+# can be loaded without validation. The digest is computed only if the
+# size or mtime of the output changed since it was written.
+#
+# This is a cache-integrity check, not a signature : anyone who can edit an
+# output can also rewrite its checksum, so it does not authenticate the
+# output and should only be used for outputs in trusted directories.
+#
+
+CHECKSUM_SUFFIX = ".checksum"
+
+
+def checksum_path(file_name: str | pathlib.PurePath) -> pathlib.Path:
+    fpath = pathlib.Path(file_name)
+    return fpath.with_name(fpath.name + CHECKSUM_SUFFIX)
+
+
+def file_digest(file_name: str | pathlib.PurePath) -> str:
+    file_hash = hashlib.sha256()
+    with open(file_name, "rb") as in_fptr:
+        for in_block in iter(lambda: in_fptr.read(2**20), b""):
+            file_hash.update(in_block)
+    return file_hash.hexdigest()
+
+
+def write_checksum(file_name: str | pathlib.PurePath, schema_version: str) -> None:
+    fstat = os.stat(file_name)
+    with open(checksum_path(file_name), "w") as out_fptr:
+        json.dump(
+            {
+                "schema": schema_version,
+                "sha256": file_digest(file_name),
+                "size": fstat.st_size,
+                "mtime_ns": fstat.st_mtime_ns,
+            },
+            out_fptr,
+        )
+
+
+def verify_checksum(file_name: str | pathlib.PurePath, schema_version: str) -> bool:
+    cksum_file = checksum_path(file_name)
+    if not os.path.exists(cksum_file) or not os.path.exists(file_name):
+        return False
+    try:
+        with open(cksum_file) as in_fptr:
+            file_cksum: typing.Dict[str, typing.Any] = json.load(in_fptr)
+    except (OSError, ValueError):
+        return False
+    fstat = os.stat(file_name)
+    if (
+        file_cksum.get("schema") != schema_version
+        or file_cksum.get("size") != fstat.st_size
+    ):
+        return False
+    if file_cksum.get("mtime_ns") == fstat.st_mtime_ns:
+        return True
+    return file_cksum.get("sha256") == file_digest(file_name)
@@ -0,0 +1,357 @@
+import collections.abc
+import json
+import logging
+import os
+import pathlib
+import typing
+import urllib.parse
+
+#
+# Columnar (Parquet) store of workflow outputs : {source : [record, ...]}.
+#
+# Records of each source are flattened to one column per leaf value; the
+# column of a leaf is the JSON pointer of the leaf, without the leading
+# '/' (ex. 'ct/line_name'). Dicts are flattened, lists and values that can
+# not be stored in a typed column are stored as JSON strings. Reads can
+# select a subset of the columns and push filters down to the Parquet
+# scan. Requires pyarrow, which is imported only when the store is used.
+#
+
+MANIFEST_FILE = "_manifest.json"
+MODES_KEY = b"colstore_modes"
+# Column modes
+VALUE = "value"  # typed column; null is None
+OPTIONAL = "optional"  # typed column; null is a missing key
+JSON = "json"  # JSON encoded values; null is a missing key
+# Source with non-dict records : one JSON column of whole records
+ROOT_COLUMN = "value"
+ROOT_KEY = b"colstore_root"
+
+FilterType = typing.Tuple[typing.Tuple[str, ...], str, typing.Any]
+
+
+def _log():
+    return logging.getLogger(__name__)
+
+
+def column_name(path: typing.Sequence[str]) -> str:
+    return "/".join(
+        str(seg).replace("~", "~0").replace("/", "~1") for seg in path
+    )
+
+
+def column_path(col_name: str) -> typing.List[str]:
+    return [
+        seg.replace("~1", "/").replace("~0", "~") for seg in col_name.split("/")
+    ]
+
+
+def flatten_record(
+    record: typing.Dict[str, typing.Any],
+    path: typing.Tuple[str, ...] = (),
+) -> typing.Iterator[typing.Tuple[str, typing.Any]]:
+    for key, value in record.items():
+        if isinstance(value, dict) and value:
+            yield from flatten_record(value, path + (key,))
+        else:
+            yield column_name(path + (key,)), value
+
+
+def value_kind(value: typing.Any) -> type | None:
+    if value is None:
+        return None
+    if isinstance(value, (bool, int, float, str)):
+        return type(value)
+    return object
+
+
+def flatten_records(
+    records: typing.List[typing.Dict[str, typing.Any]],
+) -> typing.Tuple[typing.Dict[str, typing.List], typing.Dict[str, str]]:
+    """
+    Flatten the records into columns; returns the column values and the
+    mode of each column.
+    """
+    col_maps = [dict(flatten_record(rcd)) for rcd in records]
+    col_names = list(dict.fromkeys(cx for cmap in col_maps for cx in cmap))
+    columns = {}
+    modes = {}
+    for col in col_names:
+        kinds = set()
+        has_missing = has_none = False
+        for cmap in col_maps:
+            if col not in cmap:
+                has_missing = True
+            elif cmap[col] is None:
+                has_none = True
+            else:
+                kinds.add(value_kind(cmap[col]))
+        # Columns mixing types (incl. int and float) are stored as JSON to
+        # preserve the values exactly
+        if len(kinds) > 1 or object in kinds or (has_missing and has_none):
+            modes[col] = JSON
+            columns[col] = [
+                json.dumps(cmap[col]) if col in cmap else None for cmap in col_maps
+            ]
+        else:
+            modes[col] = OPTIONAL if has_missing else VALUE
+            columns[col] = [cmap.get(col) for cmap in col_maps]
+    return columns, modes
+
+
+def unflatten_row(
+    row: typing.Dict[str, typing.Any],
+    modes: typing.Dict[str, str],
+    col_paths: typing.Dict[str, typing.List[str]],
+) -> typing.Dict[str, typing.Any]:
+    record = {}
+    for col, value in row.items():
+        match modes[col]:
+            case "json":
+                if value is None:
+                    continue
+                value = json.loads(value)
+            case "optional":
+                if value is None:
+                    continue
+        node = record
+        cpath = col_paths[col]
+        for seg in cpath[:-1]:
+            node = node.setdefault(seg, {})
+        node[cpath[-1]] = value
+    return record
+
+
+def records_table(records: typing.List[typing.Any]) -> typing.Any:
+    import pyarrow as pa
+
+    if not all(isinstance(rcd, dict) for rcd in records):
+        table = pa.table({ROOT_COLUMN: [json.dumps(rcd) for rcd in records]})
+        return table.replace_schema_metadata({ROOT_KEY: b"1"})
+    columns, modes = flatten_records(records)
+    arrays = {}
+    for col, values in columns.items():
+        try:
+            arrays[col] = pa.array(values)
+        except (pa.ArrowException, OverflowError):
+            # Ex. integers out of the int64 range
+            modes[col] = JSON
+            arrays[col] = pa.array(
+                [json.dumps(vx) if vx is not None else None for vx in values],
+                pa.string(),
+            )
+    table = pa.table(arrays)
+    return table.replace_schema_metadata({MODES_KEY: json.dumps(modes).encode()})
+
+
+def table_records(table: typing.Any) -> typing.List[typing.Any]:
+    metadata = table.schema.metadata or {}
+    if ROOT_KEY in metadata:
+        return [json.loads(rx) for rx in table.column(ROOT_COLUMN).to_pylist()]
+    modes = json.loads(metadata[MODES_KEY])
+    col_paths = {col: column_path(col) for col in table.column_names}
+    return [unflatten_row(row, modes, col_paths) for row in table.to_pylist()]
+
+
+def compatible(arrow_type: typing.Any, value: typing.Any) -> bool:
+    import pyarrow.types as pat
+
+    if isinstance(value, bool):
+        return pat.is_boolean(arrow_type)
+    if isinstance(value, (int, float)):
+        return pat.is_integer(arrow_type) or pat.is_floating(arrow_type)
+    if isinstance(value, str):
+        return pat.is_string(arrow_type) or pat.is_large_string(arrow_type)
+    return False
+
+
+def filter_expression(
+    schema: typing.Any,
+    filters: typing.Iterable[FilterType],
+) -> typing.Any:
+    """
+    Dataset filter expression for the conjunction of the (path, bin_op,
+    value) filters, where bin_op is the special method applied to the
+    value at path (ex. '__eq__', '__contains__'), as in IterAttrFilter.
+
+    The expression selects a superset of the matching records : rows with
+    null values and filters that can not be evaluated on the column are
+    not excluded, so the filters should still be applied to the records.
+    """
+    import pyarrow.compute as pc
+    import pyarrow.dataset as pads
+
+    modes = json.loads((schema.metadata or {}).get(MODES_KEY, b"{}"))
+    expr = None
+    for path, bin_op, value in filters:
+        col = column_name(path)
+        if modes.get(col) not in (VALUE, OPTIONAL):
+            continue
+        if not compatible(schema.field(col).type, value):
+            continue
+        fld = pads.field(col)
+        match bin_op:
+            case "__eq__":
+                pred = fld == value
+            case "__ne__":
+                pred = fld != value
+            case "__lt__":
+                pred = fld < value
+            case "__le__":
+                pred = fld <= value
+            case "__gt__":
+                pred = fld > value
+            case "__ge__":
+                pred = fld >= value
+            case "__contains__" if isinstance(value, str):
+                pred = pc.match_substring(fld, value)
+            case _:
+                continue
+        pred = pred | fld.is_null()
+        expr = pred if expr is None else (expr & pred)
+    return expr
+
+
+class ColumnarStore:
+    """
+    Directory of Parquet files, one for each source, and a manifest
+    listing the sources in order. When the store is a copy of a saved
+    output, the manifest also records the size and modification time of
+    the output, so that a store left behind by an earlier run is not used.
+    """
+
+    def __init__(self, store_dir: str | pathlib.Path):
+        self.store_dir = pathlib.Path(store_dir)
+
+    def exists(self) -> bool:
+        return os.path.exists(pathlib.Path(self.store_dir, MANIFEST_FILE))
+
+    def source_path(self, source: str) -> pathlib.Path:
+        return pathlib.Path(
+            self.store_dir, urllib.parse.quote(source, safe="") + ".parquet"
+        )
+
+    def manifest(self) -> typing.Dict[str, typing.Any]:
+        with open(pathlib.Path(self.store_dir, MANIFEST_FILE)) as in_fptr:
+            return json.load(in_fptr)
+
+    def sources(self) -> typing.List[str]:
+        return self.manifest()["sources"]
+
+    def valid(self, source_file: str | pathlib.PurePath) -> bool:
+        # Store is stale if the output was re-written without it
+        if not (self.exists() and os.path.exists(source_file)):
+            return False
+        src_stat = self.manifest().get("source")
+        if src_stat is None:
+            return False
+        fstat = os.stat(source_file)
+        return (
+            fstat.st_size == src_stat["size"]
+            and fstat.st_mtime_ns == src_stat["mtime_ns"]
+        )
+
+    def dump(
+        self,
+        source_data: typing.Dict[str, typing.List],
+        row_group_size: int = 4096,
+        source_file: str | pathlib.PurePath | None = None,
+    ) -> None:
+        """
+        Write the store; source_file is the saved output the store is a
+        copy of, which should be written before the store.
+        """
+        import pyarrow.parquet as pq
+
+        if not os.path.exists(self.store_dir):
+            os.makedirs(self.store_dir)
+        for source, records in source_data.items():
+            pq.write_table(
+                records_table(records),
+                self.source_path(source),
+                row_group_size=row_group_size,
+            )
+        manifest: typing.Dict[str, typing.Any] = {"sources": list(source_data.keys())}
+        if source_file is not None:
+            fstat = os.stat(source_file)
+            manifest["source"] = {
+                "size": fstat.st_size,
+                "mtime_ns": fstat.st_mtime_ns,
+            }
+        with open(pathlib.Path(self.store_dir, MANIFEST_FILE), "w") as out_fptr:
+            json.dump(manifest, out_fptr, indent=4)
+
+    def load(
+        self,
+        source: str,
+        columns: typing.Iterable[typing.Sequence[str]] | None = None,
+        filters: typing.Iterable[FilterType] | None = None,
+    ) -> typing.List[typing.Any]:
+        """
+        Load the records of the source.
+
+        Parameters
+        ----------
+        columns : Iterable of paths (optional)
+           Load only the leaf values under these paths (ex. [('ct',
+           'specimen__id')]); records are partial
+        filters : Iterable of (path, bin_op, value) (optional)
+           Filters pushed down to the scan; see filter_expression
+        """
+        import pyarrow as pa
+        import pyarrow.dataset as pads
+
+        dset = pads.dataset(self.source_path(source), format="parquet")
+        schema = dset.schema
+        sel_columns = None
+        if columns is not None and ROOT_KEY not in (schema.metadata or {}):
+            prefixes = [column_name(cpath) for cpath in columns]
+            sel_columns = [
+                col
+                for col in schema.names
+                if any(col == px or col.startswith(px + "/") for px in prefixes)
+            ]
+        expr = filter_expression(schema, filters) if filters else None
+        try:
+            table = dset.to_table(columns=sel_columns, filter=expr)
+        except pa.ArrowException as aex:
+            _log().warning("Filter push down failed for [%s] : %s", source, aex)
+            table = dset.to_table(columns=sel_columns)
+        # Schema metadata is not retained by projections
+        return table_records(table.replace_schema_metadata(schema.metadata))
+
+
+class ColumnarData(collections.abc.Mapping):
+    """
+    Read-only mapping {source : [record, ...]} backed by a ColumnarStore.
+    Full loads of a source are cached; select loads the records matching
+    the filters, which are not cached.
+    """
+
+    def __init__(self, store: ColumnarStore):
+        self.store = store
+        self.source_list = store.sources()
+        self.loaded: typing.Dict[str, typing.List] = {}
+
+    def __getitem__(self, source: str) -> typing.List:
+        if source not in self.source_list:
+            raise KeyError(source)
+        if source not in self.loaded:
+            self.loaded[source] = self.store.load(source)
+        return self.loaded[source]
+
+    def __iter__(self):
+        return iter(self.source_list)
+
+    def __len__(self) -> int:
+        return len(self.source_list)
+
+    def select(
+        self,
+        source: str,
+        columns: typing.Iterable[typing.Sequence[str]] | None = None,
+        filters: typing.Iterable[FilterType] | None = None,
+    ) -> typing.List:
+        if source not in self.source_list:
+            raise KeyError(source)
+        return self.store.load(source, columns, filters)
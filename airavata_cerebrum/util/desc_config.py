@@ -28,9 +28,11 @@ class CfgKeys:
     TYPE = "type"
     INIT_PARAMS = "init_params"
     EXEC_PARAMS = "exec_params"
+    POLICY = "policy"
     TEMPLATES = "templates"
     NODE_KEY = "node_key"
     NETWORK_STRUCT = "network_structure"
+    NETWORK_MAPPED = "network_mapped"
     NETWORK = "network"
     #
     DESCRIPTION_CFG = [DB2MODEL_MAP, SRC_DATA]
@@ -98,7 +100,7 @@ class ModelDescConfig(ModelDescConfigBase):
 
     def load_config(self) -> None:
         for cfg_file in self.config_files[CfgKeys.CONFIG]:
-            cdict = cbmio.load(self.location(cfg_file))
+            cdict = cbmio.load_cached(self.location(cfg_file))
             if cdict:
                 self.update_config(cdict)
 
@@ -107,7 +109,7 @@ class ModelDescConfig(ModelDescConfigBase):
     ) -> None:
         for cfg_key in CfgKeys.DESCRIPTION_CFG:
             for cfg_file in self.config_files[cfg_key]:
-                cdict = cbmio.load(self.location(cfg_file))
+                cdict = cbmio.load_cached(self.location(cfg_file))
                 if cdict:
                     self.update_config(cdict, cfg_key)
 
@@ -122,7 +124,7 @@ class ModelDescConfigTemplate(ModelDescConfigBase):
         super().__init__(**kwargs)
         if CfgKeys.TEMPLATES in self.config_files:
             for cfg_file in self.config_files[CfgKeys.TEMPLATES]:
-                cfg_dict = cbmio.load(self.location(cfg_file))
+                cfg_dict = cbmio.load_cached(self.location(cfg_file))
                 if cfg_dict:
                     self.update_config(cfg_dict, CfgKeys.TEMPLATES)
 
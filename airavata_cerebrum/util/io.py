@@ -1,23 +1,116 @@
+import collections
+import concurrent.futures
+import itertools
 import json
+import logging
+import os
+import pickle
+import threading
 import yaml
 import pathlib
 import typing
+
+# Optional fast/binary serialization backends
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+# libyaml C loader, when PyYAML is built with it
+YamlSafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def _log():
+    return logging.getLogger(__name__)
+
+
 # ----- json files load/save ----------
 #
+def loads_json(json_bytes: bytes) -> typing.Dict:
+    if orjson is not None:
+        try:
+            return orjson.loads(json_bytes)
+        except orjson.JSONDecodeError:
+            # Ex. NaN/Infinity written by json.dump are not valid for orjson
+            pass
+    return json.loads(json_bytes)
+
+
 def load_json(file_name: str | pathlib.PurePath) -> typing.Dict:
-    with open(file_name) as in_fptr:
-        return json.load(in_fptr)
+    with open(file_name, "rb") as in_fptr:
+        return loads_json(in_fptr.read())
 
 
 def dump_json(json_obj: typing.Dict, file_name: str | pathlib.PurePath, indent: int):
     with open(file_name, "w") as out_fptr:
         json.dump(json_obj, out_fptr, indent=indent)
 
+
+def dump_json_stream(
+    kv_iter: typing.Iterable[typing.Tuple[str, typing.Iterable]],
+    file_name: str | pathlib.PurePath,
+    indent: int,
+    window: int = 64,
+) -> None:
+    """
+    Write a dict of lists as JSON, consuming the lists lazily. At most
+    `window` serialized items are held in memory before a write. Output is
+    identical to dump_json of the materialized dict.
+
+    The output is written to '<file_name>.part' and moved to file_name when
+    complete. If an iterator raises, file_name is left unchanged and the
+    '.part' file has the output written until the failure.
+
+    Parameters
+    ----------
+    kv_iter : Iterable of (str, Iterable) pairs
+       Keys and the iterators of the values of the output dict
+    file_name : str | pathlib.PurePath
+       Output file
+    indent : int
+       Indentation used by json.dump
+    window : int
+       Number of items buffered in memory before a write
+    """
+    key_sep = "\n" + " " * indent
+    item_sep = "\n" + " " * (2 * indent)
+    nkeys = 0
+    part_name = str(file_name) + ".part"
+    with open(part_name, "w") as out_fptr:
+        out_fptr.write("{")
+        for key, val_iter in kv_iter:
+            out_fptr.write(("," if nkeys else "") + key_sep + json.dumps(key) + ": [")
+            val_iter = iter(val_iter)
+            nitems = 0
+            while True:
+                chunk = [
+                    json.dumps(vx, indent=indent).replace("\n", item_sep)
+                    for vx in itertools.islice(val_iter, window)
+                ]
+                if not chunk:
+                    break
+                out_fptr.write(
+                    ("," if nitems else "") + item_sep +
+                    ("," + item_sep).join(chunk)
+                )
+                nitems += len(chunk)
+            out_fptr.write((key_sep + "]") if nitems else "]")
+            nkeys += 1
+        out_fptr.write("\n}" if nkeys else "}")
+    os.replace(part_name, file_name)
+
 # ----- yaml files load/save ----------
 #
 def load_yaml(file_name: str | pathlib.PurePath) -> typing.Dict:
     with open(file_name) as in_fptr:
-        return yaml.safe_load(in_fptr)
+        return yaml.load(in_fptr, Loader=YamlSafeLoader)
 
 
 def dump_yaml(json_obj: typing.Dict, file_name: str | pathlib.PurePath, indent: int):
@@ -25,6 +118,77 @@ def dump_yaml(json_obj: typing.Dict, file_name: str | pathlib.PurePath, indent:
         yaml.dump(json_obj, out_fptr, indent=indent)
 
 
+# ----- msgpack files load/save ----------
+#
+def require(backend: typing.Any, package: str) -> typing.Any:
+    if backend is None:
+        raise ImportError(
+            "Package [{}] is required for this output format".format(package)
+        )
+    return backend
+
+
+def loads_msgpack(mp_bytes: bytes) -> typing.Dict:
+    return require(msgpack, "msgpack").unpackb(
+        mp_bytes, raw=False, strict_map_key=False
+    )
+
+
+def dumps_msgpack(json_obj: typing.Dict) -> bytes:
+    return require(msgpack, "msgpack").packb(json_obj, use_bin_type=True)
+
+
+def load_msgpack(file_name: str | pathlib.PurePath) -> typing.Dict:
+    with open(file_name, "rb") as in_fptr:
+        return loads_msgpack(in_fptr.read())
+
+
+def dump_msgpack(json_obj: typing.Dict, file_name: str | pathlib.PurePath):
+    with open(file_name, "wb") as out_fptr:
+        out_fptr.write(dumps_msgpack(json_obj))
+
+
+# ----- zstd compressed files load/save ----------
+#
+def load_zstd(file_name: str | pathlib.PurePath) -> typing.Dict | None:
+    # Format of the compressed content is given by the inner suffix
+    # (ex. db_connect_output.msgpack.zst)
+    inner_suffix = pathlib.PurePath(file_name).with_suffix("").suffix
+    with open(file_name, "rb") as in_fptr:
+        zdctx = require(zstandard, "zstandard").ZstdDecompressor()
+        in_bytes = zdctx.stream_reader(in_fptr).read()
+    match inner_suffix:
+        case ".msgpack":
+            return loads_msgpack(in_bytes)
+        case ".json":
+            return loads_json(in_bytes)
+        case ".yaml" | ".yml":
+            return yaml.load(in_bytes, Loader=YamlSafeLoader)
+        case _:
+            return {}
+
+
+def dump_zstd(
+    json_obj: typing.Dict,
+    file_name: str | pathlib.PurePath,
+    indent: int,
+    level: int = 3,
+):
+    inner_suffix = pathlib.PurePath(file_name).with_suffix("").suffix
+    match inner_suffix:
+        case ".msgpack":
+            out_bytes = dumps_msgpack(json_obj)
+        case ".json":
+            out_bytes = json.dumps(json_obj, indent=indent).encode()
+        case ".yaml" | ".yml":
+            out_bytes = yaml.dump(json_obj, indent=indent).encode()
+        case _:
+            return None
+    zcctx = require(zstandard, "zstandard").ZstdCompressor(level=level)
+    with open(file_name, "wb") as out_fptr:
+        out_fptr.write(zcctx.compress(out_bytes))
+
+
 # 
 def load(file_name: str | pathlib.PurePath) -> typing.Dict | None:
     fp_suffix = pathlib.PurePath(file_name).suffix
@@ -33,10 +197,63 @@ def load(file_name: str | pathlib.PurePath) -> typing.Dict | None:
             return load_yaml(file_name)
         case ".json":
             return load_json(file_name)
+        case ".msgpack":
+            return load_msgpack(file_name)
+        case ".zst":
+            return load_zstd(file_name)
         case _:
             return {}
 
 
+# ----- Cache of parsed files ----------
+#
+# Parsed contents are kept pickled, keyed by the absolute path and
+# validated by the (mtime, size) of the file; each load returns a new copy,
+# so callers may modify it. When the total size of the pickled contents
+# exceeds LOAD_CACHE_MAX_BYTES, the least recently used entries are evicted.
+LOAD_CACHE_MAX_BYTES = 2**26
+_LOAD_CACHE: collections.OrderedDict[str, typing.Tuple[int, int, bytes]] = (
+    collections.OrderedDict()
+)
+_LOAD_CACHE_BYTES = 0
+_LOAD_CACHE_LOCK = threading.Lock()
+
+
+def load_cached(file_name: str | pathlib.PurePath) -> typing.Dict | None:
+    global _LOAD_CACHE_BYTES
+    cache_key = os.path.abspath(file_name)
+    try:
+        fstat = os.stat(cache_key)
+    except OSError:
+        return load(file_name)
+    with _LOAD_CACHE_LOCK:
+        cache_entry = _LOAD_CACHE.get(cache_key)
+        if cache_entry:
+            _LOAD_CACHE.move_to_end(cache_key)
+    if cache_entry and cache_entry[:2] == (fstat.st_mtime_ns, fstat.st_size):
+        return pickle.loads(cache_entry[2])
+    file_data = load(file_name)
+    file_pkl = pickle.dumps(file_data, protocol=pickle.HIGHEST_PROTOCOL)
+    with _LOAD_CACHE_LOCK:
+        prev_entry = _LOAD_CACHE.pop(cache_key, None)
+        if prev_entry:
+            _LOAD_CACHE_BYTES -= len(prev_entry[2])
+        if len(file_pkl) <= LOAD_CACHE_MAX_BYTES:
+            _LOAD_CACHE[cache_key] = (fstat.st_mtime_ns, fstat.st_size, file_pkl)
+            _LOAD_CACHE_BYTES += len(file_pkl)
+        while _LOAD_CACHE_BYTES > LOAD_CACHE_MAX_BYTES:
+            _, lru_entry = _LOAD_CACHE.popitem(last=False)
+            _LOAD_CACHE_BYTES -= len(lru_entry[2])
+    return file_data
+
+
+def clear_load_cache() -> None:
+    global _LOAD_CACHE_BYTES
+    with _LOAD_CACHE_LOCK:
+        _LOAD_CACHE.clear()
+        _LOAD_CACHE_BYTES = 0
+
+
 def dump(json_obj: typing.Dict, file_name: str | pathlib.PurePath, indent: int):
     fpath = pathlib.PurePath(file_name)
     match fpath.suffix:
@@ -44,5 +261,115 @@ def dump(json_obj: typing.Dict, file_name: str | pathlib.PurePath, indent: int):
             return dump_yaml(json_obj, file_name, indent=indent)
         case ".json":
             return dump_json(json_obj, file_name, indent=indent)
+        case ".msgpack":
+            return dump_msgpack(json_obj, file_name)
+        case ".zst":
+            return dump_zstd(json_obj, file_name, indent=indent)
         case _:
             return None
+
+
+def dump_stream(
+    kv_iter: typing.Iterable[typing.Tuple[str, typing.Iterable]],
+    file_name: str | pathlib.PurePath,
+    indent: int,
+    window: int = 64,
+):
+    fpath = pathlib.PurePath(file_name)
+    match fpath.suffix:
+        case ".json":
+            return dump_json_stream(kv_iter, file_name, indent=indent, window=window)
+        case _:
+            # No incremental writer; materialize and fall back to dump
+            return dump(
+                {kx: list(vx) for kx, vx in kv_iter}, file_name, indent=indent
+            )
+
+
+# ----- Background writes ----------
+#
+def copy_containers(json_obj: typing.Any) -> typing.Any:
+    """
+    Copy of the dicts and lists of json_obj; other values are shared.
+    """
+    if type(json_obj) is dict:
+        json_obj = json_obj.copy()
+        for key, value in json_obj.items():
+            if type(value) is dict or type(value) is list:
+                json_obj[key] = copy_containers(value)
+        return json_obj
+    if type(json_obj) is list:
+        return [
+            copy_containers(vx) if (type(vx) is dict or type(vx) is list) else vx
+            for vx in json_obj
+        ]
+    return json_obj
+
+
+class BackgroundWriter:
+    """
+    Runs writes in a background thread, in the order they are submitted.
+    The data is serialized by the write, in the background, and is not
+    copied at submission : it should not be modified while the write is
+    pending (see pending and copy_containers). Failed writes are logged
+    when they fail; their errors are raised by check and wait.
+    """
+
+    def __init__(self):
+        self.executor: concurrent.futures.ThreadPoolExecutor | None = None
+        self.pending_writes: typing.List[concurrent.futures.Future] = []
+        self.lock = threading.Lock()
+
+    def __getstate__(self):
+        # Pending writes stay with the process that submitted them
+        return {}
+
+    def __setstate__(self, state):
+        self.__init__()
+
+    @staticmethod
+    def log_failure(write_future: concurrent.futures.Future) -> None:
+        write_error = write_future.exception()
+        if write_error is not None:
+            _log().error(
+                "Background write failed : %s",
+                write_error,
+                exc_info=(type(write_error), write_error, write_error.__traceback__),
+            )
+
+    def submit(
+        self,
+        write_fn: typing.Callable[..., typing.Any],
+        out_data: typing.Any,
+        *args,
+        **kwargs,
+    ) -> None:
+        with self.lock:
+            if self.executor is None:
+                self.executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="cbm-writer"
+                )
+            write_future = self.executor.submit(write_fn, out_data, *args, **kwargs)
+            write_future.add_done_callback(self.log_failure)
+            self.pending_writes.append(write_future)
+
+    def pending(self) -> bool:
+        with self.lock:
+            return not all(wfx.done() for wfx in self.pending_writes)
+
+    def check(self) -> None:
+        # Raises the error of the first failed write, without waiting
+        with self.lock:
+            done_writes = [wfx for wfx in self.pending_writes if wfx.done()]
+            self.pending_writes = [
+                wfx for wfx in self.pending_writes if not wfx.done()
+            ]
+        for write_future in done_writes:
+            write_future.result()
+
+    def wait(self) -> None:
+        with self.lock:
+            pending, self.pending_writes = self.pending_writes, []
+        concurrent.futures.wait(pending)
+        for write_future in pending:
+            write_future.result()
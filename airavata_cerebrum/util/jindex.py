@@ -0,0 +1,190 @@
+import collections.abc
+import json
+import os
+import pathlib
+import typing
+
+from . import io as cbmio
+
+#
+# Offset index of JSON outputs, for loading sub-trees by JSON pointer.
+#
+# The index is a sidecar file '<output>.idx' listing, for each dict and each
+# value up to max_depth levels, its JSON pointer and the byte range of its
+# text in the output. Values are loaded by parsing only their byte range.
+#
+
+INDEX_SUFFIX = ".idx"
+DICT_NODE = "d"
+VALUE_NODE = "v"
+
+
+def escape_key(key: str) -> str:
+    return key.replace("~", "~0").replace("/", "~1")
+
+
+def json_key(key: typing.Any) -> str:
+    # Non-string keys are converted as json.dump does
+    return key if isinstance(key, str) else json.dumps(key)
+
+
+class IndexedJSONWriter:
+    """
+    Writes the same text as json.dump(json_obj, indent=indent), recording
+    the byte range of the dicts and values up to max_depth levels.
+    Output is ASCII (ensure_ascii), so character and byte offsets agree.
+    """
+
+    def __init__(self, out_fptr: typing.TextIO, indent: int, max_depth: int):
+        self.out_fptr = out_fptr
+        self.indent = " " * indent
+        self.nindent = indent
+        self.max_depth = max_depth
+        self.offset = 0
+        self.entries: typing.List[typing.Tuple[str, int, int, str]] = []
+
+    def emit(self, text: str) -> None:
+        self.out_fptr.write(text)
+        self.offset += len(text)
+
+    def write(self, json_obj: typing.Any, pointer: str = "", depth: int = 0) -> None:
+        start = self.offset
+        if depth < self.max_depth and isinstance(json_obj, dict) and json_obj:
+            entry_index = len(self.entries)
+            self.entries.append((pointer, start, start, DICT_NODE))
+            self.emit("{")
+            for kx, (key, value) in enumerate(json_obj.items()):
+                skey = json_key(key)
+                self.emit(
+                    ("," if kx else "")
+                    + "\n"
+                    + self.indent * (depth + 1)
+                    + json.dumps(skey)
+                    + ": "
+                )
+                self.write(value, pointer + "/" + escape_key(skey), depth + 1)
+            self.emit("\n" + self.indent * depth + "}")
+            self.entries[entry_index] = (pointer, start, self.offset, DICT_NODE)
+            return
+        value_text = json.dumps(json_obj, indent=self.nindent)
+        if depth > 0:
+            value_text = value_text.replace("\n", "\n" + self.indent * depth)
+        self.emit(value_text)
+        self.entries.append((pointer, start, self.offset, VALUE_NODE))
+
+
+def index_path(file_name: str | pathlib.PurePath) -> pathlib.Path:
+    fpath = pathlib.Path(file_name)
+    return fpath.with_name(fpath.name + INDEX_SUFFIX)
+
+
+def dump_json_indexed(
+    json_obj: typing.Dict,
+    file_name: str | pathlib.PurePath,
+    indent: int,
+    max_depth: int = 4,
+) -> None:
+    """
+    Write json_obj as dump_json does, along with the offset index of the
+    dicts and values up to max_depth levels.
+    """
+    with open(file_name, "w") as out_fptr:
+        jwriter = IndexedJSONWriter(out_fptr, indent, max_depth)
+        jwriter.write(json_obj)
+    fstat = os.stat(file_name)
+    with open(index_path(file_name), "w") as out_fptr:
+        json.dump(
+            {
+                "size": fstat.st_size,
+                "mtime_ns": fstat.st_mtime_ns,
+                "entries": jwriter.entries,
+            },
+            out_fptr,
+        )
+
+
+class JSONIndex:
+    def __init__(self, file_name: str | pathlib.PurePath):
+        self.file_name = file_name
+        with open(index_path(file_name)) as in_fptr:
+            index_data = json.load(in_fptr)
+        self.size = index_data["size"]
+        self.mtime_ns = index_data["mtime_ns"]
+        self.spans: typing.Dict[str, typing.Tuple[int, int, str]] = {}
+        self.children: typing.Dict[str, typing.Dict[str, str]] = {}
+        for pointer, start, end, kind in index_data["entries"]:
+            self.spans[pointer] = (start, end, kind)
+            if kind == DICT_NODE:
+                self.children[pointer] = {}
+            if pointer:
+                parent, ekey = pointer.rsplit("/", 1)
+                key = ekey.replace("~1", "/").replace("~0", "~")
+                self.children[parent][key] = pointer
+
+    def valid(self) -> bool:
+        # Index is stale if the output was re-written without it
+        fstat = os.stat(self.file_name)
+        return fstat.st_size == self.size and fstat.st_mtime_ns == self.mtime_ns
+
+    def read(self, pointer: str) -> typing.Any:
+        start, end, _ = self.spans[pointer]
+        with open(self.file_name, "rb") as in_fptr:
+            in_fptr.seek(start)
+            return cbmio.loads_json(in_fptr.read(end - start))
+
+
+class LazyJSON(collections.abc.Mapping):
+    """
+    Read-only view of an indexed JSON dict : sub-dicts are views, and the
+    values are parsed from the file when they are first accessed. Views
+    and values are cached, so that, as with a loaded dict, repeated access
+    returns the same object.
+    """
+
+    def __init__(self, jindex: JSONIndex, pointer: str = ""):
+        self.jindex = jindex
+        self.pointer = pointer
+        self.loaded: typing.Dict[str, typing.Any] = {}
+
+    def __getitem__(self, key: str) -> typing.Any:
+        if key in self.loaded:
+            return self.loaded[key]
+        child_ptr = self.jindex.children[self.pointer][key]
+        if self.jindex.spans[child_ptr][2] == DICT_NODE:
+            value = LazyJSON(self.jindex, child_ptr)
+        else:
+            value = self.jindex.read(child_ptr)
+        self.loaded[key] = value
+        return value
+
+    def __iter__(self):
+        return iter(self.jindex.children[self.pointer])
+
+    def __len__(self) -> int:
+        return len(self.jindex.children[self.pointer])
+
+    def __repr__(self) -> str:
+        return "LazyJSON({}#{})".format(self.jindex.file_name, self.pointer)
+
+    def resolve(self, pointer: str) -> typing.Any:
+        # Value at the JSON pointer, relative to this dict
+        value = self
+        for ekey in pointer.split("/")[1:] if pointer else []:
+            key = ekey.replace("~1", "/").replace("~0", "~")
+            value = value[int(key) if isinstance(value, list) else key]
+        return value
+
+    def materialize(self) -> typing.Dict:
+        return self.jindex.read(self.pointer)
+
+
+def load_lazy(file_name: str | pathlib.PurePath) -> typing.Any:
+    """
+    Lazy view of the output if it has a valid index; otherwise the output
+    is loaded with cbmio.load.
+    """
+    if os.path.exists(index_path(file_name)):
+        jindex = JSONIndex(file_name)
+        if jindex.valid() and jindex.spans[""][2] == DICT_NODE:
+            return LazyJSON(jindex)
+    return cbmio.load(file_name)
@@ -0,0 +1,266 @@
+import logging
+import multiprocessing
+import multiprocessing.managers
+import threading
+import time
+import typing
+
+
+def _log():
+    return logging.getLogger(__name__)
+
+
+class WorkflowCancelled(Exception):
+    pass
+
+
+class StepTimeout(TimeoutError):
+    # A call exceeded the item timeout; retried like any other failure
+    pass
+
+
+class StepDeadlineExceeded(TimeoutError):
+    # The step ran past its deadline; not retried
+    pass
+
+
+# Interval (seconds) at which in-flight calls check for cancellation, and
+# at which copies of a token in worker processes poll the shared state
+CANCEL_POLL_INTERVAL = 0.05
+
+_MANAGER = None
+_MANAGER_LOCK = threading.RLock()
+
+
+def shared_manager() -> multiprocessing.managers.SyncManager:
+    # Started on first use; shuts down with the interpreter
+    global _MANAGER
+    with _MANAGER_LOCK:
+        if _MANAGER is None:
+            _MANAGER = multiprocessing.Manager()
+        return _MANAGER
+
+
+class CancelToken:
+    """
+    Cooperative cancellation : the workflow runner checks the token between
+    steps, items and retries, and raises WorkflowCancelled once it is set.
+    Calls run by a StepPolicy stop waiting when the token is set; the call
+    itself can not be interrupted, and completes in the background.
+
+    Copies of the token sent to worker processes (ex. with db_workers or
+    run_sweep with max_workers) share its state through an event of a
+    multiprocessing manager, which is started when the token is first
+    pickled. Copies (copy, deepcopy) in the same process are the token.
+    """
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.shared_event: typing.Any = None
+        self.polled = 0.0
+
+    def __getstate__(self):
+        with _MANAGER_LOCK:
+            if self.shared_event is None:
+                self.shared_event = shared_manager().Event()
+                if self.event.is_set():
+                    self.shared_event.set()
+        return {"shared_event": self.shared_event}
+
+    def __setstate__(self, state):
+        self.event = threading.Event()
+        self.shared_event = state["shared_event"]
+        self.polled = 0.0
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def cancel(self) -> None:
+        self.event.set()
+        if self.shared_event is not None:
+            self.shared_event.set()
+
+    def reset(self) -> None:
+        self.event.clear()
+        if self.shared_event is not None:
+            self.shared_event.clear()
+
+    @property
+    def cancelled(self) -> bool:
+        if self.event.is_set():
+            return True
+        if self.shared_event is None:
+            return False
+        # Shared state is polled at intervals : each poll is a request to
+        # the manager process
+        now = time.monotonic()
+        if now - self.polled < CANCEL_POLL_INTERVAL:
+            return False
+        self.polled = now
+        if self.shared_event.is_set():
+            self.event.set()
+            return True
+        return False
+
+    def check(self) -> None:
+        if self.cancelled:
+            raise WorkflowCancelled()
+
+    def wait(self, timeout: float) -> bool:
+        # Sleep for timeout seconds, or until cancelled; True if cancelled
+        if self.shared_event is None:
+            return self.event.wait(timeout)
+        end_time = time.monotonic() + timeout
+        while not self.cancelled:
+            remaining = end_time - time.monotonic()
+            if remaining <= 0:
+                return False
+            self.event.wait(min(remaining, CANCEL_POLL_INTERVAL))
+        return True
+
+
+def call_with_timeout(
+    call_fn: typing.Callable[[], typing.Any],
+    timeout: float | None,
+    cancel_token: CancelToken | None = None,
+) -> typing.Any:
+    """
+    Call call_fn in a daemon thread, and wait for at most timeout seconds
+    or until cancel_token is set. On timeout, StepTimeout is raised, and
+    WorkflowCancelled on cancellation. The call can not be interrupted :
+    it is abandoned, and its thread keeps running in the background until
+    the call returns (or the interpreter exits).
+    """
+    if timeout is None and cancel_token is None:
+        return call_fn()
+    call_result = {}
+    call_done = threading.Event()
+
+    def call_target():
+        try:
+            call_result["value"] = call_fn()
+        except BaseException as ex:
+            call_result["error"] = ex
+        finally:
+            call_done.set()
+
+    call_thread = threading.Thread(target=call_target, daemon=True)
+    call_thread.start()
+    end_time = None if timeout is None else time.monotonic() + timeout
+    while True:
+        wait_time = CANCEL_POLL_INTERVAL if cancel_token else timeout
+        if end_time is not None:
+            wait_time = max(min(wait_time, end_time - time.monotonic()), 0.0)
+        if call_done.wait(wait_time):
+            break
+        if cancel_token and cancel_token.cancelled:
+            raise WorkflowCancelled()
+        if end_time is not None and time.monotonic() >= end_time:
+            raise StepTimeout("Call timed out after {:.2f} s".format(timeout))
+    if "error" in call_result:
+        raise call_result["error"]
+    return call_result["value"]
+
+
+class StepPolicy:
+    """
+    Retry and timeout policy of a workflow step.
+
+    Parameters
+    ----------
+    retries : int
+       Number of retries after a failed call
+    backoff : float
+       Delay (seconds) before the first retry; doubled for each retry
+    item_timeout : float | None
+       Timeout (seconds) of a call : of each item for per-item steps,
+       and of the whole step otherwise. Calls that time out can not be
+       interrupted : their threads keep running in the background, and
+       retries run alongside them
+    deadline : float | None
+       Maximum run time (seconds) of the step, including the retries
+    """
+
+    def __init__(
+        self,
+        retries: int = 0,
+        backoff: float = 1.0,
+        item_timeout: float | None = None,
+        deadline: float | None = None,
+    ):
+        self.retries = retries
+        self.backoff = backoff
+        self.item_timeout = item_timeout
+        self.deadline = deadline
+
+    @classmethod
+    def from_config(
+        cls, policy_cfg: typing.Dict[str, typing.Any] | None
+    ) -> "StepPolicy | None":
+        if not policy_cfg:
+            return None
+        return cls(
+            retries=int(policy_cfg.get("retries", 0)),
+            backoff=float(policy_cfg.get("backoff", 1.0)),
+            item_timeout=policy_cfg.get("item_timeout"),
+            deadline=policy_cfg.get("deadline"),
+        )
+
+    def deadline_time(self) -> float | None:
+        if self.deadline is None:
+            return None
+        return time.monotonic() + float(self.deadline)
+
+    def call_timeout(self, deadline_time: float | None) -> float | None:
+        if deadline_time is None:
+            return self.item_timeout
+        remaining = deadline_time - time.monotonic()
+        if remaining <= 0:
+            raise StepDeadlineExceeded("Step deadline exceeded")
+        if self.item_timeout is None:
+            return remaining
+        return min(float(self.item_timeout), remaining)
+
+    def call(
+        self,
+        call_fn: typing.Callable[[], typing.Any],
+        label: str,
+        deadline_time: float | None = None,
+        cancel_token: CancelToken | None = None,
+    ) -> typing.Any:
+        attempt = 0
+        while True:
+            if cancel_token:
+                cancel_token.check()
+            timeout = self.call_timeout(deadline_time)
+            try:
+                return call_with_timeout(call_fn, timeout, cancel_token)
+            except (WorkflowCancelled, StepDeadlineExceeded):
+                raise
+            except Exception as ex:
+                if deadline_time is not None and time.monotonic() >= deadline_time:
+                    raise StepDeadlineExceeded(
+                        "Step deadline exceeded : [{}]".format(label)
+                    ) from ex
+                if attempt >= self.retries:
+                    raise
+                delay = self.backoff * (2**attempt)
+                if deadline_time is not None:
+                    delay = max(min(delay, deadline_time - time.monotonic()), 0.0)
+                attempt += 1
+                _log().warning(
+                    "Retry [%d/%d] of [%s] in %.2f s after error : %s",
+                    attempt,
+                    self.retries,
+                    label,
+                    delay,
+                    ex,
+                )
+                if cancel_token:
+                    if cancel_token.wait(delay):
+                        raise WorkflowCancelled() from ex
+                else:
+                    time.sleep(delay)
@@ -0,0 +1,198 @@
+import contextlib
+import json
+import os
+import pathlib
+import threading
+import time
+import typing
+
+
+class StepTrace:
+    """
+    Timing record of a single workflow step.
+
+    wall/cpu are the exclusive (self) times of the step : time spent in the
+    upstream steps while the step pulls its input is not included.
+    """
+
+    def __init__(self, label: str, name: str, step_type: str, nitems_in: int = -1):
+        self.label = label
+        self.name = name
+        self.step_type = step_type
+        self.pid = os.getpid()
+        self.tid = 0
+        self.nitems_in = nitems_in
+        self.nitems_out = 0
+        self.cached = False
+        self.start: float | None = None
+        self.end: float = 0.0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.prev: StepTrace | None = None
+
+    def items_in(self) -> int:
+        if self.nitems_in < 0 and self.prev:
+            return self.prev.nitems_out
+        return self.nitems_in
+
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        return {
+            "label": self.label,
+            "name": self.name,
+            "type": self.step_type,
+            "cached": self.cached,
+            "wall": self.wall,
+            "cpu": self.cpu,
+            "items_in": self.items_in(),
+            "items_out": self.nitems_out,
+        }
+
+
+class Tracer:
+    """
+    Collects StepTrace records of workflow steps; traces can be exported
+    as Chrome trace-event JSON (chrome://tracing, Perfetto) or summarized
+    as a table.
+    """
+
+    SUMMARY_FMT = "{:<40} {:<6} {:>10} {:>10} {:>10} {:>10}"
+
+    def __init__(self):
+        self.epoch = time.perf_counter()
+        self.traces: typing.List[StepTrace] = []
+        # Stack of the open spans of each thread : steps run in threads
+        # (ex. asyncio.to_thread) nest their spans in their own stack
+        self._local = threading.local()
+
+    def __getstate__(self):
+        # Traces recorded in worker processes are merged by value
+        return {"epoch": self.epoch, "traces": self.traces}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+
+    def span_stack(self) -> typing.List[StepTrace]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def new_trace(
+        self,
+        label: str,
+        name: str,
+        step_type: str,
+        in_iter: typing.Iterable | None = None,
+    ) -> StepTrace:
+        nitems_in = len(in_iter) if isinstance(in_iter, typing.Sized) else -1
+        if in_iter is None:
+            nitems_in = 0
+        trace = StepTrace(label, name, step_type, nitems_in)
+        if isinstance(in_iter, TracedIter):
+            # Input count is known only after the input is consumed
+            trace.prev = in_iter.trace
+        self.traces.append(trace)
+        return trace
+
+    def extend(self, traces: typing.Iterable[StepTrace]) -> None:
+        self.traces.extend(traces)
+
+    @contextlib.contextmanager
+    def span(self, trace: StepTrace):
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        if trace.start is None:
+            trace.start = wall_start
+            trace.tid = threading.get_native_id()
+        span_stack = self.span_stack()
+        span_stack.append(trace)
+        try:
+            yield trace
+        finally:
+            span_stack.pop()
+            wall_time = time.perf_counter() - wall_start
+            cpu_time = time.thread_time() - cpu_start
+            trace.end = time.perf_counter()
+            trace.wall += wall_time
+            trace.cpu += cpu_time
+            # Exclude from the step that is pulling from this one
+            if span_stack:
+                span_stack[-1].wall -= wall_time
+                span_stack[-1].cpu -= cpu_time
+
+    def trace_output(
+        self, trace: StepTrace, out_iter: typing.Iterable | None
+    ) -> typing.Iterable | None:
+        if out_iter is None:
+            return None
+        if isinstance(out_iter, typing.Sized):
+            # Materialized outputs are passed as-is; steps (ex. JPointerFilter)
+            # may index them.
+            trace.nitems_out = len(out_iter)
+            return out_iter
+        return TracedIter(self, trace, iter(out_iter))
+
+    def summary(self) -> typing.List[typing.Dict[str, typing.Any]]:
+        return [trace.to_dict() for trace in self.traces]
+
+    def summary_table(self) -> str:
+        rows = [
+            self.SUMMARY_FMT.format(
+                "Step", "Type", "Wall (s)", "CPU (s)", "Items In", "Items Out"
+            )
+        ]
+        for trace in self.traces:
+            rows.append(
+                self.SUMMARY_FMT.format(
+                    trace.label[:40],
+                    "cached" if trace.cached else trace.step_type,
+                    "{:.4f}".format(trace.wall),
+                    "{:.4f}".format(trace.cpu),
+                    trace.items_in(),
+                    trace.nitems_out,
+                )
+            )
+        return "\n".join(rows)
+
+    def chrome_trace(self) -> typing.Dict[str, typing.Any]:
+        trace_events = []
+        for trace in self.traces:
+            start = trace.start if trace.start is not None else self.epoch
+            trace_events.append(
+                {
+                    "name": trace.label,
+                    "cat": trace.step_type,
+                    "ph": "X",
+                    "ts": (start - self.epoch) * 1e6,
+                    "dur": max(trace.end - start, 0.0) * 1e6,
+                    "pid": trace.pid,
+                    "tid": trace.tid,
+                    "args": trace.to_dict(),
+                }
+            )
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def export_chrome(self, file_name: str | pathlib.PurePath) -> None:
+        with open(file_name, "w") as out_fptr:
+            json.dump(self.chrome_trace(), out_fptr, indent=4)
+
+
+class TracedIter:
+    """
+    Iterator of a lazy step output; time spent in producing each item is
+    accounted to the step's trace.
+    """
+
+    def __init__(self, tracer: Tracer, trace: StepTrace, out_iter: typing.Iterator):
+        self.tracer = tracer
+        self.trace = trace
+        self.out_iter = out_iter
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        with self.tracer.span(self.trace):
+            out_item = next(self.out_iter)
+        self.trace.nitems_out += 1
+        return out_item
@@ -1,5 +1,6 @@
 import abc
 import itertools
+import json
 import logging
 import typing
 import types
@@ -11,6 +12,7 @@ from .. import base
 from ..register import find_type
 from ..util.desc_config import CfgKeys, ModelDescConfig, ModelDescConfigTemplate, ModelDescCfgTuple
 from ..model import structure as structure
+from ..model.columnar import NetworkColumns, StructTable
 
 def _log():
     return logging.getLogger(__name__)
@@ -360,14 +362,77 @@ class D2MConnectionsTreeView(ConfigTreeBase):
         return self.tree
 
 class NetworkTreeView(TreeBase):
+    """
+    Tree of the regions, connections and external networks of a network.
+    A NetworkColumns is rendered from its network (to_network); edits of
+    the tree nodes are written back to the rows of the columns, except for
+    the connection end points (pre, post), which are not columns.
+    """
+
     def __init__(
         self,
-        net_struct: structure.Network,
+        net_struct: structure.Network | NetworkColumns,
         left_width="40%",
         **kwargs,
     ) -> None:
         super().__init__(left_width, **kwargs)
+        self.net_columns: NetworkColumns | None = None
+        if isinstance(net_struct, NetworkColumns):
+            self.net_columns = net_struct
+            net_struct = net_struct.to_network()
         self.net_struct = net_struct
+        # Next row of each table : nodes are built in the order of the rows
+        self.table_rows: typing.Dict[str, int] = {}
+
+    def struct_node(
+        self, struct_obj: structure.StructBase, table_name: str
+    ) -> CBTreeNode:
+        tree_node = TreeBase.struct_tree_node(struct_obj)
+        if self.net_columns is not None:
+            row = self.table_rows.get(table_name, 0)
+            self.table_rows[table_name] = row + 1
+            NetworkTreeView.bind_row(
+                tree_node, getattr(self.net_columns, table_name), row
+            )
+        return tree_node
+
+    @staticmethod
+    def bind_row(tree_node: CBTreeNode, table: StructTable, row: int) -> None:
+        # Write the edits of the node's traits to the row of the table
+        def write_column(change):
+            col, value = change["name"], change["new"]
+            match table.schema[col]:
+                case "str":
+                    table[col][row] = table.strings.intern(value)
+                case "json":
+                    try:
+                        value = json.dumps(json.loads(value))
+                    except json.JSONDecodeError:
+                        _log().warning("Invalid JSON for [%s] not written", col)
+                        return
+                    table[col][row] = table.strings.intern(value)
+                case _:
+                    table[col][row] = value
+
+        tree_node.observe(
+            write_column,
+            names=[
+                tname
+                for tname in tree_node.trait_names()
+                if tname in table.schema and tname != "key"
+            ],
+        )
+
+    def write_network(self, change) -> None:
+        # Edits of the network node : fields of the NetworkColumns
+        value = change["new"]
+        if change["name"] == "dims":
+            try:
+                value = json.loads(value)
+            except json.JSONDecodeError:
+                _log().warning("Invalid JSON for [dims] not written")
+                return
+        setattr(self.net_columns, change["name"], value)
 
     def init_region_side_panels(self, net_region: structure.Region) -> None:
         self.panel_dict[net_region.name] = StructSidePanel(net_region)
@@ -406,22 +471,22 @@ class NetworkTreeView(TreeBase):
         return self.panel_dict
 
     def region_node(self, net_region: structure.Region) -> CBTreeNode:
-        region_node = TreeBase.struct_tree_node(net_region)
+        region_node = self.struct_node(net_region, "regions")
         for _, rx_neuron in net_region.neurons.items():
-            neuron_node = TreeBase.struct_tree_node(rx_neuron)
+            neuron_node = self.struct_node(rx_neuron, "neurons")
             for _, nx_model in rx_neuron.neuron_models.items():
-                neuron_node.add_node(TreeBase.struct_tree_node(nx_model))
+                neuron_node.add_node(self.struct_node(nx_model, "neuron_models"))
             region_node.add_node(neuron_node)
         return region_node
 
     def connection_node(self, net_connect: structure.Connection) -> CBTreeNode:
-        connect_node = TreeBase.struct_tree_node(net_connect)
+        connect_node = self.struct_node(net_connect, "connections")
         for _, cx_model in net_connect.connect_models.items():
-            connect_node.add_node(TreeBase.struct_tree_node(cx_model))
+            connect_node.add_node(self.struct_node(cx_model, "connect_models"))
         return connect_node
 
     def ext_network_node(self, ext_net: structure.ExtNetwork) -> CBTreeNode:
-        ext_net_node = TreeBase.struct_tree_node(ext_net)
+        ext_net_node = self.struct_node(ext_net, "ext_networks")
         location_node = CBTreeNode(node_key=ext_net.name + ".locations", name="Regions")
         for _, net_region in ext_net.locations.items():
             location_node.add_node(self.region_node(net_region))
@@ -434,6 +499,9 @@ class NetworkTreeView(TreeBase):
 
     def init_tree(self) -> itree.Tree:
         root_node = TreeBase.struct_tree_node(self.net_struct)
+        self.table_rows.clear()
+        if self.net_columns is not None:
+            root_node.observe(self.write_network, names=["name", "ncells", "dims"])
         location_node = CBTreeNode(node_key="net.locations", name="Regions")
         #
         for _, net_region in self.net_struct.locations.items():
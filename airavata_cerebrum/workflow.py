@@ -1,52 +1,617 @@
+import asyncio
+import concurrent.futures
+import itertools
 import logging
+import time
 import typing
 import tqdm.contrib.logging as tqdm_log
 
 from . import register, base
+from .util.cache import StepCache, digest
+from .util.checkpoint import Checkpoint, ItemCounter, WorkflowCheckpoint
+from .util.colstore import ColumnarData
 from .util.desc_config import CfgKeys
+from .util.policy import CancelToken, StepPolicy
+from .util.trace import Tracer
 
 def _log():
     return logging.getLogger(__name__)
 
 
+class WorkflowContext:
+    """
+    Run options shared by all the steps of workflow runs.
+
+    Parameters
+    ----------
+    step_cache : StepCache | None
+       Cache of step outputs; when set, step outputs are materialized,
+       stored in the cache and replayed on subsequent runs.
+    tracer : Tracer | None
+       Records the time and item counts of each step
+    checkpoint : Checkpoint | None
+       Checkpoint store; when set, step outputs are checkpointed and an
+       interrupted workflow resumes from the last completed step, or from
+       the last completed item for per-item steps. Takes precedence over
+       step_cache.
+    batch_size : int
+       If positive, runs of adjacent xform steps that support batches are
+       applied to chunks of batch_size items with xform_batch. Not used
+       with step_cache or checkpoint.
+    cancel_token : CancelToken | None
+       When the token is cancelled, the running workflows stop with
+       WorkflowCancelled at the next step, item or retry, and calls of
+       steps with a policy stop waiting; also in worker processes.
+    """
+
+    def __init__(
+        self,
+        step_cache: StepCache | None = None,
+        tracer: Tracer | None = None,
+        checkpoint: Checkpoint | None = None,
+        batch_size: int = 0,
+        cancel_token: CancelToken | None = None,
+    ):
+        self.step_cache = step_cache
+        self.tracer = tracer
+        self.checkpoint = checkpoint
+        self.batch_size = batch_size
+        self.cancel_token = cancel_token
+
+
+def cancellable(
+    out_iter: typing.Iterable,
+    cancel_token: CancelToken,
+) -> typing.Iterator:
+    for out_item in out_iter:
+        cancel_token.check()
+        yield out_item
+
+
+def step_callable(
+    wf_step: typing.Dict,
+) -> typing.Callable[[typing.Iterable | None], typing.Iterable | None] | None:
+    # Bound run/xform of the step's object, with the exec params
+    sname = wf_step[CfgKeys.NAME]
+    iparams: typing.Dict[str, typing.Any] = wf_step[CfgKeys.INIT_PARAMS]
+    eparams: typing.Dict[str, typing.Any] = wf_step[CfgKeys.EXEC_PARAMS]
+    match wf_step[CfgKeys.TYPE]:
+        case "query":
+            qobj = register.get_query_object(sname, **iparams)
+            if qobj:
+                return lambda in_iter: qobj.run(in_iter, **eparams)
+        case "xform":
+            fobj = register.get_xform_op_object(sname, **iparams)
+            if fobj:
+                return lambda in_iter: fobj.xform(in_iter, **eparams)
+    return None
+
+
+def policy_items(
+    step_fn: typing.Callable[[typing.Iterable | None], typing.Iterable | None],
+    wf_iter: typing.Iterable,
+    policy: StepPolicy,
+    slabel: str,
+    cancel_token: CancelToken | None = None,
+) -> typing.Iterator:
+    # Per-item step : each item is run (and retried) separately; items
+    # with no output (None or empty) are dropped
+    deadline_time = policy.deadline_time()
+    for in_item in wf_iter:
+        out_items = policy.call(
+            lambda: list(step_fn([in_item]) or []),
+            slabel,
+            deadline_time,
+            cancel_token,
+        )
+        yield from out_items
+
+
+def run_policy_step(
+    wf_step: typing.Dict,
+    wf_iter: typing.Iterable | None,
+    policy: StepPolicy,
+    cancel_token: CancelToken | None = None,
+) -> typing.Iterable | None:
+    """
+    Run the step with the retries and timeouts of the policy. Per-item
+    steps (see base.DbQuery.per_item) are retried for the failed item only,
+    and the output stays lazy; other steps are restarted on the whole
+    input, which is materialized.
+    """
+    sname = wf_step[CfgKeys.NAME]
+    slabel = wf_step[CfgKeys.LABEL] if CfgKeys.LABEL in wf_step else sname
+    step_fn = step_callable(wf_step)
+    if step_fn is None:
+        return run_step(wf_step, wf_iter)
+    step_type = register.find_type(sname)
+    _log().info("Running step with policy : [%s]",  slabel)
+    if wf_iter is not None and step_type and step_type.per_item():
+        return policy_items(step_fn, wf_iter, policy, slabel, cancel_token)
+    if wf_iter is not None and not isinstance(wf_iter, typing.Sized):
+        wf_iter = list(wf_iter)
+
+    def run_list():
+        out_iter = step_fn(wf_iter)
+        return list(out_iter) if out_iter is not None else None
+
+    return policy.call(run_list, slabel, policy.deadline_time(), cancel_token)
+
+
+def run_step(
+    wf_step: typing.Dict,
+    wf_iter: typing.Iterable | None = None,
+    tracer: Tracer | None = None,
+    cancel_token: CancelToken | None = None,
+) -> typing.Iterable | None:
+    sname = wf_step[CfgKeys.NAME]
+    slabel = wf_step[CfgKeys.LABEL] if CfgKeys.LABEL in wf_step else sname
+    iparams: typing.Dict[str, typing.Any] = wf_step[CfgKeys.INIT_PARAMS]
+    eparams: typing.Dict[str, typing.Any] = wf_step[CfgKeys.EXEC_PARAMS]
+    if tracer:
+        trace = tracer.new_trace(slabel, sname, wf_step[CfgKeys.TYPE], wf_iter)
+        with tracer.span(trace):
+            out_iter = run_step(wf_step, wf_iter, cancel_token=cancel_token)
+        if out_iter is wf_iter:
+            return wf_iter
+        return tracer.trace_output(trace, out_iter)
+    if cancel_token:
+        cancel_token.check()
+    policy = StepPolicy.from_config(wf_step.get(CfgKeys.POLICY))
+    if policy:
+        return run_policy_step(wf_step, wf_iter, policy, cancel_token)
+    in_iter = wf_iter
+    match wf_step[CfgKeys.TYPE]:
+        case "query":
+            _log().info("Start Query : [%s]",  slabel)
+            qobj: base.DbQuery | None = register.get_query_object(
+                sname, **iparams
+            )
+            if qobj:
+                wf_iter = qobj.run(wf_iter, **eparams)
+                _log().info("Complete Query : [%s]", slabel)
+            else:
+                _log().error("Failed to find Query : [%s]",  sname)
+        case "xform":
+            _log().info("Running XFormer : [%s]",  slabel)
+            fobj: base.OpXFormer | None = register.get_xform_op_object(
+                sname, **iparams
+            )
+            if fobj and wf_iter:
+                wf_iter = fobj.xform(wf_iter, **eparams)
+                _log().info("Complete XForm : [%s]", slabel)
+            else:
+                _log().error("Failed to find XFormer : [%s]", sname)
+    if (
+        cancel_token
+        and wf_iter is not None
+        and wf_iter is not in_iter
+        and not isinstance(wf_iter, typing.Sized)
+    ):
+        return cancellable(wf_iter, cancel_token)
+    return wf_iter
+
+
+def batch_supported(wf_step: typing.Dict) -> bool:
+    if wf_step[CfgKeys.TYPE] != "xform" or wf_step.get(CfgKeys.POLICY):
+        return False
+    step_type = register.find_type(wf_step[CfgKeys.NAME])
+    return step_type is not None and step_type.supports_batch()
+
+
+def batch_segments(
+    workflow_steps: typing.List[typing.Dict],
+) -> typing.List[typing.List[typing.Dict]]:
+    # Split the workflow into runs of steps; a run of more than one step
+    # consists of adjacent steps that all support batches.
+    segments = []
+    for batched, seg_steps in itertools.groupby(workflow_steps, batch_supported):
+        if batched:
+            segments.append(list(seg_steps))
+        else:
+            segments.extend([wf_step] for wf_step in seg_steps)
+    return segments
+
+
+def run_batched_steps(
+    workflow_steps: typing.List[typing.Dict],
+    wf_iter: typing.Iterable,
+    batch_size: int,
+    tracer: Tracer | None = None,
+    cancel_token: CancelToken | None = None,
+) -> typing.Iterator:
+    """
+    Apply the xform steps to chunks of batch_size items of wf_iter; each
+    chunk passes through all the steps before the next chunk is read.
+    """
+    xf_objs = [
+        register.get_xform_op_object(
+            wf_step[CfgKeys.NAME], **wf_step[CfgKeys.INIT_PARAMS]
+        )
+        for wf_step in workflow_steps
+    ]
+    eparams = [wf_step[CfgKeys.EXEC_PARAMS] for wf_step in workflow_steps]
+    traces = []
+    if tracer:
+        for wf_step in workflow_steps:
+            sname = wf_step[CfgKeys.NAME]
+            slabel = wf_step[CfgKeys.LABEL] if CfgKeys.LABEL in wf_step else sname
+            trace = tracer.new_trace(
+                slabel, sname, wf_step[CfgKeys.TYPE], wf_iter if not traces else None
+            )
+            if traces:
+                trace.nitems_in = -1
+                trace.prev = traces[-1]
+            traces.append(trace)
+    in_iter = iter(wf_iter)
+    while True:
+        out_batch = list(itertools.islice(in_iter, batch_size))
+        if not out_batch:
+            break
+        if cancel_token:
+            cancel_token.check()
+        for step_index, xf_obj in enumerate(xf_objs):
+            if tracer:
+                with tracer.span(traces[step_index]):
+                    out_batch = xf_obj.xform_batch(  # type: ignore
+                        out_batch, **eparams[step_index]
+                    )
+                traces[step_index].nitems_out += len(out_batch)
+            else:
+                out_batch = xf_obj.xform_batch(  # type: ignore
+                    out_batch, **eparams[step_index]
+                )
+            if not out_batch:
+                break
+        yield from out_batch
+
+
+def run_cached_step(
+    wf_step: typing.Dict,
+    wf_iter: typing.Iterable | None,
+    in_digest: str,
+    step_cache: StepCache,
+    tracer: Tracer | None = None,
+    cancel_token: CancelToken | None = None,
+) -> typing.Tuple[typing.Iterable | None, str]:
+    """
+    Run the step through the cache. Returns the step output and the step
+    key, which also serves as the digest of the output for the next step.
+    """
+    sname = wf_step[CfgKeys.NAME]
+    slabel = wf_step[CfgKeys.LABEL] if CfgKeys.LABEL in wf_step else sname
+    step_key = step_cache.step_key(
+        sname,
+        wf_step[CfgKeys.INIT_PARAMS],
+        wf_step[CfgKeys.EXEC_PARAMS],
+        in_digest,
+    )
+    hit, step_output = step_cache.get(step_key)
+    if hit:
+        _log().info("Replay cached step : [%s]", slabel)
+        if tracer:
+            trace = tracer.new_trace(slabel, sname, wf_step[CfgKeys.TYPE], wf_iter)
+            trace.cached = True
+            tracer.trace_output(trace, step_output)
+        return step_output, step_key
+    step_output = run_step(wf_step, wf_iter, tracer, cancel_token)
+    if step_output is wf_iter:
+        # Input is passed through (identity or a missing step) : not cached
+        return step_output, in_digest
+    if step_output is None:
+        return step_output, step_key
+    step_output = list(step_output)
+    step_cache.put(step_key, step_output)
+    return step_output, step_key
+
+
+def complete_checkpoint(
+    wf_iter: typing.Iterable,
+    wf_ckpt: WorkflowCheckpoint,
+) -> typing.Iterator:
+    yield from wf_iter
+    wf_ckpt.clear()
+
+
+def run_checkpointed_workflow(
+    workflow_steps: typing.List[typing.Dict],
+    wf_iter: typing.Iterable | None,
+    wf_ckpt: WorkflowCheckpoint,
+    tracer: Tracer | None = None,
+    cancel_token: CancelToken | None = None,
+) -> typing.Iterable | None:
+    last_done = wf_ckpt.last_done(len(workflow_steps))
+    if last_done >= 0:
+        _log().info("Resume workflow after completed step [%d]", last_done)
+        wf_iter = wf_ckpt.load_done(last_done)
+    for step_index in range(last_done + 1, len(workflow_steps)):
+        wf_step = workflow_steps[step_index]
+        step_type = register.find_type(wf_step[CfgKeys.NAME])
+        replay = []
+        in_counter = None
+        if wf_iter and step_type and step_type.per_item():
+            # Resumed after the input items consumed by the completed items
+            replay = wf_ckpt.load_part(step_index)
+            in_counter = ItemCounter(wf_iter, replay[-1][0] if replay else 0)
+        else:
+            # Partial outputs can be resumed only for per-item steps
+            wf_ckpt.drop_part(step_index)
+        if replay:
+            _log().info(
+                "Resume step [%d] after [%d] completed items of [%d] input items",
+                step_index,
+                len(replay),
+                in_counter.count,  # type: ignore
+            )
+        step_output = run_step(
+            wf_step,
+            in_counter if in_counter is not None else wf_iter,
+            tracer,
+            cancel_token,
+        )
+        if step_output is None:
+            wf_iter = None
+        elif isinstance(step_output, typing.Sized) and not replay:
+            wf_ckpt.save_done(step_index, list(step_output))
+            wf_iter = step_output
+        else:
+            wf_iter = wf_ckpt.item_writer(
+                step_index, step_output, replay, in_counter
+            )
+    if wf_iter is None or isinstance(wf_iter, typing.Sized):
+        wf_ckpt.clear()
+        return wf_iter
+    return complete_checkpoint(wf_iter, wf_ckpt)
+
+
 def run_workflow(
     workflow_steps: typing.List[typing.Dict],
-    wf_iter: typing.Iterable | None = None
+    wf_iter: typing.Iterable | None = None,
+    wf_ctx: WorkflowContext | None = None,
 ) -> typing.Iterable | None:
-    for wf_step in workflow_steps:
-        sname = wf_step[CfgKeys.NAME]
-        slabel = wf_step[CfgKeys.LABEL] if CfgKeys.LABEL in wf_step else sname
-        iparams: typing.Dict[str, typing.Any] = wf_step[CfgKeys.INIT_PARAMS]
-        eparams: typing.Dict[str, typing.Any] = wf_step[CfgKeys.EXEC_PARAMS]
-        match wf_step[CfgKeys.TYPE]:
-            case "query":
-                _log().info("Start Query : [%s]",  slabel)
-                qobj: base.DbQuery | None = register.get_query_object(
-                    sname, **iparams
-                )
-                if qobj:
-                    wf_iter = qobj.run(wf_iter, **eparams)
-                    _log().info("Complete Query : [%s]", slabel)
-                else:
-                    _log().error("Failed to find Query : [%s]",  sname)
-            case "xform":
-                _log().info("Running XFormer : [%s]",  slabel)
-                fobj: base.OpXFormer | None = register.get_xform_op_object(
-                    sname, **iparams
+    tracer = wf_ctx.tracer if wf_ctx else None
+    cancel_token = wf_ctx.cancel_token if wf_ctx else None
+    if wf_ctx is None or (wf_ctx.step_cache is None and wf_ctx.checkpoint is None):
+        if wf_ctx is None or wf_ctx.batch_size <= 0:
+            for wf_step in workflow_steps:
+                wf_iter = run_step(wf_step, wf_iter, tracer, cancel_token)
+            return wf_iter
+        for seg_steps in batch_segments(workflow_steps):
+            if len(seg_steps) > 1 and wf_iter:
+                wf_iter = run_batched_steps(
+                    seg_steps, wf_iter, wf_ctx.batch_size, tracer, cancel_token
                 )
-                if fobj and wf_iter:
-                    wf_iter = fobj.xform(wf_iter, **eparams)
-                    _log().info("Complete XForm : [%s]", slabel)
-                else:
-                    _log().error("Failed to find XFormer : [%s]", sname)
+                continue
+            for wf_step in seg_steps:
+                wf_iter = run_step(wf_step, wf_iter, tracer, cancel_token)
+        return wf_iter
+    # Each step's key is the digest of its output, so the input is hashed
+    # only for the first step.
+    if wf_iter is None:
+        in_digest = digest(None)
+    else:
+        wf_iter = list(wf_iter)
+        in_digest = digest(wf_iter)
+    if wf_ctx.checkpoint:
+        wf_ckpt = wf_ctx.checkpoint.workflow(digest([workflow_steps, in_digest]))
+        return run_checkpointed_workflow(
+            workflow_steps, wf_iter, wf_ckpt, tracer, cancel_token
+        )
+    for wf_step in workflow_steps:
+        wf_iter, in_digest = run_cached_step(
+            wf_step,
+            wf_iter,
+            in_digest,
+            wf_ctx.step_cache,  # type: ignore
+            tracer,
+            cancel_token,
+        )
+    return wf_iter
+
+
+async def arun_step(
+    wf_step: typing.Dict,
+    wf_iter: typing.Iterable | None = None,
+    semaphore: asyncio.Semaphore | None = None,
+    tracer: Tracer | None = None,
+    cancel_token: CancelToken | None = None,
+) -> typing.Iterable | None:
+    # Queries are awaited with arun; xforms are cheap and run in the loop
+    if wf_step[CfgKeys.TYPE] != "query":
+        return run_step(wf_step, wf_iter, tracer, cancel_token)
+    if cancel_token:
+        cancel_token.check()
+    sname = wf_step[CfgKeys.NAME]
+    slabel = wf_step[CfgKeys.LABEL] if CfgKeys.LABEL in wf_step else sname
+    if wf_step.get(CfgKeys.POLICY):
+        # Retries and timeouts are applied by the blocking runner
+        def run_list():
+            out_iter = run_step(wf_step, wf_iter, tracer, cancel_token)
+            return list(out_iter) if out_iter is not None else None
+
+        if semaphore is None:
+            return await asyncio.to_thread(run_list)
+        async with semaphore:
+            return await asyncio.to_thread(run_list)
+    qobj: base.DbQuery | None = register.get_query_object(
+        sname, **wf_step[CfgKeys.INIT_PARAMS]
+    )
+    if qobj is None:
+        _log().error("Failed to find Query : [%s]",  sname)
+        return wf_iter
+    trace = tracer.new_trace(slabel, sname, "query", wf_iter) if tracer else None
+    _log().info("Start Query : [%s]",  slabel)
+    wall_start = time.perf_counter()
+    wf_iter = await qobj.arun(
+        wf_iter, semaphore=semaphore, **wf_step[CfgKeys.EXEC_PARAMS]
+    )
+    _log().info("Complete Query : [%s]", slabel)
+    if trace and tracer:
+        # Other workflows run while the query is awaited : only the wall
+        # time of the query is recorded.
+        trace.start = wall_start
+        trace.end = time.perf_counter()
+        trace.wall = trace.end - wall_start
+        return tracer.trace_output(trace, wf_iter)
     return wf_iter
 
 
+async def arun_workflow(
+    workflow_steps: typing.List[typing.Dict],
+    wf_iter: typing.Iterable | None = None,
+    semaphore: asyncio.Semaphore | None = None,
+    tracer: Tracer | None = None,
+    cancel_token: CancelToken | None = None,
+) -> typing.Iterable | None:
+    """
+    Async variant of run_workflow : query steps are awaited with
+    DbQuery.arun, sharing the semaphore that limits the number of
+    outstanding requests. Step cache and checkpoints are not used; query
+    steps with a policy are run in a worker thread with run_step.
+    """
+    for wf_step in workflow_steps:
+        wf_iter = await arun_step(wf_step, wf_iter, semaphore, tracer, cancel_token)
+    return wf_iter
+
+
+async def arun_db_connect_workflows(
+    source_data_cfg: typing.Dict[str, typing.Any],
+    max_concurrency: int = 16,
+    wf_ctx: WorkflowContext | None = None,
+) -> typing.Dict[str, typing.Any]:
+    """
+    Run the db_connect workflows of all the source databases in the event
+    loop, with at most max_concurrency requests in flight.
+    """
+    tracer = wf_ctx.tracer if wf_ctx else None
+    cancel_token = wf_ctx.cancel_token if wf_ctx else None
+    semaphore = asyncio.Semaphore(max_concurrency)
+    db_names = list(source_data_cfg.keys())
+    db_outputs = await asyncio.gather(
+        *(
+            arun_workflow(
+                source_data_cfg[db_name][CfgKeys.DB_CONNECT][CfgKeys.WORKFLOW],
+                semaphore=semaphore,
+                tracer=tracer,
+                cancel_token=cancel_token,
+            )
+            for db_name in db_names
+        )
+    )
+    return {
+        db_name: list(db_output)
+        for db_name, db_output in zip(db_names, db_outputs)
+        if db_output is not None
+    }
+
+
+def run_async_db_connect_workflows(
+    source_data_cfg: typing.Dict[str, typing.Any],
+    max_concurrency: int = 16,
+    wf_ctx: WorkflowContext | None = None,
+) -> typing.Dict[str, typing.Any]:
+    """
+    Blocking entry point for arun_db_connect_workflows. If called from a
+    running event loop (ex. Jupyter), the workflows are run in a new event
+    loop in a separate thread.
+    """
+    async def db_coro_main():
+        # Blocking requests are run in the default executor of the loop; it
+        # should have as many threads as the allowed outstanding requests.
+        asyncio.get_running_loop().set_default_executor(
+            concurrent.futures.ThreadPoolExecutor(max_workers=max_concurrency)
+        )
+        return await arun_db_connect_workflows(
+            source_data_cfg, max_concurrency, wf_ctx
+        )
+
+    db_coro = db_coro_main()
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(db_coro)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as loop_executor:
+        return loop_executor.submit(asyncio.run, db_coro).result()
+
+
+def db_connect_workflow(
+    db_name: str,
+    db_wcfg: typing.Dict[str, typing.Any],
+    wf_ctx: WorkflowContext | None = None,
+) -> typing.List | None:
+    db_label = db_name
+    if CfgKeys.LABEL in db_wcfg:
+        db_label = db_wcfg[CfgKeys.LABEL]
+    _log().info("Start db_connect workflow for db: [%s]",  db_label)
+    db_output = None
+    with tqdm_log.logging_redirect_tqdm():
+        model_itr = run_workflow(
+            db_wcfg[CfgKeys.DB_CONNECT][CfgKeys.WORKFLOW], wf_ctx=wf_ctx
+        )
+        if model_itr:
+            db_output = list(model_itr)
+    _log().info("Complete db_connect workflow for db: [%s]", db_label)
+    return db_output
+
+
+def db_connect_task(
+    db_name: str,
+    db_wcfg: typing.Dict[str, typing.Any],
+    wf_ctx: WorkflowContext | None = None,
+) -> typing.Tuple[typing.List | None, typing.List]:
+    # Executor task : the traces are returned with the output, since the
+    # tracer of a worker process is a copy.
+    db_output = db_connect_workflow(db_name, db_wcfg, wf_ctx)
+    if wf_ctx and wf_ctx.tracer:
+        return db_output, wf_ctx.tracer.traces
+    return db_output, []
+
+
 def run_db_connect_workflows(
-    source_data_cfg: typing.Dict[str, typing.Any]
+    source_data_cfg: typing.Dict[str, typing.Any],
+    executor: concurrent.futures.Executor | None = None,
+    wf_ctx: WorkflowContext | None = None,
 ) -> typing.Dict[str, typing.Any]:
+    """
+    Run the db_connect workflow of each of the source databases.
+
+    If an executor is given, each database's workflow is submitted to it as
+    a separate task; outputs are merged in the order of source_data_cfg,
+    so the result is the same as the sequential run. With a
+    ProcessPoolExecutor the workflow outputs should be picklable.
+    """
     db_connect_output = {}
     #
+    if executor is None:
+        for db_name, db_wcfg in source_data_cfg.items():
+            db_output = db_connect_workflow(db_name, db_wcfg, wf_ctx)
+            if db_output is not None:
+                db_connect_output[db_name] = db_output
+        return db_connect_output
+    #
+    db_futures = {
+        db_name: executor.submit(db_connect_task, db_name, db_wcfg, wf_ctx)
+        for db_name, db_wcfg in source_data_cfg.items()
+    }
+    for db_name, db_fx in db_futures.items():
+        db_output, db_traces = db_fx.result()
+        if wf_ctx and wf_ctx.tracer:
+            wf_ctx.tracer.extend(db_traces)
+        if db_output is not None:
+            db_connect_output[db_name] = db_output
+    #
+    return db_connect_output
+
+
+def stream_db_connect_workflows(
+    source_data_cfg: typing.Dict[str, typing.Any],
+    wf_ctx: WorkflowContext | None = None,
+) -> typing.Iterator[typing.Tuple[str, typing.Iterable]]:
+    """
+    Lazy variant of run_db_connect_workflows: yields (db_name, iterator)
+    pairs without materializing the workflow outputs. Each iterator should be
+    consumed before the next pair is requested.
+    """
     for db_name, db_wcfg in source_data_cfg.items():
         db_label = db_name
         if CfgKeys.LABEL in db_wcfg:
@@ -54,27 +619,63 @@ def run_db_connect_workflows(
         _log().info("Start db_connect workflow for db: [%s]",  db_label)
         with tqdm_log.logging_redirect_tqdm():
             model_itr = run_workflow(
-                db_wcfg[CfgKeys.DB_CONNECT][CfgKeys.WORKFLOW]
+                db_wcfg[CfgKeys.DB_CONNECT][CfgKeys.WORKFLOW], wf_ctx=wf_ctx
             )
             if model_itr:
-                db_connect_output[db_name] = list(model_itr)
+                yield db_name, model_itr
         _log().info("Complete db_connect workflow for db: [%s]", db_label)
-    #
-    return db_connect_output
+
+
+def pushdown_filters(
+    workflow_steps: typing.List[typing.Dict],
+) -> typing.List:
+    # Conditions of the filter steps at the start of the workflow
+    wf_filters = []
+    for wf_step in workflow_steps:
+        if wf_step[CfgKeys.TYPE] != "xform":
+            break
+        step_type = register.find_type(wf_step[CfgKeys.NAME])
+        step_filters = (
+            step_type.pushdown_filters(**wf_step[CfgKeys.EXEC_PARAMS])  # type: ignore
+            if step_type
+            else None
+        )
+        if step_filters is None:
+            break
+        wf_filters.extend(step_filters)
+    return wf_filters
+
+
+def workflow_input(
+    src_data: typing.Mapping[str, typing.Any],
+    src_db: str,
+    workflow_steps: typing.List[typing.Dict],
+) -> typing.Any:
+    """
+    Input of the workflow from the source data. For data in a columnar
+    store, the conditions of the workflow's leading filters are pushed
+    down to the scan; the filter steps are still run on the result.
+    """
+    if isinstance(src_data, ColumnarData):
+        wf_filters = pushdown_filters(workflow_steps)
+        if wf_filters:
+            return src_data.select(src_db, filters=wf_filters)
+    return src_data[src_db]
 
 
 def run_ops_workflows(
     db_conn_data: typing.Dict[str, typing.Any],
     ops_config_desc: typing.Dict[str, typing.Any],
-    ops_key: str | None = None
+    ops_key: str | None = None,
+    wf_ctx: WorkflowContext | None = None,
 ) -> typing.Dict[str, typing.Any]:
     op_output_data = {}
     for src_db, op_config in ops_config_desc.items():
         _log().info("Start op workflow for db [%s]", src_db)
-        wf_input = db_conn_data[src_db]
         op_desc = op_config[ops_key] if ops_key else op_config
+        wf_input = workflow_input(db_conn_data, src_db, op_desc[CfgKeys.WORKFLOW])
         op_output = list(
-            run_workflow(op_desc[CfgKeys.WORKFLOW], wf_input) # type: ignore
+            run_workflow(op_desc[CfgKeys.WORKFLOW], wf_input, wf_ctx) # type: ignore
         )
         _log().debug(
             "WF Desc: [%s]; WF IN: [%s]; Op output: [%s]",
@@ -87,9 +688,29 @@ def run_ops_workflows(
     return op_output_data
 
 
+def stream_ops_workflows(
+    db_conn_data: typing.Dict[str, typing.Any],
+    ops_config_desc: typing.Dict[str, typing.Any],
+    ops_key: str | None = None,
+    wf_ctx: WorkflowContext | None = None,
+) -> typing.Iterator[typing.Tuple[str, typing.Iterable]]:
+    """
+    Lazy variant of run_ops_workflows: yields (src_db, iterator) pairs
+    without materializing the workflow outputs.
+    """
+    for src_db, op_config in ops_config_desc.items():
+        _log().info("Start op workflow for db [%s]", src_db)
+        op_desc = op_config[ops_key] if ops_key else op_config
+        wf_input = workflow_input(db_conn_data, src_db, op_desc[CfgKeys.WORKFLOW])
+        op_iter = run_workflow(op_desc[CfgKeys.WORKFLOW], wf_input, wf_ctx)
+        yield src_db, op_iter if op_iter else []
+        _log().info("Complete op workflow for db [%s]", src_db)
+
+
 def map_srcdata_locations(
     source_data: typing.Dict[str, typing.Any],
     data2loc_map: typing.Dict[str, typing.Any],
+    wf_ctx: WorkflowContext | None = None,
 ) -> typing.Dict[str, typing.Any]:
     net_locations = {}
     for location, location_desc in data2loc_map.items():
@@ -97,7 +718,7 @@ def map_srcdata_locations(
         for neuron, neuron_dcfg in location_desc.items():
             _log().info("Processing db connection for neuron [%s]", neuron)
             ops_dict = neuron_dcfg[CfgKeys.SRC_DATA]
-            neuron_dc_map = run_ops_workflows(source_data, ops_dict)
+            neuron_dc_map = run_ops_workflows(source_data, ops_dict, wf_ctx=wf_ctx)
             for dkey in neuron_dcfg.keys():
                 if dkey != CfgKeys.SRC_DATA:
                     neuron_dc_map[dkey] = neuron_dcfg[dkey]
@@ -109,13 +730,14 @@ def map_srcdata_locations(
 def map_srcdata_connections(
     source_data: typing.Dict[str, typing.Any],
     data2con_map: typing.Dict[str, typing.Any],
+    wf_ctx: WorkflowContext | None = None,
 ) -> typing.Dict[str, typing.Any]:
     net_connections = {}
     for connx, connx_desc in data2con_map.items():
         conn_desc_map = {}
         _log().info("Processing db data for connex [%s]", connx)
         ops_dict = connx_desc[CfgKeys.SRC_DATA]
-        conn_desc_map = run_ops_workflows(source_data, ops_dict)
+        conn_desc_map = run_ops_workflows(source_data, ops_dict, wf_ctx=wf_ctx)
         for dkey in connx_desc.keys():
             if dkey != CfgKeys.SRC_DATA:
                 conn_desc_map[dkey] = connx_desc[dkey]
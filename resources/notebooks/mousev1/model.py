@@ -221,6 +221,26 @@ class V1BMTKNetworkBuilder:
         self.net: bmtk.builder.NetworkBuilder = bmtk.builder.NetworkBuilder(
             self.net_struct.name
         )
+        # Nodes of each node type (target model), and the properties of the
+        # source nodes of each population; looked up once, when the edges
+        # of the first connection to or from them are added
+        self.type_nodes: typing.Dict[int, bmtk.builder.node_pool.NodePool] = {}
+        self.pop_sources: typing.Dict[str, pd.DataFrame] = {}
+
+    def target_nodes(self, node_type_id: int) -> bmtk.builder.node_pool.NodePool:
+        if node_type_id not in self.type_nodes:
+            self.type_nodes[node_type_id] = self.net.nodes(node_type_id=node_type_id)
+        return self.type_nodes[node_type_id]
+
+    def source_nodes(self, pop_name: str) -> pd.DataFrame:
+        if pop_name not in self.pop_sources:
+            prop_query = ["x", "z", "tuning_angle"]
+            self.net.nodes()  # this line is necessary to activate nodes... (I don't know why.)
+            source_nodes = bmtk.builder.node_pool.NodePool(self.net, pop_name=pop_name)
+            self.pop_sources[pop_name] = pd.DataFrame(
+                [{q: s[q] for q in prop_query} for s in source_nodes]
+            )
+        return self.pop_sources[pop_name]
 
     def add_model_nodes(
         self,
@@ -354,14 +374,9 @@ class V1BMTKNetworkBuilder:
             connex_item.property_map,
         )
 
-        prop_query = ["x", "z", "tuning_angle"]
         src_criteria = {"pop_name": repr(src_type)}
-        self.net.nodes()  # this line is necessary to activate nodes... (I don't know why.)
-        source_nodes = bmtk.builder.node_pool.NodePool(self.net, **src_criteria)
-        print(src_type, trg_type, len(source_nodes), src_trg_params)
-        source_nodes_df = pd.DataFrame(
-            [{q: s[q] for q in prop_query} for s in source_nodes]
-        )
+        source_nodes_df = self.source_nodes(src_criteria["pop_name"])
+        print(src_type, trg_type, len(source_nodes_df), src_trg_params)
         md_pmap = connex_md.property_map
         cx_pmap = connex_item.property_map
 
@@ -518,13 +533,15 @@ class V1BMTKNetworkBuilder:
         lgn_nodes["temporal_freq"] = lgn_nodes["pop_name"].str.extract("TF(\d+)")
         # make a complex version beforehand for easy shift/rotation
         lgn_nodes["xy_complex"] = lgn_nodes["x"] + 1j * lgn_nodes["y"]
-        for lgn_cname, lgn_conn in self.net_struct.connections.items():
-            v1_neuron: structure.Neuron | None = self.net_struct.find_neuron(lgn_cname)
+        lgn_struct = self.net_struct.ext_networks["lgn"]
+        for _, lgn_conn in lgn_struct.connections.items():
+            # Target population, by the key of the connection's end point
+            v1_neuron: structure.Neuron | None = self.net_struct.find_neuron(
+                structure.endpoint_key(lgn_conn.post)
+            )
             if v1_neuron is None:
                 continue
-            lgs_neuron: structure.Neuron | None = self.net_struct.find_neuron(lgn_cname)
-            if lgs_neuron is None:
-                continue
+            lgs_neuron: structure.Neuron = v1_neuron
             for _, lgn_conn_model in lgn_conn.connect_models.items():
                 # target_pop_name = row["population"]
                 target_model_id = int(lgn_conn_model.target_model_id)
@@ -547,7 +564,7 @@ class V1BMTKNetworkBuilder:
                 e4_mean_size = np.exp(np.log(lognorm_scale) + (lognorm_shape**2) / 2)
                 edge_params = {
                     "source": self.lgn_net.nodes(),
-                    "target": self.net.nodes(node_type_id=target_model_id),
+                    "target": self.target_nodes(target_model_id),
                     "iterator": "all_to_one",
                     # TODO: 
                     "connection_rule": select_lgn_sources_powerlaw,
@@ -599,7 +616,7 @@ class V1BMTKNetworkBuilder:
         for _, bkg_connect in bkg_struct.connections.items():
             for _, bkg_model in bkg_connect.connect_models.items():
                 nmodel_id = int(bkg_model.target_model_id)
-                target_nodes = self.net.nodes(node_type_id=nmodel_id)
+                target_nodes = self.target_nodes(nmodel_id)
                 print("bkg", bkg_connect.name, nmodel_id, bkg_model.property_map, len(bkg_net_nodes), len(target_nodes))
                 edge_params = {
                     "source": bkg_net_nodes,
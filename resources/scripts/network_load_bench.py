@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# coding: utf-8
+#
+# Load-time benchmark for Network outputs : full validation vs checksum load
+#
+# Builds the V1L4 network struct (example network with the V1L4 custom mod),
+# replicates its regions and connections to 10x and 100x the size, and
+# writes each to an output with its checksum. Reports the time to load each output with
+# Network.model_validate and with the checksum path (checksum check and
+# model_construct), and checks that both give the same network.
+#
+# Usage: python network_load_bench.py [--scales 1 10 100] [--repeat N]
+
+import argparse
+import pathlib
+import statistics
+import tempfile
+import time
+
+from airavata_cerebrum.model import structure
+from airavata_cerebrum.util import io as cbmio
+from airavata_cerebrum.util import checksum
+
+V1L4_MOD = pathlib.Path(
+    __file__
+).parent.parent / "notebooks" / "v1l4" / "description" / "custom_mod.json"
+
+
+def v1l4_network(mod_file: pathlib.Path) -> structure.Network:
+    net_struct = structure.example_network()
+    net_struct.apply_mod(structure.Network.model_validate(cbmio.load(mod_file)))
+    return net_struct.populate_ncells(30000)
+
+
+def scaled_network(net_struct: structure.Network, scale: int) -> dict:
+    net_data = net_struct.model_dump()
+    for dict_key in ("locations", "connections"):
+        net_data[dict_key] = {
+            "{}#{}".format(dkey, sx) if sx else dkey: dvalue
+            for sx in range(scale)
+            for dkey, dvalue in net_data[dict_key].items()
+        }
+    return net_data
+
+
+def time_load(load_fn, repeat: int) -> float:
+    load_times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        load_fn()
+        load_times.append(time.perf_counter() - start)
+    return statistics.median(load_times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Network load benchmark")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--mod", type=pathlib.Path, default=V1L4_MOD)
+    args = parser.parse_args()
+    #
+    base_net = v1l4_network(args.mod)
+    schema = structure.schema_version()
+    print("{:>6} {:>10} {:>12} {:>12} {:>8}".format(
+        "Scale", "Size (MB)", "Validate (s)", "Checksum (s)", "Speedup"
+    ))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for scale in args.scales:
+            out_file = pathlib.Path(tmp_dir, "network_x{}.json".format(scale))
+            cbmio.dump(scaled_network(base_net, scale), out_file, indent=4)
+            checksum.write_checksum(out_file, schema)
+
+            def validated_load():
+                return structure.Network.model_validate(cbmio.load(out_file))
+
+            def checksum_load():
+                assert checksum.verify_checksum(out_file, schema)
+                return structure.construct_struct(
+                    structure.Network, cbmio.load(out_file)
+                )
+
+            if validated_load().model_dump() != checksum_load().model_dump():
+                raise SystemExit("FAIL: checksum load differs at scale {}".format(scale))
+            validate_time = time_load(validated_load, args.repeat)
+            checksum_time = time_load(checksum_load, args.repeat)
+            print("{:>6} {:>10.2f} {:>12.4f} {:>12.4f} {:>7.1f}x".format(
+                scale,
+                out_file.stat().st_size / 2**20,
+                validate_time,
+                checksum_time,
+                validate_time / checksum_time,
+            ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# coding: utf-8
+#
+# Startup-time benchmark for airavata_cerebrum.register
+#
+# Imports the register (and the modules that the tree view and config
+# loading depend on) in fresh interpreters and reports the import time.
+# Fails if the import takes longer than the given limit, or if any of the
+# heavyweight connector dependencies is imported before a key is resolved.
+#
+# Usage: python register_import_bench.py [--repeat N] [--max-seconds S]
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# Dependencies that should only be imported when a connector is resolved
+HEAVY_MODULES = [
+    "allensdk",
+    "aisynphys",
+    "sqlalchemy",
+    "abc_atlas_access",
+    "anndata",
+    "matplotlib",
+    "numba",
+    "pandas",
+]
+
+IMPORT_SNIPPET = """
+import json, sys, time
+start = time.perf_counter()
+import airavata_cerebrum.register
+import airavata_cerebrum.util.desc_config
+import airavata_cerebrum.workflow
+elapsed = time.perf_counter() - start
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(json.dumps({{"elapsed": elapsed, "heavy": heavy}}))
+"""
+
+RESOLVE_SNIPPET = """
+import json, time
+import airavata_cerebrum.register as register
+start = time.perf_counter()
+qtype = register.find_type({key!r})
+print(json.dumps({{"elapsed": time.perf_counter() - start,
+                  "found": qtype is not None}}))
+"""
+
+
+def run_snippet(snippet: str) -> dict:
+    proc = subprocess.run(
+        [sys.executable, "-c", snippet],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Register import benchmark")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-seconds", type=float, default=1.0)
+    parser.add_argument(
+        "--resolve",
+        default="airavata_cerebrum.operations.dict_filter.IterAttrFilter",
+        help="register key to resolve after the import",
+    )
+    args = parser.parse_args()
+    #
+    import_runs = [
+        run_snippet(IMPORT_SNIPPET.format(heavy=HEAVY_MODULES))
+        for _ in range(args.repeat)
+    ]
+    import_times = [rx["elapsed"] for rx in import_runs]
+    heavy_imported = sorted(set(m for rx in import_runs for m in rx["heavy"]))
+    resolve_run = run_snippet(RESOLVE_SNIPPET.format(key=args.resolve))
+    #
+    print("Import time (s)  : median {:.4f}, max {:.4f}".format(
+        statistics.median(import_times), max(import_times)
+    ))
+    print("Resolve time (s) : {:.4f} [{}]".format(
+        resolve_run["elapsed"], args.resolve
+    ))
+    print("Heavy imports    : {}".format(heavy_imported if heavy_imported else "none"))
+    #
+    failed = False
+    if statistics.median(import_times) > args.max_seconds:
+        print("FAIL: import time exceeds {:.2f} s".format(args.max_seconds))
+        failed = True
+    if heavy_imported:
+        print("FAIL: heavyweight modules imported eagerly")
+        failed = True
+    if not resolve_run["found"]:
+        print("FAIL: key not resolved : {}".format(args.resolve))
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
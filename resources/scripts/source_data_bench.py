@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# coding: utf-8
+#
+# Benchmark of the source data mapping : loaded output vs indexed output
+#
+# Writes the V1L4 source data output with its offset index (index_flag) and
+# times the mapping of the locations and connections of the V1L4 config,
+# from the loaded output (cbmio.load) and from the lazy view of the indexed
+# output (jindex.load_lazy). Load time is included in both. Reports the
+# number of JSON parses of each and checks that both give the same mapping.
+#
+# Usage: python source_data_bench.py [--repeat N]
+
+import argparse
+import pathlib
+import statistics
+import tempfile
+import time
+
+from airavata_cerebrum import workflow
+from airavata_cerebrum.util import io as cbmio
+from airavata_cerebrum.util import jindex
+from airavata_cerebrum.util.desc_config import CfgKeys
+
+V1L4_DESC_DIR = pathlib.Path(
+    __file__
+).parent.parent / "notebooks" / "v1l4" / "description"
+
+PARSE_COUNT = {"parses": 0}
+_LOADS_JSON = cbmio.loads_json
+
+
+def counted_loads(json_bytes):
+    PARSE_COUNT["parses"] += 1
+    return _LOADS_JSON(json_bytes)
+
+
+def map_source_data(src_data, db2model_map):
+    return {
+        "locations": workflow.map_srcdata_locations(
+            src_data, db2model_map[CfgKeys.LOCATIONS]
+        ),
+        "connections": workflow.map_srcdata_connections(
+            src_data, db2model_map[CfgKeys.CONNECTIONS]
+        ),
+    }
+
+
+def time_map(load_fn, db2model_map, repeat: int):
+    map_times = []
+    for _ in range(repeat):
+        PARSE_COUNT["parses"] = 0
+        start = time.perf_counter()
+        map_output = map_source_data(load_fn(), db2model_map)
+        map_times.append(time.perf_counter() - start)
+    return statistics.median(map_times), PARSE_COUNT["parses"], map_output
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Source data mapping benchmark")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--desc-dir", type=pathlib.Path, default=V1L4_DESC_DIR)
+    args = parser.parse_args()
+    #
+    db2model_map = cbmio.load(args.desc_dir / "config.json")[CfgKeys.DB2MODEL_MAP]
+    src_data = cbmio.load(args.desc_dir / "source_data_output.json")
+    cbmio.loads_json = counted_loads
+    print("{:>8} {:>10} {:>8}".format("Output", "Map (s)", "Parses"))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        out_file = pathlib.Path(tmp_dir, "source_data_output.json")
+        jindex.dump_json_indexed(src_data, out_file, indent=4)
+        loaded_time, loaded_parses, loaded_output = time_map(
+            lambda: cbmio.load(out_file), db2model_map, args.repeat
+        )
+        lazy_time, lazy_parses, lazy_output = time_map(
+            lambda: jindex.load_lazy(out_file), db2model_map, args.repeat
+        )
+    if loaded_output != lazy_output:
+        raise SystemExit("FAIL: indexed output gives a different mapping")
+    print("{:>8} {:>10.4f} {:>8}".format("loaded", loaded_time, loaded_parses))
+    print("{:>8} {:>10.4f} {:>8}".format("indexed", lazy_time, lazy_parses))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+import asyncio
+import threading
+import time
+import typing
+
+import pytest
+import traitlets
+
+from airavata_cerebrum import base, register
+from airavata_cerebrum.util.desc_config import CfgKeys
+from airavata_cerebrum.workflow import (
+    arun_workflow,
+    run_async_db_connect_workflows,
+    run_db_connect_workflows,
+    run_workflow,
+)
+
+
+class InFlight:
+    # Blocking item function : later items complete first; records the
+    # largest number of calls in flight
+    def __init__(self, fail_at: int | None = None):
+        self.fail_at = fail_at
+        self.count = 0
+        self.max_count = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, x: int) -> int:
+        with self.lock:
+            self.count += 1
+            self.max_count = max(self.max_count, self.count)
+        time.sleep(0.001 * (10 - x % 10))
+        with self.lock:
+            self.count -= 1
+        if x == self.fail_at:
+            raise RuntimeError("Failed at item {}".format(x))
+        return x * 10
+
+
+class SourceQuery(base.DbQuery):
+    # The given ids; run in a worker thread by the default arun
+    def __init__(self, **params: typing.Any):
+        pass
+
+    def run(self, in_iter: typing.Iterable | None, **params: typing.Any):
+        if params.get("fail"):
+            raise RuntimeError("Failed source")
+        return iter(params["ids"])
+
+    @classmethod
+    def trait_type(cls) -> type[traitlets.HasTraits]:
+        return base.EmptyTraits
+
+
+class ItemQuery(base.DbQuery):
+    # One request per item; the async variant issues them concurrently
+    def __init__(self, **params: typing.Any):
+        pass
+
+    def run(self, in_iter: typing.Iterable | None, **params: typing.Any):
+        item_fn = InFlight(params.get("fail_at"))
+        return [item_fn(x) for x in in_iter or []]
+
+    async def arun(
+        self,
+        in_iter: typing.Iterable | None,
+        semaphore: asyncio.Semaphore | None = None,
+        **params: typing.Any,
+    ) -> typing.Iterable | None:
+        return await base.arun_items(
+            InFlight(params.get("fail_at")), in_iter or [], semaphore
+        )
+
+    @classmethod
+    def trait_type(cls) -> type[traitlets.HasTraits]:
+        return base.EmptyTraits
+
+    @classmethod
+    def item_wise(cls) -> bool:
+        return True
+
+
+register.QUERY_REGISTER.register([SourceQuery, ItemQuery])
+
+
+def query_step(query_cls: type, **exec_params: typing.Any) -> typing.Dict:
+    return {
+        "name": register.class_qual_name(query_cls),
+        "type": "query",
+        "init_params": {},
+        "exec_params": exec_params,
+    }
+
+
+def db_config(
+    fail_db: str | None = None,
+    fail_at: int | None = None,
+) -> typing.Dict[str, typing.Any]:
+    return {
+        db_name: {
+            CfgKeys.DB_CONNECT: {
+                CfgKeys.WORKFLOW: [
+                    query_step(
+                        SourceQuery, ids=list(range(nx)), fail=(db_name == fail_db)
+                    ),
+                    query_step(ItemQuery, fail_at=fail_at),
+                    query_step(ItemQuery) | {"policy": {"retries": 0}},
+                ]
+            }
+        }
+        for db_name, nx in [("db2", 20), ("db1", 5), ("db3", 0)]
+    }
+
+
+def test_arun_items():
+    item_fn = InFlight()
+    out_items = asyncio.run(base.arun_items(item_fn, range(40), asyncio.Semaphore(4)))
+    # Outputs are in the order of the input, not of completion
+    assert out_items == [x * 10 for x in range(40)]
+    assert 1 < item_fn.max_count <= 4
+    assert asyncio.run(base.arun_items(item_fn, [])) == []
+
+
+def test_arun_items_error():
+    with pytest.raises(RuntimeError, match="Failed at item 7"):
+        asyncio.run(
+            base.arun_items(InFlight(fail_at=7), range(20), asyncio.Semaphore(4))
+        )
+
+
+def test_arun():
+    # Default arun is the same as run
+    src_query = SourceQuery()
+    assert asyncio.run(src_query.arun(None, ids=[3, 1, 2])) == [3, 1, 2]
+    with pytest.raises(RuntimeError, match="Failed source"):
+        asyncio.run(src_query.arun(None, asyncio.Semaphore(1), ids=[], fail=True))
+    item_query = ItemQuery()
+    assert asyncio.run(item_query.arun(range(25), asyncio.Semaphore(8))) == list(
+        item_query.run(range(25))
+    )
+
+
+def test_arun_workflow():
+    wf_steps = db_config()["db2"][CfgKeys.DB_CONNECT][CfgKeys.WORKFLOW]
+    expected = list(run_workflow(wf_steps))  # type: ignore
+    assert expected == [x * 100 for x in range(20)]
+    async_out = asyncio.run(arun_workflow(wf_steps, semaphore=asyncio.Semaphore(4)))
+    assert list(async_out) == expected  # type: ignore
+    fail_steps = db_config(fail_at=12)["db2"][CfgKeys.DB_CONNECT][CfgKeys.WORKFLOW]
+    with pytest.raises(RuntimeError, match="Failed at item 12"):
+        asyncio.run(arun_workflow(fail_steps, semaphore=asyncio.Semaphore(4)))
+
+
+def test_async_db_connect():
+    expected = run_db_connect_workflows(db_config())
+    assert list(expected) == ["db2", "db1", "db3"]
+    async_output = run_async_db_connect_workflows(db_config(), max_concurrency=4)
+    # Same merged dict, in the same key order
+    assert async_output == expected
+    assert list(async_output) == list(expected)
+
+    # From a running event loop (ex. Jupyter)
+    async def loop_main():
+        return run_async_db_connect_workflows(db_config(), max_concurrency=4)
+
+    assert asyncio.run(loop_main()) == expected
+
+
+def test_async_db_connect_failure():
+    with pytest.raises(RuntimeError, match="Failed source"):
+        run_async_db_connect_workflows(db_config(fail_db="db1"))
+    with pytest.raises(RuntimeError, match="Failed at item 3"):
+        run_async_db_connect_workflows(db_config(fail_at=3))
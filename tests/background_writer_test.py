@@ -0,0 +1,129 @@
+import concurrent.futures
+import logging
+import pathlib
+import threading
+
+import pydantic
+import pytest
+
+from airavata_cerebrum.model import structure
+from airavata_cerebrum.model.desc import ModelDescription
+from airavata_cerebrum.util import io as cbmio
+from airavata_cerebrum.util.desc_config import CfgKeys, ModelDescConfig
+
+V1L4_DESC_DIR = pathlib.Path(
+    __file__
+).parent.parent / "resources" / "notebooks" / "v1l4" / "description"
+
+
+class WriteFailure(Exception):
+    pass
+
+
+def test_copy_containers():
+    json_obj = {"a": [{"b": 1}, [2, "c"]], "d": {"e": None}, "f": (1, 2)}
+    json_copy = cbmio.copy_containers(json_obj)
+    assert json_copy == json_obj
+    assert json_copy["a"] is not json_obj["a"]
+    assert json_copy["a"][0] is not json_obj["a"][0]
+    assert json_copy["d"] is not json_obj["d"]
+
+
+def test_write_in_background():
+    bg_writer = cbmio.BackgroundWriter()
+    out_data = {"a": [1, 2]}
+    write_calls = []
+
+    def write_fn(data, key):
+        write_calls.append((data, key, threading.current_thread().name))
+
+    bg_writer.submit(write_fn, out_data, "k")
+    bg_writer.wait()
+    assert not bg_writer.pending()
+    # Data is passed as is, and serialized by the write in the writer thread
+    (data, key, thread_name), = write_calls
+    assert data is out_data and key == "k"
+    assert thread_name.startswith("cbm-writer")
+
+
+def test_write_failure(caplog):
+    bg_writer = cbmio.BackgroundWriter()
+    release = threading.Event()
+    logged = threading.Event()
+
+    def failed_write(data):
+        raise WriteFailure(data)
+
+    class LogEvent(logging.Handler):
+        def emit(self, record):
+            logged.set()
+
+    log_handler = LogEvent(logging.ERROR)
+    logging.getLogger(cbmio.__name__).addHandler(log_handler)
+    try:
+        bg_writer.submit(failed_write, "out")
+        bg_writer.submit(lambda data: release.wait(), None)
+        # Logged when it fails, before the writes are waited for
+        assert logged.wait(5)
+        assert bg_writer.pending()
+        with pytest.raises(WriteFailure):
+            bg_writer.check()
+        release.set()
+        bg_writer.wait()
+    finally:
+        release.set()
+        logging.getLogger(cbmio.__name__).removeHandler(log_handler)
+    assert "Background write failed" in caplog.text
+
+
+class BlockedDescription(ModelDescription):
+    # Writes of the outputs wait to be released; with fail_writes, they fail
+    fail_writes: bool = False
+    _release: threading.Event = pydantic.PrivateAttr(
+        default_factory=threading.Event
+    )
+
+    def write_output(self, out_data, key, columnar=False):
+        self._release.wait(5)
+        if self.fail_writes:
+            raise WriteFailure(key)
+        super().write_output(out_data, key, columnar)
+
+
+@pytest.fixture
+def bg_desc(tmp_path):
+    return BlockedDescription(
+        config=ModelDescConfig(
+            name="v1l4",
+            base_dir=tmp_path,
+            config_files={CfgKeys.CONFIG: ["config.json"]},
+            config_dir=V1L4_DESC_DIR,
+            create_model_dir=True,
+        ),
+        region_mapper=structure.RegionMapper,
+        neuron_mapper=structure.NeuronMapper,
+        connection_mapper=structure.ConnectionMapper,
+        network_builder=object,
+    )
+
+
+def test_take_output_while_writing(bg_desc):
+    out_data = {"src": [{"id": 1}]}
+    bg_desc.keep_output(out_data, CfgKeys.DB_CONNECT)
+    in_data = bg_desc.take_output(CfgKeys.DB_CONNECT)
+    # Input of the next stage can be modified while the output is written
+    assert in_data == out_data and in_data["src"] is not out_data["src"]
+    in_data["src"][0]["id"] = 2
+    bg_desc._release.set()
+    bg_desc.wait_saved()
+    assert cbmio.load(bg_desc.output_location(CfgKeys.DB_CONNECT)) == out_data
+
+
+def test_take_output_after_failure(bg_desc):
+    bg_desc.fail_writes = True
+    bg_desc._release.set()
+    bg_desc.keep_output({"src": []}, CfgKeys.DB_CONNECT)
+    concurrent.futures.wait(bg_desc._writer.pending_writes)
+    # Raised when the kept output is handed over to the next stage
+    with pytest.raises(WriteFailure):
+        bg_desc.take_output(CfgKeys.DB_CONNECT)
@@ -0,0 +1,167 @@
+import copy
+import itertools
+import typing
+
+import pytest
+
+from airavata_cerebrum import register
+from airavata_cerebrum.operations import dict_filter, json_filter
+from airavata_cerebrum.workflow import (
+    WorkflowContext,
+    batch_segments,
+    run_batched_steps,
+    run_workflow,
+)
+
+RECORDS = [
+    {"a": ax, "d": {"x": ax % 3, "y": [ax, "y{}".format(ax)]}}
+    | ({} if ax % 4 else {"e": ax})
+    for ax in range(11)
+]
+FILTER_IN = RECORDS + [None, {}]
+
+# Parameters of the operations that support batches : (init params,
+# exec params, input); filters also get empty records
+BATCH_CASES = {
+    register.class_qual_name(dict_filter.IterAttrMapper): [
+        ({"attribute": "a"}, {}, RECORDS),
+        ({"attribute": "d"}, {}, RECORDS),
+    ],
+    register.class_qual_name(dict_filter.IterAttrFilter): [
+        ({}, {"filters": [["a", "__gt__", 2]]}, FILTER_IN),
+        ({}, {"filters": [["a", "__gt__", 2], ["a", "__lt__", 9]]}, FILTER_IN),
+        ({}, {"key": "d", "filters": [["x", "__eq__", 1]]}, FILTER_IN),
+    ],
+    register.class_qual_name(json_filter.IterJPatchFilter): [
+        ({}, {"filter_exp": "$.d.y[*]", "dest_path": "/d/x"}, FILTER_IN),
+        ({}, {"filter_exp": "$.d.y[0]", "dest_path": "/e"}, FILTER_IN),
+    ],
+    register.class_qual_name(json_filter.IterJPointerFilter): [
+        ({}, {"path": "/d/x"}, FILTER_IN),
+        ({}, {"path": "/e"}, FILTER_IN),
+    ],
+}
+
+
+def xform_step(
+    xform_cls: type,
+    init_params: typing.Dict[str, typing.Any],
+    exec_params: typing.Dict[str, typing.Any],
+) -> typing.Dict[str, typing.Any]:
+    return {
+        "name": register.class_qual_name(xform_cls),
+        "type": "xform",
+        "init_params": init_params,
+        "exec_params": exec_params,
+    }
+
+
+def test_batch_cases():
+    # Every registered operation that supports batches has its cases
+    batch_keys = {
+        xkey
+        for xkey in register.XFORM_REGISTER.keys()
+        if xkey.startswith("airavata_cerebrum.")
+        and register.XFORM_REGISTER.get_type(xkey).supports_batch()  # type: ignore
+    }
+    assert batch_keys <= set(BATCH_CASES)
+
+
+@pytest.mark.parametrize("batch_size", [1, 3, 100])
+@pytest.mark.parametrize(
+    "xform_key, init_params, exec_params, in_records",
+    [
+        (xkey, *xcase)
+        for xkey, xcases in BATCH_CASES.items()
+        for xcase in xcases
+    ],
+)
+def test_xform_batch(xform_key, init_params, exec_params, in_records, batch_size):
+    # Inputs are copied for each run, since patches change their input
+    xf_obj = register.get_xform_op_object(xform_key, **init_params)
+    expected = list(
+        xf_obj.xform(copy.deepcopy(in_records), **exec_params)  # type: ignore
+    )
+    record_wise = [
+        out_rcd
+        for in_rcd in copy.deepcopy(in_records)
+        for out_rcd in xf_obj.xform([in_rcd], **exec_params) or []  # type: ignore
+    ]
+    assert record_wise == expected
+    in_iter = iter(copy.deepcopy(in_records))
+    batched = []
+    while in_batch := list(itertools.islice(in_iter, batch_size)):
+        batched.extend(xf_obj.xform_batch(in_batch, **exec_params))  # type: ignore
+    assert batched == expected
+
+
+@pytest.mark.parametrize("batch_size", [1, 3, 100])
+def test_run_batched_steps(batch_size):
+    wf_steps = [
+        xform_step(json_filter.IterJPointerFilter, {}, {"path": "/d/x"}),
+        xform_step(
+            dict_filter.IterAttrFilter, {}, {"filters": [["a", "__gt__", 2]]}
+        ),
+        xform_step(dict_filter.IterAttrMapper, {"attribute": "d"}, {}),
+        xform_step(dict_filter.IterAttrMapper, {"attribute": "y"}, {}),
+    ]
+    expected = list(run_workflow(wf_steps, copy.deepcopy(RECORDS)))  # type: ignore
+    assert expected == [[ax, "y{}".format(ax)] for ax in range(3, 11)]
+    assert list(
+        run_batched_steps(wf_steps, copy.deepcopy(RECORDS), batch_size)
+    ) == expected
+    # Chunks emptied by a filter are not passed to the next steps
+    assert list(run_batched_steps(wf_steps, [None, {}] * 5, batch_size)) == []
+
+
+def test_batch_segments():
+    b1, b2, b3 = (
+        xform_step(dict_filter.IterAttrMapper, {"attribute": "a"}, {}),
+        xform_step(dict_filter.IterAttrFilter, {}, {"filters": []}),
+        xform_step(json_filter.IterJPointerFilter, {}, {"path": "/a"}),
+    )
+    no_batch = xform_step(json_filter.JPointerFilter, {}, {"paths": [], "keys": []})
+    with_policy = b2 | {"policy": {"retries": 1}}
+    query = {
+        "name": register.class_qual_name(dict_filter.IterAttrMapper),
+        "type": "query",
+        "init_params": {},
+        "exec_params": {},
+    }
+    assert batch_segments([]) == []
+    assert batch_segments([b1]) == [[b1]]
+    assert batch_segments([b1, b2, b3]) == [[b1, b2, b3]]
+    # Steps without batch support, steps with a policy and queries end
+    # the segments
+    assert batch_segments(
+        [b1, b2, no_batch, b3, with_policy, b1, query, b2, b3, b1]
+    ) == [[b1, b2], [no_batch], [b3], [with_policy], [b1], [query], [b2, b3, b1]]
+    assert batch_segments([no_batch, no_batch, b1]) == [
+        [no_batch], [no_batch], [b1]
+    ]
+
+
+@pytest.mark.parametrize("batch_size", [1, 3, 100])
+def test_batched_workflow(batch_size):
+    # Batched segments separated by a step with a policy
+    wf_steps = [
+        xform_step(
+            dict_filter.IterAttrFilter, {}, {"filters": [["a", "__lt__", 9]]}
+        ),
+        xform_step(
+            json_filter.IterJPatchFilter,
+            {},
+            {"filter_exp": "$.d.y[1]", "dest_path": "/d/x"},
+        ),
+        xform_step(dict_filter.IterAttrMapper, {"attribute": "d"}, {})
+        | {"policy": {"retries": 1}},
+        xform_step(json_filter.IterJPointerFilter, {}, {"path": "/x/0"}),
+        xform_step(dict_filter.IterAttrMapper, {"attribute": "x"}, {}),
+    ]
+    assert [len(seg) for seg in batch_segments(wf_steps)] == [2, 1, 2]
+    expected = list(run_workflow(wf_steps, copy.deepcopy(RECORDS)))  # type: ignore
+    assert expected == [["y{}".format(ax)] for ax in range(9)]
+    wf_ctx = WorkflowContext(batch_size=batch_size)
+    assert list(
+        run_workflow(wf_steps, copy.deepcopy(RECORDS), wf_ctx)  # type: ignore
+    ) == expected
@@ -0,0 +1,148 @@
+import typing
+
+import pytest
+import traitlets
+
+from airavata_cerebrum import base, register
+from airavata_cerebrum.util.checkpoint import Checkpoint
+from airavata_cerebrum.workflow import WorkflowContext, run_workflow
+
+
+class ItemQuery(base.DbQuery):
+    # One output per input item; fails at the item fail_at, if set
+    fail_at = None
+    items_run: typing.List[int] = []
+
+    def __init__(self, **params: typing.Any):
+        pass
+
+    def run(self, in_iter: typing.Iterable | None, **params: typing.Any):
+        for x in in_iter or []:
+            if x == ItemQuery.fail_at:
+                raise RuntimeError("Failed at item {}".format(x))
+            ItemQuery.items_run.append(x)
+            yield x * 10
+
+    @classmethod
+    def trait_type(cls) -> type[traitlets.HasTraits]:
+        return base.EmptyTraits
+
+    @classmethod
+    def item_wise(cls) -> bool:
+        return True
+
+
+class DropQuery(base.DbQuery):
+    # Drops the odd items : one output for some of the input items
+    fail_at = None
+    items_run: typing.List[int] = []
+
+    def __init__(self, **params: typing.Any):
+        pass
+
+    def run(self, in_iter: typing.Iterable | None, **params: typing.Any):
+        for x in in_iter or []:
+            if x == DropQuery.fail_at:
+                raise RuntimeError("Failed at item {}".format(x))
+            DropQuery.items_run.append(x)
+            if x % 2 == 0:
+                yield x * 10
+
+    @classmethod
+    def trait_type(cls) -> type[traitlets.HasTraits]:
+        return base.EmptyTraits
+
+    @classmethod
+    def per_item(cls) -> bool:
+        return True
+
+
+class ListQuery(base.DbQuery):
+    # Not item-wise : materialized output
+    nruns = 0
+
+    def __init__(self, **params: typing.Any):
+        pass
+
+    def run(self, in_iter: typing.Iterable | None, **params: typing.Any):
+        ListQuery.nruns += 1
+        return [x + 1 for x in in_iter or []]
+
+    @classmethod
+    def trait_type(cls) -> type[traitlets.HasTraits]:
+        return base.EmptyTraits
+
+
+register.QUERY_REGISTER.register([ItemQuery, DropQuery, ListQuery])
+
+
+def query_step(query_cls: type) -> typing.Dict[str, typing.Any]:
+    return {
+        "name": register.class_qual_name(query_cls),
+        "type": "query",
+        "init_params": {},
+        "exec_params": {},
+    }
+
+
+WORKFLOW = [query_step(ListQuery), query_step(ItemQuery)]
+
+
+def test_resume_after_interruption(tmp_path):
+    wf_ctx = WorkflowContext(checkpoint=Checkpoint(tmp_path))
+    ListQuery.nruns = 0
+    ItemQuery.items_run = []
+    ItemQuery.fail_at = 4
+    with pytest.raises(RuntimeError):
+        list(run_workflow(WORKFLOW, range(6), wf_ctx))
+    assert ItemQuery.items_run == [1, 2, 3]
+    # The completed step and the completed items are not run again
+    ItemQuery.fail_at = None
+    ItemQuery.items_run = []
+    assert list(run_workflow(WORKFLOW, range(6), wf_ctx)) == [
+        10, 20, 30, 40, 50, 60
+    ]
+    assert ListQuery.nruns == 1
+    assert ItemQuery.items_run == [4, 5, 6]
+    # Checkpoints are cleared once the workflow completes
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_input_change_restarts(tmp_path):
+    wf_ctx = WorkflowContext(checkpoint=Checkpoint(tmp_path))
+    ItemQuery.items_run = []
+    ItemQuery.fail_at = 2
+    with pytest.raises(RuntimeError):
+        list(run_workflow(WORKFLOW, range(3), wf_ctx))
+    ItemQuery.fail_at = None
+    ItemQuery.items_run = []
+    assert list(run_workflow(WORKFLOW, range(1, 4), wf_ctx)) == [20, 30, 40]
+    assert ItemQuery.items_run == [2, 3, 4]
+
+
+def test_resume_with_dropped_items(tmp_path):
+    wf_ctx = WorkflowContext(checkpoint=Checkpoint(tmp_path))
+    drop_workflow = [query_step(ListQuery), query_step(DropQuery)]
+    DropQuery.items_run = []
+    DropQuery.fail_at = 6
+    with pytest.raises(RuntimeError):
+        list(run_workflow(drop_workflow, range(8), wf_ctx))
+    assert DropQuery.items_run == [1, 2, 3, 4, 5]
+    # Resumed after the input item of the last completed output : the
+    # dropped item after it is run again
+    DropQuery.fail_at = None
+    DropQuery.items_run = []
+    assert list(run_workflow(drop_workflow, range(8), wf_ctx)) == [
+        20, 40, 60, 80
+    ]
+    assert DropQuery.items_run == [5, 6, 7, 8]
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_glif_queries_per_item():
+    # These queries drop empty input items, and are resumed by item
+    abm_celltypes = pytest.importorskip("airavata_cerebrum.dataset.abm_celltypes")
+    assert not abm_celltypes.CTDbGlifApiQuery.item_wise()
+    assert not abm_celltypes.CTDbGlifApiModelConfigQry.item_wise()
+    assert abm_celltypes.CTDbGlifApiQuery.per_item()
+    assert abm_celltypes.CTDbGlifApiModelConfigQry.per_item()
@@ -0,0 +1,103 @@
+import json
+import pathlib
+
+import pydantic
+import pytest
+
+from airavata_cerebrum.model import structure
+from airavata_cerebrum.model.desc import ModelDescription
+from airavata_cerebrum.util import checksum
+from airavata_cerebrum.util.desc_config import CfgKeys, ModelDescConfig
+
+V1L4_DESC_DIR = pathlib.Path(
+    __file__
+).parent.parent / "resources" / "notebooks" / "v1l4" / "description"
+
+
+@pytest.fixture
+def cksum_desc(tmp_path):
+    return ModelDescription(
+        config=ModelDescConfig(
+            name="v1l4",
+            base_dir=tmp_path,
+            config_files={CfgKeys.CONFIG: ["config.json"]},
+            config_dir=V1L4_DESC_DIR,
+            create_model_dir=True,
+        ),
+        region_mapper=structure.RegionMapper,
+        neuron_mapper=structure.NeuronMapper,
+        connection_mapper=structure.ConnectionMapper,
+        network_builder=object,
+        async_save=False,
+        checksum_load=True,
+    )
+
+
+@pytest.fixture
+def load_paths(monkeypatch):
+    # Loads by construction and by validation
+    load_log = []
+    construct_struct = structure.construct_struct
+
+    def logged_construct(struct_cls, struct_data):
+        if struct_cls is structure.Network:
+            load_log.append("construct")
+        return construct_struct(struct_cls, struct_data)
+
+    def logged_validate(net_data):
+        load_log.append("validate")
+        return structure.Network.__pydantic_validator__.validate_python(net_data)
+
+    monkeypatch.setattr(structure, "construct_struct", logged_construct)
+    monkeypatch.setattr(structure.Network, "model_validate", logged_validate)
+    return load_log
+
+
+def write_network(cksum_desc) -> pathlib.Path:
+    net_struct = structure.example_network().populate_ncells(30000)
+    cksum_desc.write_output(net_struct.model_dump(), CfgKeys.NETWORK_STRUCT)
+    return cksum_desc.output_location(CfgKeys.NETWORK_STRUCT)
+
+
+def test_unchanged_output(cksum_desc, load_paths):
+    net_file = write_network(cksum_desc)
+    assert checksum.checksum_path(net_file).exists()
+    net_struct = cksum_desc.load_network(net_file)
+    assert load_paths == ["construct"]
+    assert net_struct.model_dump() == (
+        structure.example_network().populate_ncells(30000).model_dump()
+    )
+
+
+def test_edited_output(cksum_desc, load_paths):
+    net_file = write_network(cksum_desc)
+    with open(net_file) as in_fptr:
+        net_data = json.load(in_fptr)
+    net_data["ncells"] = 100
+    with open(net_file, "w") as out_fptr:
+        json.dump(net_data, out_fptr, indent=4)
+    assert not checksum.verify_checksum(net_file, structure.schema_version())
+    assert cksum_desc.load_network(net_file).ncells == 100
+    assert load_paths == ["validate"]
+    # Invalid edits are not constructed
+    net_data["ncells"] = "many"
+    with open(net_file, "w") as out_fptr:
+        json.dump(net_data, out_fptr, indent=4)
+    with pytest.raises(pydantic.ValidationError):
+        cksum_desc.load_network(net_file)
+
+
+def test_changed_schema(cksum_desc, load_paths, monkeypatch):
+    net_file = write_network(cksum_desc)
+    monkeypatch.setattr(structure, "schema_version", lambda: "other")
+    cksum_desc.load_network(net_file)
+    assert load_paths == ["validate"]
+
+
+def test_touched_output(cksum_desc, load_paths):
+    # Same content with a new mtime : the digest is checked
+    net_file = write_network(cksum_desc)
+    net_text = net_file.read_bytes()
+    net_file.write_bytes(net_text)
+    cksum_desc.load_network(net_file)
+    assert load_paths == ["construct"]
@@ -0,0 +1,138 @@
+import json
+
+import pytest
+
+from airavata_cerebrum.model import structure
+from airavata_cerebrum.model.desc import ModelDescription
+from airavata_cerebrum.util import io as cbmio
+from airavata_cerebrum.util.colstore import (
+    JSON,
+    OPTIONAL,
+    VALUE,
+    ColumnarData,
+    ColumnarStore,
+    flatten_records,
+    unflatten_row,
+    column_path,
+)
+from airavata_cerebrum.util.desc_config import CfgKeys, ModelDescConfig
+
+pytest.importorskip("pyarrow")
+
+RECORDS = [
+    {"ct": {"id": 1, "line": "Sst-IRES-Cre", "ratio": 0.5}, "tags": ["a"], "note": "x"},
+    {"ct": {"id": 2, "line": "Pvalb-IRES-Cre", "ratio": 1}, "extra": None},
+    {"ct": {"id": 3, "line": "a/b~c", "ratio": 0.25, "empty": {}}, "big": 2**70},
+    {"ct": {"id": 4, "line": "Sst-IRES-Cre", "ratio": None}, "extra": None},
+]
+
+
+def test_flatten_round_trip():
+    columns, modes = flatten_records(RECORDS)
+    assert modes["ct/id"] == VALUE
+    assert modes["tags"] == JSON
+    assert modes["note"] == OPTIONAL
+    # null and missing values in the same column are stored as JSON
+    assert modes["extra"] == JSON
+    # int and float values are stored as JSON
+    assert modes["ct/ratio"] == JSON
+    col_paths = {col: column_path(col) for col in columns}
+    rows = [
+        unflatten_row({col: columns[col][rx] for col in columns}, modes, col_paths)
+        for rx in range(len(RECORDS))
+    ]
+    assert rows == RECORDS
+
+
+def test_store_round_trip(tmp_path):
+    store = ColumnarStore(tmp_path / "store")
+    source_data = {"cells/v1": RECORDS, "names": ["x", 1, {"y": 2}]}
+    store.dump(source_data, row_group_size=2)
+    assert store.sources() == ["cells/v1", "names"]
+    col_data = ColumnarData(store)
+    assert dict(col_data) == source_data
+    assert store.load("cells/v1", columns=[("ct", "id")]) == [
+        {"ct": {"id": rx["ct"]["id"]}} for rx in RECORDS
+    ]
+
+
+def test_filter_pushdown(tmp_path):
+    store = ColumnarStore(tmp_path / "store")
+    store.dump({"cells": RECORDS}, row_group_size=1)
+    col_data = ColumnarData(store)
+    selected = col_data.select(
+        "cells", filters=[(("ct", "line"), "__eq__", "Sst-IRES-Cre")]
+    )
+    assert [rx["ct"]["id"] for rx in selected] == [1, 4]
+    selected = col_data.select(
+        "cells",
+        filters=[(("ct", "id"), "__gt__", 1), (("ct", "line"), "__contains__", "IRES")],
+    )
+    assert [rx["ct"]["id"] for rx in selected] == [2, 4]
+    # Filters on JSON columns are not pushed down : superset of the matches
+    selected = col_data.select("cells", filters=[(("ct", "ratio"), "__lt__", 0.3)])
+    assert len(selected) == len(RECORDS)
+
+
+def test_stale_store(tmp_path):
+    out_file = tmp_path / "out.json"
+    store = ColumnarStore(tmp_path / "store")
+    cbmio.dump({"cells": RECORDS}, out_file, indent=4)
+    store.dump({"cells": RECORDS}, source_file=out_file)
+    assert store.valid(out_file)
+    cbmio.dump({"cells": RECORDS[:2]}, out_file, indent=4)
+    assert not store.valid(out_file)
+    # Stores written without their output are not used
+    store.dump({"cells": RECORDS})
+    assert store.exists() and not store.valid(out_file)
+
+
+@pytest.fixture
+def col_desc(tmp_path):
+    config_dir = tmp_path / "config"
+    config_dir.mkdir()
+    with open(config_dir / "config.json", "w") as out_fptr:
+        json.dump(
+            {
+                CfgKeys.SRC_DATA: {
+                    "cells": {
+                        CfgKeys.DB_CONNECT: {CfgKeys.WORKFLOW: []},
+                        CfgKeys.POST_OPS: {CfgKeys.WORKFLOW: []},
+                    }
+                }
+            },
+            out_fptr,
+        )
+    return ModelDescription(
+        config=ModelDescConfig(
+            name="v1l4",
+            base_dir=tmp_path,
+            config_files={CfgKeys.CONFIG: ["config.json"]},
+            config_dir=config_dir,
+            create_model_dir=True,
+        ),
+        region_mapper=structure.RegionMapper,
+        neuron_mapper=structure.NeuronMapper,
+        connection_mapper=structure.ConnectionMapper,
+        network_builder=object,
+        columnar_flag=True,
+    )
+
+
+def test_rerun_skips_stale_store(col_desc):
+    # Integers beyond 64 bits are not exact in the JSON outputs
+    records = [rx for rx in RECORDS if "big" not in rx]
+    col_desc.write_output({"cells": records}, CfgKeys.DB_CONNECT, columnar=True)
+    col_desc.db_post_ops()
+    col_desc.wait_saved()
+    col_data = col_desc.load_source_data(CfgKeys.SRC_DATA)
+    assert isinstance(col_data, ColumnarData)
+    assert dict(col_data) == {"cells": records}
+    # Rerun with new input; streamed outputs are written only as JSON
+    col_desc.write_output({"cells": records[:1]}, CfgKeys.DB_CONNECT, columnar=True)
+    col_desc.stream_flag = True
+    col_desc.db_post_ops()
+    assert col_desc.columnar_store(CfgKeys.SRC_DATA).exists()
+    src_data = col_desc.load_source_data(CfgKeys.SRC_DATA)
+    assert not isinstance(src_data, ColumnarData)
+    assert dict(src_data) == {"cells": records[:1]}
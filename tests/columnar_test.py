@@ -0,0 +1,86 @@
+import pathlib
+
+import numpy as np
+import pytest
+
+from airavata_cerebrum.model import structure
+from airavata_cerebrum.model.columnar import NetworkColumns
+from airavata_cerebrum.util import io as cbmio
+
+V1L4_MOD = pathlib.Path(
+    __file__
+).parent.parent / "resources" / "notebooks" / "v1l4" / "description" / "custom_mod.json"
+
+
+def v1l4_network() -> structure.Network:
+    net_struct = structure.example_network()
+    net_struct.apply_mod(structure.Network.model_validate(cbmio.load(V1L4_MOD)))
+    return net_struct
+
+
+@pytest.mark.parametrize("net_fn", [structure.example_network, v1l4_network])
+def test_round_trip(net_fn):
+    net_struct = net_fn()
+    net_columns = NetworkColumns.from_network(net_struct)
+    # Regions and connections of the external networks are in the tables
+    assert np.count_nonzero(net_columns.regions["network"] == -1) == len(
+        net_struct.locations
+    )
+    assert np.count_nonzero(net_columns.connections["network"] == -1) == len(
+        net_struct.connections
+    )
+    assert len(net_columns.ext_networks) == len(net_struct.ext_networks)
+    assert net_columns.to_network().model_dump() == net_struct.model_dump()
+
+
+def test_populate_ncells():
+    net_struct = v1l4_network()
+    net_columns = NetworkColumns.from_network(net_struct).populate_ncells(30000)
+    net_struct.populate_ncells(30000)
+    assert net_columns.to_network().model_dump() == net_struct.model_dump()
+
+
+def test_column_update():
+    net_struct = v1l4_network()
+    net_columns = NetworkColumns.from_network(net_struct)
+    sst_mask = net_columns.neurons.equals("name", "('4', 'Sst')")
+    assert np.count_nonzero(sst_mask) == 1
+    net_columns.neurons["fraction"][sst_mask] = 0.5
+    net_update = net_columns.to_network()
+    assert net_update.locations["VISp4"].neurons["('4', 'Sst')"].fraction == 0.5
+    net_struct.locations["VISp4"].neurons["('4', 'Sst')"].fraction = 0.5
+    assert net_update.model_dump() == net_struct.model_dump()
+
+
+def tree_nodes(tree_node, class_name):
+    # Nodes of the struct type, in the order of the tree
+    for child in tree_node.nodes:
+        if type(child).__name__ == class_name:
+            yield child
+        yield from tree_nodes(child, class_name)
+
+
+def test_tree_view_columns():
+    pytest.importorskip("ipytree")
+    from airavata_cerebrum.view.tree import NetworkTreeView
+
+    net_struct = v1l4_network()
+    net_columns = NetworkColumns.from_network(net_struct)
+    col_view = NetworkTreeView(net_columns).build()
+    net_view = NetworkTreeView(net_struct).build()
+    for class_name in ("RegionNode", "NeuronNode", "ConnectionNode"):
+        assert [nx.name for nx in tree_nodes(col_view.tree, class_name)] == [
+            nx.name for nx in tree_nodes(net_view.tree, class_name)
+        ]
+    # Edits of the nodes are written to the rows of the columns
+    sst_row = int(np.flatnonzero(net_columns.neurons.equals("name", "('4', 'Sst')"))[0])
+    sst_node = list(tree_nodes(col_view.tree, "NeuronNode"))[sst_row]
+    sst_node.fraction = 0.5
+    sst_node.dims = '{"depth": 2}'
+    root_node = col_view.tree.nodes[0]
+    root_node.ncells = 7
+    sst_neuron = net_struct.locations["VISp4"].neurons["('4', 'Sst')"]
+    sst_neuron.fraction = 0.5
+    sst_neuron.dims = {"depth": 2}
+    net_struct.ncells = 7
+    assert net_columns.to_network().model_dump() == net_struct.model_dump()
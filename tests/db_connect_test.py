@@ -0,0 +1,101 @@
+import concurrent.futures
+import time
+import typing
+
+import pytest
+import traitlets
+
+from airavata_cerebrum import base, register
+from airavata_cerebrum.util.desc_config import CfgKeys
+from airavata_cerebrum.workflow import run_db_connect_workflows
+
+
+class DelayQuery(base.DbQuery):
+    # Records for the given ids after the given delay; fails if fail is set
+    def __init__(self, **params: typing.Any):
+        pass
+
+    def run(self, in_iter: typing.Iterable | None, **params: typing.Any):
+        time.sleep(params["delay"])
+        if params.get("fail"):
+            raise RuntimeError("Failed source")
+        return [{"id": x, "delay": params["delay"]} for x in params["ids"]]
+
+    @classmethod
+    def trait_type(cls) -> type[traitlets.HasTraits]:
+        return base.EmptyTraits
+
+
+class NoneQuery(base.DbQuery):
+    # Workflow without output
+    def __init__(self, **params: typing.Any):
+        pass
+
+    def run(self, in_iter: typing.Iterable | None, **params: typing.Any):
+        return None
+
+    @classmethod
+    def trait_type(cls) -> type[traitlets.HasTraits]:
+        return base.EmptyTraits
+
+
+register.QUERY_REGISTER.register([DelayQuery, NoneQuery])
+
+
+def query_step(query_cls: type, **exec_params: typing.Any) -> typing.Dict:
+    return {
+        "name": register.class_qual_name(query_cls),
+        "type": "query",
+        "init_params": {},
+        "exec_params": exec_params,
+    }
+
+
+def db_config(fail_db: str | None = None) -> typing.Dict[str, typing.Any]:
+    # Sources listed in the reverse order of their completion
+    src_config = {
+        db_name: {
+            CfgKeys.DB_CONNECT: {
+                CfgKeys.WORKFLOW: [
+                    query_step(
+                        DelayQuery,
+                        ids=list(range(dx + 1)),
+                        delay=0.05 * (3 - dx),
+                        fail=(db_name == fail_db),
+                    )
+                ]
+            }
+        }
+        for dx, db_name in enumerate(["db3", "db1", "db2"])
+    }
+    src_config["empty"] = {
+        CfgKeys.DB_CONNECT: {CfgKeys.WORKFLOW: [query_step(NoneQuery)]}
+    }
+    return src_config
+
+
+@pytest.mark.parametrize(
+    "executor_cls",
+    [concurrent.futures.ThreadPoolExecutor, concurrent.futures.ProcessPoolExecutor],
+)
+def test_parallel_db_connect(executor_cls):
+    seq_output = run_db_connect_workflows(db_config())
+    assert list(seq_output) == ["db3", "db1", "db2"]
+    with executor_cls(max_workers=3) as db_executor:
+        par_output = run_db_connect_workflows(db_config(), db_executor)
+    # Same merged dict, in the same key order
+    assert par_output == seq_output
+    assert list(par_output) == list(seq_output)
+
+
+@pytest.mark.parametrize(
+    "executor_cls",
+    [concurrent.futures.ThreadPoolExecutor, concurrent.futures.ProcessPoolExecutor],
+)
+def test_parallel_db_connect_failure(executor_cls):
+    with pytest.raises(RuntimeError, match="Failed source"):
+        run_db_connect_workflows(db_config("db2"))
+    # Failing source is raised, not dropped from the output
+    with executor_cls(max_workers=3) as db_executor:
+        with pytest.raises(RuntimeError, match="Failed source"):
+            run_db_connect_workflows(db_config("db2"), db_executor)
@@ -0,0 +1,154 @@
+import pathlib
+import pickle
+
+import pytest
+
+from airavata_cerebrum.model import patch, structure
+from airavata_cerebrum.util import io as cbmio
+
+V1L4_MOD = pathlib.Path(
+    __file__
+).parent.parent / "resources" / "notebooks" / "v1l4" / "description" / "custom_mod.json"
+
+
+def v1l4_network() -> structure.Network:
+    net_struct = structure.example_network()
+    net_struct.apply_mod(structure.Network.model_validate(cbmio.load(V1L4_MOD)))
+    return net_struct.populate_ncells(30000)
+
+
+def fresh_fingerprint(net_struct: structure.Network) -> str:
+    return structure.Network.model_validate(net_struct.model_dump()).fingerprint()
+
+
+@pytest.fixture
+def v1l4_net():
+    return v1l4_network()
+
+
+def test_dict_order(v1l4_net):
+    net_data = v1l4_net.model_dump()
+    for dict_key in ("locations", "connections"):
+        net_data[dict_key] = dict(reversed(net_data[dict_key].items()))
+    reordered = structure.Network.model_validate(net_data)
+    assert reordered.fingerprint() == v1l4_net.fingerprint()
+    assert v1l4_net.model_copy(deep=True).fingerprint() == v1l4_net.fingerprint()
+
+
+def test_field_assignment(v1l4_net):
+    net_fp = v1l4_net.fingerprint()
+    neuron = v1l4_net.locations["VISp4"].neurons["('4', 'Sst')"]
+    neuron.N += 1
+    assert v1l4_net.fingerprint() != net_fp
+    assert v1l4_net.fingerprint() == fresh_fingerprint(v1l4_net)
+    neuron.N -= 1
+    assert v1l4_net.fingerprint() == net_fp
+
+
+def test_in_place_edits(v1l4_net):
+    net_fp = v1l4_net.fingerprint()
+    connect = next(iter(v1l4_net.connections.values()))
+    connect.property_map["scale"] = 2.0
+    # In-place edits of the dicts are not detected
+    assert v1l4_net.fingerprint() == net_fp
+    connect.reset_fingerprint()
+    edit_fp = v1l4_net.fingerprint()
+    assert edit_fp != net_fp
+    assert edit_fp == fresh_fingerprint(v1l4_net)
+    region = v1l4_net.locations["VISp4"]
+    region.neurons["New"] = structure.Neuron(ei="e")
+    region.reset_fingerprint()
+    assert v1l4_net.fingerprint() not in (net_fp, edit_fp)
+    assert v1l4_net.fingerprint() == fresh_fingerprint(v1l4_net)
+    del region.neurons["New"]
+    region.reset_fingerprint()
+    assert v1l4_net.fingerprint() == edit_fp
+
+
+def test_edit_path(v1l4_net, monkeypatch):
+    v1l4_net.fingerprint()
+    digest_log = []
+    digest = structure.digest
+
+    def logged_digest(fp_data):
+        digest_log.append(fp_data[0])
+        return digest(fp_data)
+
+    monkeypatch.setattr(structure, "digest", logged_digest)
+    assert v1l4_net.fingerprint() == v1l4_net.fingerprint()
+    assert digest_log == []
+    # Only the structs on the path to the edit are hashed again
+    v1l4_net.locations["VISp4"].neurons["('4', 'Sst')"].N += 1
+    v1l4_net.fingerprint()
+    assert digest_log == ["Neuron", "Region", "Network"]
+
+
+def test_mod_and_patch(v1l4_net):
+    net_fp = v1l4_net.fingerprint()
+    mod_net = structure.Network(
+        locations={
+            "VISp4": structure.Region(
+                name="VISp4",
+                neurons={"('4', 'Sst')": structure.Neuron(ei="i", N=7)},
+            )
+        }
+    )
+    patch_net = v1l4_network()
+    patch_net.fingerprint()
+    v1l4_net.apply_mod(mod_net)
+    assert v1l4_net.fingerprint() != net_fp
+    assert v1l4_net.fingerprint() == fresh_fingerprint(v1l4_net)
+    patch.apply_patch(patch_net, patch.mod_patch(patch_net, mod_net))
+    assert patch_net.fingerprint() == v1l4_net.fingerprint()
+
+
+def test_shared_structs(v1l4_net):
+    net_fp = v1l4_net.fingerprint()
+    filtered = structure.filter_edge_params(v1l4_net, lambda _, cx: cx.pre[1] != "Rorb")
+    assert filtered.fingerprint() == fresh_fingerprint(filtered)
+    assert filtered.fingerprint() != net_fp
+    assert v1l4_net.fingerprint() == net_fp
+    # Edits of a shared struct reset the fingerprints of both networks
+    filter_fp = filtered.fingerprint()
+    assert filtered.locations["VISp4"] is v1l4_net.locations["VISp4"]
+    v1l4_net.locations["VISp4"].ncells += 1
+    assert v1l4_net.fingerprint() == fresh_fingerprint(v1l4_net) != net_fp
+    assert filtered.fingerprint() == fresh_fingerprint(filtered) != filter_fp
+
+
+def test_equality(v1l4_net):
+    # Cached fingerprints and indexes are not compared
+    other_net = v1l4_network()
+    v1l4_net.fingerprint()
+    v1l4_net.find_neuron("('4', 'Sst')")
+    assert v1l4_net == other_net
+    assert other_net == v1l4_net
+    assert patch.diff(v1l4_net, other_net) == []
+    assert patch.diff(v1l4_net, v1l4_net.model_copy(deep=True)) == []
+    other_net.locations["VISp4"].ncells += 1
+    assert v1l4_net != other_net
+
+
+def test_copies(v1l4_net):
+    net_fp = v1l4_net.fingerprint()
+    net_copy = v1l4_net.model_copy(deep=True)
+    assert net_copy._fingerprint is None
+    assert net_copy._index is None
+    net_copy.locations["VISp4"].neurons["('4', 'Sst')"].N += 1
+    assert net_copy.fingerprint() != net_fp
+    assert v1l4_net.fingerprint() == net_fp
+    # Shallow copies share the structs; edits of the copy's fields only
+    # reset the copy
+    shallow = v1l4_net.model_copy(update={"ncells": 1})
+    assert shallow._fingerprint is None
+    assert shallow.fingerprint() == fresh_fingerprint(shallow) != net_fp
+    shallow.ncells = v1l4_net.ncells
+    assert shallow.fingerprint() == net_fp
+    assert v1l4_net.fingerprint() == net_fp
+
+
+def test_pickle(v1l4_net):
+    net_fp = v1l4_net.fingerprint()
+    net_copy = pickle.loads(pickle.dumps(v1l4_net))
+    assert net_copy._fingerprint is None
+    assert net_copy.fingerprint() == net_fp
@@ -0,0 +1,80 @@
+import pathlib
+
+import pytest
+
+from airavata_cerebrum.model import structure
+from airavata_cerebrum.model.desc import ModelDescription
+from airavata_cerebrum.util import checksum
+from airavata_cerebrum.util import io as cbmio
+from airavata_cerebrum.util.desc_config import CfgKeys, ModelDescConfig
+
+V1L4_DESC_DIR = pathlib.Path(
+    __file__
+).parent.parent / "resources" / "notebooks" / "v1l4" / "description"
+
+OUT_FORMATS = ["json", "yaml", "msgpack", "msgpack.zst", "json.zst"]
+
+DB_DATA = {
+    "db1": [
+        {"id": 1, "name": "Rorb", "ratio": 0.25, "flags": [True, False, None]},
+        {"id": 2, "name": "Sst α", "nested": {"x": [[1, 2], []], "y": {}}},
+    ],
+    "db2": [],
+}
+
+
+def format_desc(tmp_path: pathlib.Path, out_format: str) -> ModelDescription:
+    return ModelDescription(
+        config=ModelDescConfig(
+            name="v1l4",
+            base_dir=tmp_path,
+            config_files={CfgKeys.CONFIG: ["config.json"]},
+            config_dir=V1L4_DESC_DIR,
+            create_model_dir=True,
+        ),
+        region_mapper=structure.RegionMapper,
+        neuron_mapper=structure.NeuronMapper,
+        connection_mapper=structure.ConnectionMapper,
+        network_builder=object,
+        out_format=out_format,
+        async_save=False,
+        checksum_load=True,
+    )
+
+
+@pytest.mark.parametrize("out_format", OUT_FORMATS)
+def test_round_trip(tmp_path, out_format):
+    fmt_desc = format_desc(tmp_path, out_format)
+    fmt_desc.write_output(DB_DATA, CfgKeys.DB_CONNECT)
+    out_file = fmt_desc.output_location(CfgKeys.DB_CONNECT)
+    assert out_file.name.endswith("." + out_format)
+    assert out_file.exists()
+    assert fmt_desc.load_output(CfgKeys.DB_CONNECT) == DB_DATA
+    assert fmt_desc.take_output(CfgKeys.DB_CONNECT) == DB_DATA
+    # Networks are loaded by construction while the checksum matches
+    net_struct = structure.example_network().populate_ncells(30000)
+    fmt_desc.write_output(net_struct.model_dump(), CfgKeys.NETWORK_STRUCT)
+    net_file = fmt_desc.output_location(CfgKeys.NETWORK_STRUCT)
+    assert checksum.verify_checksum(net_file, structure.schema_version())
+    assert fmt_desc.load_network(net_file).model_dump() == net_struct.model_dump()
+
+
+@pytest.mark.parametrize("out_format", OUT_FORMATS)
+def test_stream_round_trip(tmp_path, out_format):
+    # Formats other than json are materialized and written by dump
+    out_file = format_desc(tmp_path, out_format).output_location(CfgKeys.DB_CONNECT)
+    cbmio.dump_stream(
+        ((kx, iter(vx)) for kx, vx in DB_DATA.items()), out_file, indent=4, window=1
+    )
+    assert cbmio.load(out_file) == DB_DATA
+
+
+@pytest.mark.parametrize("out_format", OUT_FORMATS)
+def test_non_str_keys(tmp_path, out_format):
+    # msgpack and yaml keep the int keys of dicts; json turns them into str
+    out_file = format_desc(tmp_path, out_format).output_location(CfgKeys.DB_CONNECT)
+    cbmio.dump({"db1": [{1: "a", 2: {3: None}}]}, out_file, indent=4)
+    if out_format.startswith("json"):
+        assert cbmio.load(out_file) == {"db1": [{"1": "a", "2": {"3": None}}]}
+    else:
+        assert cbmio.load(out_file) == {"db1": [{1: "a", 2: {3: None}}]}
@@ -0,0 +1,162 @@
+import pathlib
+
+import pytest
+
+from airavata_cerebrum.model import patch, structure
+from airavata_cerebrum.util import io as cbmio
+
+V1L4_MOD = pathlib.Path(
+    __file__
+).parent.parent / "resources" / "notebooks" / "v1l4" / "description" / "custom_mod.json"
+
+
+@pytest.fixture
+def v1l4_mod():
+    return structure.Network.model_validate(cbmio.load(V1L4_MOD))
+
+
+def scan_neurons(net_struct, neuron_name):
+    return [
+        neuron
+        for region in net_struct.locations.values()
+        for nx_name, neuron in region.neurons.items()
+        if nx_name == neuron_name
+    ]
+
+
+def scan_neuron_models(net_struct, model_id):
+    return [
+        nx_model
+        for region in net_struct.locations.values()
+        for neuron in region.neurons.values()
+        for nx_model in neuron.neuron_models.values()
+        if nx_model.id == model_id
+    ]
+
+
+def scan_connections(net_struct, pre, post):
+    return [
+        connect
+        for connect in net_struct.connections.values()
+        if tuple(connect.pre) == tuple(pre) and tuple(connect.post) == tuple(post)
+    ]
+
+
+def scan_connect_models(net_struct, target_model_id):
+    return [
+        cx_model
+        for connect in net_struct.connections.values()
+        for cx_model in connect.connect_models.values()
+        if cx_model.target_model_id == target_model_id
+    ]
+
+
+def assert_lookups(net_struct):
+    # Index lookups find the same structs, in order, as scans of the network
+    neuron_names = {
+        nx_name
+        for region in net_struct.locations.values()
+        for nx_name in region.neurons
+    }
+    for nx_name in neuron_names | {"missing"}:
+        neurons = scan_neurons(net_struct, nx_name)
+        assert net_struct.find_neuron(nx_name) is (neurons[0] if neurons else None)
+    model_ids = {
+        nx_model.id
+        for region in net_struct.locations.values()
+        for neuron in region.neurons.values()
+        for nx_model in neuron.neuron_models.values()
+    }
+    for model_id in model_ids | {"missing"}:
+        nx_models = scan_neuron_models(net_struct, model_id)
+        assert net_struct.find_neuron_model(model_id) is (
+            nx_models[0] if nx_models else None
+        )
+    for connect in net_struct.connections.values():
+        found = net_struct.find_connections(connect.pre, connect.post)
+        expected = scan_connections(net_struct, connect.pre, connect.post)
+        assert [id(cx) for cx in found] == [id(cx) for cx in expected]
+        for cx_model in connect.connect_models.values():
+            found = net_struct.find_connect_models(cx_model.target_model_id)
+            expected = scan_connect_models(net_struct, cx_model.target_model_id)
+            assert [id(mx) for mx in found] == [id(mx) for mx in expected]
+    assert net_struct.find_connections(("x", "y"), ("x", "y")) == []
+    assert net_struct.find_connect_models("missing") == []
+
+
+def test_lookups_after_apply_mod(v1l4_mod):
+    net_struct = structure.example_network()
+    # Index built before the modification
+    assert_lookups(net_struct)
+    net_struct.apply_mod(v1l4_mod)
+    assert_lookups(net_struct)
+    ckey, connect = next(iter(v1l4_mod.connections.items()))
+    assert any(
+        cx is net_struct.connections[ckey]
+        for cx in net_struct.find_connections(connect.pre, connect.post)
+    )
+
+
+def test_neuron_models_after_apply_mod(v1l4_mod):
+    net_struct = structure.example_network().apply_mod(v1l4_mod)
+    rkey, region = next(iter(net_struct.locations.items()))
+    nkey, neuron = next(iter(region.neurons.items()))
+    assert net_struct.find_neuron_model("m1") is None
+    mod_net = structure.Network(
+        name=net_struct.name,
+        locations={
+            rkey: structure.Region(
+                name=region.name,
+                neurons={
+                    nkey: structure.Neuron(
+                        name=neuron.name,
+                        ei=neuron.ei,
+                        neuron_models={
+                            "m1": structure.NeuronModel(name="m1", id="m1")
+                        },
+                    )
+                },
+            )
+        },
+    )
+    net_struct.apply_mod(mod_net)
+    assert net_struct.find_neuron_model("m1") is neuron.neuron_models["m1"]
+    assert_lookups(net_struct)
+
+
+def test_lookups_after_patch(v1l4_mod):
+    net_struct = structure.example_network()
+    assert_lookups(net_struct)
+    patch.apply_patch(net_struct, patch.mod_patch(net_struct, v1l4_mod))
+    assert_lookups(net_struct)
+
+
+def test_connection_update(v1l4_mod):
+    net_struct = structure.example_network().apply_mod(v1l4_mod)
+    ckey, connect = next(iter(net_struct.connections.items()))
+    old_pre, post = tuple(connect.pre), tuple(connect.post)
+    assert any(cx is connect for cx in net_struct.find_connections(old_pre, post))
+    # Endpoint changed by the modification of the network
+    new_pre = ("4", "Mod")
+    mod_net = structure.Network(
+        name=net_struct.name,
+        connections={
+            ckey: structure.Connection(name=connect.name, pre=new_pre, post=post)
+        },
+    )
+    net_struct.apply_mod(mod_net)
+    assert all(cx is not connect for cx in net_struct.find_connections(old_pre, post))
+    assert net_struct.find_connections(new_pre, post) == [connect]
+    assert_lookups(net_struct)
+
+
+def test_reindex():
+    net_struct = structure.example_network()
+    region = next(iter(net_struct.locations.values()))
+    assert net_struct.find_neuron("Added") is None
+    # Changes other than by apply_mod require reindex
+    region.neurons["Added"] = structure.Neuron(name="Added", ei="e")
+    net_struct.reindex()
+    assert net_struct.find_neuron("Added") is region.neurons["Added"]
+    assert_lookups(net_struct)
+
@@ -0,0 +1,85 @@
+import json
+import pathlib
+
+import pytest
+
+from airavata_cerebrum import workflow
+from airavata_cerebrum.util import io as cbmio
+from airavata_cerebrum.util import jindex
+from airavata_cerebrum.util.desc_config import CfgKeys
+
+V1L4_DESC_DIR = pathlib.Path(
+    __file__
+).parent.parent / "resources" / "notebooks" / "v1l4" / "description"
+
+JSON_DATA = {
+    "cells": [{"id": 1, "name": "a/b"}, {"id": 2, "name": "c~d"}],
+    "regions": {"v1": {"ncells": 10, "layers": {"l4": {}}}, "a/b": 2.5},
+    3: None,
+}
+
+
+@pytest.fixture
+def indexed_file(tmp_path):
+    out_file = tmp_path / "out.json"
+    jindex.dump_json_indexed(JSON_DATA, out_file, indent=4)
+    return out_file
+
+
+@pytest.fixture
+def parse_count(monkeypatch):
+    counter = {"parses": 0}
+    loads_json = cbmio.loads_json
+
+    def counted_loads(json_bytes):
+        counter["parses"] += 1
+        return loads_json(json_bytes)
+
+    monkeypatch.setattr(cbmio, "loads_json", counted_loads)
+    return counter
+
+
+def test_indexed_text(indexed_file):
+    with open(indexed_file) as in_fptr:
+        assert in_fptr.read() == json.dumps(JSON_DATA, indent=4)
+    lazy_data = jindex.load_lazy(indexed_file)
+    assert isinstance(lazy_data, jindex.LazyJSON)
+    assert lazy_data.resolve("/regions/a~1b") == 2.5
+    assert lazy_data.resolve("/cells/0/name") == "a/b"
+    assert lazy_data["regions"].materialize() == JSON_DATA["regions"]
+    assert json.loads(json.dumps(lazy_data.materialize())) == json.loads(
+        json.dumps(JSON_DATA)
+    )
+
+
+def test_stale_index(indexed_file):
+    cbmio.dump({"cells": []}, indexed_file, indent=4)
+    assert not jindex.JSONIndex(indexed_file).valid()
+    assert jindex.load_lazy(indexed_file) == {"cells": []}
+
+
+def test_values_cached(indexed_file, parse_count):
+    lazy_data = jindex.load_lazy(indexed_file)
+    cells = lazy_data["cells"]
+    for _ in range(20):
+        assert lazy_data["cells"] is cells
+        assert lazy_data["regions"]["v1"]["ncells"] == 10
+    assert parse_count["parses"] == 2
+
+
+def test_map_source_data_parses(tmp_path, parse_count):
+    # Mapping runs one workflow for each neuron and connection; each
+    # source is parsed once, as with the loaded output
+    src_data = cbmio.load(V1L4_DESC_DIR / "source_data_output.json")
+    db2model_map = cbmio.load(V1L4_DESC_DIR / "config.json")[CfgKeys.DB2MODEL_MAP]
+    out_file = tmp_path / "source_data_output.json"
+    jindex.dump_json_indexed(src_data, out_file, indent=4)
+    lazy_data = jindex.load_lazy(out_file)
+    parse_count["parses"] = 0
+    lazy_output = workflow.map_srcdata_locations(
+        lazy_data, db2model_map[CfgKeys.LOCATIONS]
+    )
+    assert 0 < parse_count["parses"] <= len(src_data)
+    assert lazy_output == workflow.map_srcdata_locations(
+        src_data, db2model_map[CfgKeys.LOCATIONS]
+    )
@@ -0,0 +1,95 @@
+import json
+import os
+import pickle
+
+import pytest
+
+from airavata_cerebrum.util import io as cbmio
+
+
+@pytest.fixture
+def load_log(monkeypatch):
+    # Files parsed by load, i.e. the cache misses
+    parsed = []
+    load = cbmio.load
+
+    def logged_load(file_name):
+        parsed.append(os.path.basename(file_name))
+        return load(file_name)
+
+    monkeypatch.setattr(cbmio, "load", logged_load)
+    cbmio.clear_load_cache()
+    yield parsed
+    cbmio.clear_load_cache()
+
+
+def write_json(json_file, json_obj, mtime_ns=None):
+    json_file.write_text(json.dumps(json_obj))
+    if mtime_ns is not None:
+        os.utime(json_file, ns=(mtime_ns, mtime_ns))
+
+
+def test_invalidation(tmp_path, load_log):
+    json_file = tmp_path / "cfg.json"
+    write_json(json_file, {"a": 1}, mtime_ns=10**18)
+    assert cbmio.load_cached(json_file) == {"a": 1}
+    assert cbmio.load_cached(str(json_file)) == {"a": 1}
+    assert load_log == ["cfg.json"]
+    # Same size, new mtime
+    write_json(json_file, {"a": 2}, mtime_ns=10**18 + 1)
+    assert cbmio.load_cached(json_file) == {"a": 2}
+    # Same mtime, new size
+    write_json(json_file, {"a": 30}, mtime_ns=10**18 + 1)
+    assert cbmio.load_cached(json_file) == {"a": 30}
+    assert load_log == ["cfg.json"] * 3
+    assert cbmio.load_cached(json_file) == {"a": 30}
+    assert len(load_log) == 3
+    # Missing files raise and are not cached
+    for _ in range(2):
+        with pytest.raises(FileNotFoundError):
+            cbmio.load_cached(tmp_path / "missing.yaml")
+    assert load_log[3:] == ["missing.yaml"] * 2
+
+
+def test_copies(tmp_path, load_log):
+    json_file = tmp_path / "cfg.json"
+    write_json(json_file, {"a": [1, 2], "b": {"c": 3}})
+    first = cbmio.load_cached(json_file)
+    # Changes to a loaded dict do not reach the cache or the other loads
+    first["a"].append(4)
+    first["b"]["c"] = 0
+    first["d"] = 5
+    second = cbmio.load_cached(json_file)
+    assert second == {"a": [1, 2], "b": {"c": 3}}
+    second["a"].clear()
+    assert cbmio.load_cached(json_file) == {"a": [1, 2], "b": {"c": 3}}
+    assert load_log == ["cfg.json"]
+
+
+def test_lru_bound(tmp_path, load_log, monkeypatch):
+    json_files = []
+    for fx in range(4):
+        json_files.append(tmp_path / "cfg{}.json".format(fx))
+        write_json(json_files[-1], {"x": [fx] * 10})
+    entry_size = len(
+        pickle.dumps(cbmio.load(json_files[0]), protocol=pickle.HIGHEST_PROTOCOL)
+    )
+    load_log.clear()
+    # Room for two entries; cfg0 is used after cfg1 is loaded
+    monkeypatch.setattr(cbmio, "LOAD_CACHE_MAX_BYTES", 2 * entry_size)
+    cbmio.load_cached(json_files[0])
+    cbmio.load_cached(json_files[1])
+    cbmio.load_cached(json_files[0])
+    cbmio.load_cached(json_files[2])
+    assert load_log == ["cfg0.json", "cfg1.json", "cfg2.json"]
+    # cfg1 is evicted
+    assert cbmio.load_cached(json_files[0]) == {"x": [0] * 10}
+    assert cbmio.load_cached(json_files[2]) == {"x": [2] * 10}
+    assert len(load_log) == 3
+    assert cbmio.load_cached(json_files[1]) == {"x": [1] * 10}
+    assert load_log[3:] == ["cfg1.json"]
+    # Files larger than the bound are not cached
+    write_json(json_files[3], {"x": list(range(1000))})
+    cbmio.load_cached(json_files[3])
+    cbmio.load_cached(json_files[3])
+    assert load_log[4:] == ["cfg3.json"] * 2
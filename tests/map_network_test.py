@@ -0,0 +1,125 @@
+import concurrent.futures
+import time
+import typing
+
+import pytest
+
+from airavata_cerebrum.model import structure
+
+
+class DescRegionMapper(structure.RegionMapper):
+    def __init__(self, name: str, desc: typing.Dict[str, typing.Dict]):
+        self.name = name
+        self.desc = desc
+
+    def neuron_names(self) -> typing.List[str]:
+        return self.desc["property_map"]["neurons"]
+
+    def map(
+        self, region_neurons: typing.Dict[str, structure.Neuron]
+    ) -> structure.Region | None:
+        # Later regions complete first
+        time.sleep(0.01 * self.desc["property_map"]["delay"])
+        return structure.Region(
+            name=self.name,
+            ncells=self.desc["property_map"]["ncells"],
+            neurons=region_neurons,
+        )
+
+
+class DescNeuronMapper(structure.NeuronMapper):
+    def __init__(self, name: str, desc: typing.Dict[str, typing.Dict]):
+        self.name = name
+        self.desc = desc
+
+    def map(self) -> structure.Neuron | None:
+        return structure.Neuron(
+            name=self.name,
+            ei=self.desc["ei"],
+            fraction=self.desc["fraction"],
+            neuron_models={
+                mname: structure.NeuronModel(name=mname, id=mname)
+                for mname in self.desc["models"]
+            },
+        )
+
+
+class DescConnectionMapper(structure.ConnectionMapper):
+    def __init__(self, name: str, desc: typing.Dict[str, typing.Dict]):
+        self.name = name
+        self.desc = desc
+
+    def map(self) -> structure.Connection | None:
+        time.sleep(0.0001 * self.desc["delay"])
+        return structure.Connection(
+            name=self.name,
+            pre=self.desc["pre"],
+            post=self.desc["post"],
+            probability=self.desc["probability"],
+        )
+
+
+def network_desc(nregions: int, nneurons: int) -> typing.Dict[str, typing.Any]:
+    # Names are not in sorted order, so that sorting would change the order
+    locations = {}
+    neurons = []
+    for rx in range(nregions):
+        rname = "VISp{}".format(nregions - rx)
+        rneurons = ["N{}_{}".format(rname, nregions - nx) for nx in range(nneurons)]
+        neurons.extend((rname, nname) for nname in rneurons)
+        locations[rname] = {
+            nname: {
+                "ei": "e" if nx % 2 else "i",
+                "fraction": 1.0 / (nx + 1),
+                "models": ["m{}_{}".format(nname, mx) for mx in range(nx % 3)],
+            }
+            for nx, nname in enumerate(rneurons)
+        } | {
+            "property_map": {
+                # The last neuron is not mapped
+                "neurons": rneurons[:-1] + ["missing"],
+                "ncells": 100 * (rx + 1),
+                "delay": nregions - rx,
+            }
+        }
+    connections = {
+        "{}->{}".format(pre[1], post[1]): {
+            "pre": pre,
+            "post": post,
+            "probability": 1.0 / (cx + 1),
+            "delay": (len(neurons) - cx) % 7,
+        }
+        for cx, (pre, post) in enumerate(
+            (pre, post) for pre in neurons for post in reversed(neurons)
+        )
+    }
+    return {"locations": locations, "connections": connections}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1000])
+@pytest.mark.parametrize(
+    "executor_cls",
+    [concurrent.futures.ThreadPoolExecutor, concurrent.futures.ProcessPoolExecutor],
+)
+def test_parallel_mapping(executor_cls, chunk_size):
+    net_desc = network_desc(4, 4)
+    mappers = (DescRegionMapper, DescNeuronMapper, DescConnectionMapper)
+    seq_net = structure.srcdata2network(net_desc, "v1", *mappers)
+    assert len(seq_net.locations) == 4
+    assert len(seq_net.connections) == 256
+    with executor_cls(max_workers=4) as map_executor:
+        par_net = structure.srcdata2network(
+            net_desc, "v1", *mappers, executor=map_executor, chunk_size=chunk_size
+        )
+    assert par_net.model_dump() == seq_net.model_dump()
+    # Regions, neurons and connections are in the order of the descriptions
+    assert list(par_net.locations) == list(net_desc["locations"])
+    for rname, region in par_net.locations.items():
+        assert list(region.neurons) == list(seq_net.locations[rname].neurons)
+    assert list(par_net.connections) == list(net_desc["connections"])
+    assert [cx.name for cx in par_net.connections.values()] == list(
+        net_desc["connections"]
+    )
+    region4 = par_net.locations["VISp4"]
+    assert par_net.find_neuron("NVISp4_3") is region4.neurons["NVISp4_3"]
+    assert "NVISp4_1" not in region4.neurons
@@ -0,0 +1,171 @@
+import functools
+import pathlib
+
+import pytest
+
+from airavata_cerebrum.model import structure
+from airavata_cerebrum.util import io as cbmio
+
+V1L4_MOD = pathlib.Path(
+    __file__
+).parent.parent / "resources" / "notebooks" / "v1l4" / "description" / "custom_mod.json"
+
+
+@pytest.fixture
+def v1l4_net():
+    net_struct = structure.example_network()
+    net_struct.apply_mod(structure.Network.model_validate(cbmio.load(V1L4_MOD)))
+    return net_struct.populate_ncells(30000)
+
+
+def region_subsets(net_struct):
+    return [
+        structure.subset_network(net_struct, [rname])
+        for rname in net_struct.locations
+    ]
+
+
+def test_split_and_union(v1l4_net):
+    net_dump = v1l4_net.model_dump()
+    sub_nets = region_subsets(v1l4_net)
+    # V1L4 connections are between the neurons of VISp4
+    assert [len(snet.connections) for snet in sub_nets] == [
+        len(v1l4_net.connections) if rname == "VISp4" else 0
+        for rname in v1l4_net.locations
+    ]
+    net_union = functools.reduce(structure.union_network, sub_nets)
+    assert net_union.locations == v1l4_net.locations
+    assert list(net_union.locations) == list(v1l4_net.locations)
+    assert net_union.connections == v1l4_net.connections
+    # Regions and connections are shared with the input, which is unchanged
+    for rname, region in v1l4_net.locations.items():
+        assert net_union.locations[rname] is region
+    for cname, connect in v1l4_net.connections.items():
+        assert net_union.connections[cname] is connect
+    assert v1l4_net.model_dump() == net_dump
+
+
+def test_union_precedence(v1l4_net):
+    assert structure.union_network(v1l4_net, v1l4_net) is v1l4_net
+    net_dump = v1l4_net.model_dump()
+    added = structure.Neuron(name="Added", ei="e", fraction=0.5)
+    changed = structure.Neuron(ei="e", fraction=0.25)
+    mod_net = structure.Network(
+        name="mod",
+        locations={
+            "VISp4": structure.Region(
+                name="VISp4",
+                ncells=1,
+                neurons={"Added": added, "('4', 'Rorb')": changed},
+            ),
+            "VISp7": structure.Region(name="VISp7"),
+        },
+    )
+    net_union = structure.union_network(v1l4_net, mod_net)
+    region4 = net_union.locations["VISp4"]
+    # Values of the first network take precedence; new keys are added
+    assert region4.ncells == v1l4_net.locations["VISp4"].ncells
+    assert region4.neurons["Added"] is added
+    rorb = v1l4_net.locations["VISp4"].neurons["('4', 'Rorb')"]
+    assert region4.neurons["('4', 'Rorb')"] is rorb
+    assert net_union.locations["VISp7"] is mod_net.locations["VISp7"]
+    # Only the merged region is copied
+    assert region4 is not v1l4_net.locations["VISp4"]
+    assert net_union.locations["VISp1"] is v1l4_net.locations["VISp1"]
+    assert net_union.find_neuron("Added") is added
+    assert v1l4_net.model_dump() == net_dump
+    assert v1l4_net.find_neuron("Added") is None
+
+
+def test_join(v1l4_net):
+    sub_nets = region_subsets(v1l4_net)
+    bridge = structure.Connection(
+        name="bridge", pre=("1", "IT"), post=("4", "Rorb"), probability=0.1
+    )
+    net_join = structure.join_network(
+        sub_nets[0], sub_nets[2], connections={"bridge": bridge}
+    )
+    assert list(net_join.locations) == ["VISp1", "VISp4"]
+    assert net_join.locations["VISp1"] is v1l4_net.locations["VISp1"]
+    assert net_join.connections["bridge"] is bridge
+    assert "bridge" not in sub_nets[0].connections
+    assert net_join.find_connections(("1", "IT"), ("4", "Rorb")) == [bridge]
+    # Same struct in both is not a conflict
+    assert structure.join_network(sub_nets[2], sub_nets[2]) is sub_nets[2]
+
+
+def test_join_conflict(v1l4_net):
+    region_copy = v1l4_net.locations["VISp4"].model_copy()
+    other_net = structure.Network(name="other", locations={"VISp4": region_copy})
+    with pytest.raises(ValueError):
+        structure.join_network(v1l4_net, other_net)
+
+
+def test_filter_nodes(v1l4_net):
+    net_dump = v1l4_net.model_dump()
+    assert structure.filter_node_params(v1l4_net, lambda rx, nx, neuron: True) is (
+        v1l4_net
+    )
+    removed = "('4', 'Rorb')"
+    net_filter = structure.filter_node_params(
+        v1l4_net, lambda rname, nname, neuron: nname != removed
+    )
+    assert removed not in net_filter.locations["VISp4"].neurons
+    assert net_filter.find_neuron(removed) is None
+    # Connections to or from the removed neuron are dropped
+    dropped = [
+        cname
+        for cname, connect in v1l4_net.connections.items()
+        if structure.endpoint_key(connect.pre) == removed
+        or structure.endpoint_key(connect.post) == removed
+    ]
+    assert dropped
+    assert set(net_filter.connections) == set(v1l4_net.connections) - set(dropped)
+    for cname, connect in net_filter.connections.items():
+        assert connect is v1l4_net.connections[cname]
+    assert net_filter.locations["VISp1"] is v1l4_net.locations["VISp1"]
+    assert v1l4_net.model_dump() == net_dump
+
+
+def test_map_and_filter_edges(v1l4_net):
+    net_dump = v1l4_net.model_dump()
+    assert structure.map_edge_paramas(v1l4_net, lambda cx, connect: connect) is (
+        v1l4_net
+    )
+    assert structure.filter_edge_params(v1l4_net, lambda cx, connect: True) is (
+        v1l4_net
+    )
+    cname = next(iter(v1l4_net.connections))
+    net_map = structure.map_edge_paramas(
+        v1l4_net,
+        lambda cx, connect: (
+            connect.model_copy(update={"probability": 0.5}) if cx == cname else connect
+        ),
+    )
+    assert net_map.connections[cname].probability == 0.5
+    for cx, connect in v1l4_net.connections.items():
+        if cx != cname:
+            assert net_map.connections[cx] is connect
+    net_filter = structure.filter_edge_params(
+        v1l4_net, lambda cx, connect: cx != cname
+    )
+    assert cname not in net_filter.connections
+    assert len(net_filter.connections) == len(v1l4_net.connections) - 1
+    assert v1l4_net.model_dump() == net_dump
+
+
+def test_map_nodes(v1l4_net):
+    net_dump = v1l4_net.model_dump()
+    assert structure.map_node_paramas(v1l4_net, lambda rx, nx, neuron: neuron) is (
+        v1l4_net
+    )
+    net_map = structure.map_node_paramas(
+        v1l4_net,
+        lambda rname, nname, neuron: (
+            neuron.model_copy(update={"N": 1}) if rname == "VISp4" else neuron
+        ),
+    )
+    assert all(nx.N == 1 for nx in net_map.locations["VISp4"].neurons.values())
+    assert net_map.locations["VISp1"] is v1l4_net.locations["VISp1"]
+    assert net_map.find_neuron("('4', 'Rorb')").N == 1
+    assert v1l4_net.model_dump() == net_dump
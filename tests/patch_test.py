@@ -0,0 +1,130 @@
+import pathlib
+import random
+
+import pydantic
+import pytest
+
+from airavata_cerebrum.model import patch, structure
+from airavata_cerebrum.util import io as cbmio
+
+V1L4_MOD = pathlib.Path(
+    __file__
+).parent.parent / "resources" / "notebooks" / "v1l4" / "description" / "custom_mod.json"
+
+
+def v1l4_network() -> structure.Network:
+    net_struct = structure.example_network()
+    net_struct.apply_mod(structure.Network.model_validate(cbmio.load(V1L4_MOD)))
+    return net_struct
+
+
+def patched(net_struct, mod_obj):
+    net_struct = net_struct.model_copy(deep=True)
+    patch.apply_patch(net_struct, patch.mod_patch(net_struct, mod_obj))
+    return net_struct
+
+
+def modified(net_struct, mod_obj):
+    net_struct = net_struct.model_copy(deep=True)
+    if isinstance(mod_obj, dict):
+        mod_obj = type(net_struct).model_validate(mod_obj)
+    return net_struct.apply_mod(mod_obj.model_copy(deep=True))
+
+
+def struct_samples(struct_obj, samples):
+    # First struct of each type in the network, preferring ones with
+    # non-empty dicts of structs
+    struct_cls = type(struct_obj)
+    nested = patch.STRUCT_FIELDS.get(struct_cls, {})
+    if struct_cls not in samples or (
+        not all(getattr(samples[struct_cls], fx) for fx in nested)
+        and all(getattr(struct_obj, fx) for fx in nested)
+    ):
+        samples[struct_cls] = struct_obj
+    for field in nested:
+        for child in getattr(struct_obj, field).values():
+            struct_samples(child, samples)
+    return samples
+
+
+def field_values(value, rng):
+    # Values of the field in the modifications : empty, zero, current and
+    # changed values, and dicts with new, empty and changed keys
+    match value:
+        case bool():
+            return [value, not value]
+        case int() | float():
+            return [0, -1, value, type(value)(rng.randint(1, 100))]
+        case str():
+            return ["", value, value + "_mod"]
+        case tuple():
+            return [("", ""), (value[0], ""), value, ("1", "Mod")]
+        case dict() if value and isinstance(
+            next(iter(value.values())), pydantic.BaseModel
+        ):
+            # Existing and new structs
+            mkey, mstruct = next(iter(value.items()))
+            return [{}, {mkey: mstruct.model_dump()}, {"mod_key": mstruct.model_dump()}]
+        case dict():
+            cur_keys = list(value)
+            mod_dicts = [{}, {"mod_key": rng.random()}, {"mod_key": ""}]
+            if cur_keys:
+                mod_dicts.append({cur_keys[0]: ""})
+                mod_dicts.append({cur_keys[0]: rng.random(), "mod_key": 0})
+            return mod_dicts
+        case _:
+            return []
+
+
+def test_v1l4_mod():
+    net_struct = structure.example_network()
+    mod_data = cbmio.load(V1L4_MOD)
+    assert patched(net_struct, mod_data).model_dump() == modified(
+        net_struct, mod_data
+    ).model_dump()
+    # Patching again changes nothing
+    v1l4_net = v1l4_network()
+    assert patch.mod_patch(v1l4_net, mod_data) == []
+
+
+def test_invalid_mod():
+    net_struct = structure.example_network()
+    region = next(iter(net_struct.locations))
+    # Raised before the network is compared or changed
+    with pytest.raises(pydantic.ValidationError):
+        patch.mod_patch(net_struct, {"locations": {region: {"ncells": "many"}}})
+    # Values are coerced as by apply_mod : "10" is a positive count
+    mod_data = {"locations": {region: {"ncells": "10"}}}
+    assert patch.mod_patch(net_struct, mod_data) == [
+        patch.PatchOp(("locations", region, "ncells"), 10)
+    ]
+
+
+def test_mod_rules():
+    # Field-wise modifications of each struct type : the patch has the same
+    # effect as apply_mod, including for the fields apply_mod ignores
+    rng = random.Random(42)
+    samples = struct_samples(v1l4_network(), {})
+    assert set(samples) == set(patch.MOD_RULES)
+    for struct_cls, sample in samples.items():
+        sample_data = sample.model_dump()
+        for field in struct_cls.model_fields:
+            for fvalue in field_values(getattr(sample, field), rng):
+                try:
+                    mod_obj = struct_cls.model_validate(sample_data | {field: fvalue})
+                except pydantic.ValidationError:
+                    # Ex. ei is 'e' or 'i'
+                    continue
+                assert patched(sample, mod_obj).model_dump() == modified(
+                    sample, mod_obj
+                ).model_dump(), (struct_cls.__name__, field, fvalue)
+        # Modification with default values only
+        required = {
+            fx: sample_data[fx]
+            for fx, finfo in struct_cls.model_fields.items()
+            if finfo.is_required()
+        }
+        mod_obj = struct_cls.model_validate(required)
+        assert patched(sample, mod_obj).model_dump() == modified(
+            sample, mod_obj
+        ).model_dump(), struct_cls.__name__
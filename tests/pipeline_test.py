@@ -0,0 +1,106 @@
+import json
+import pathlib
+import typing
+
+import pytest
+
+from airavata_cerebrum.model import structure
+from airavata_cerebrum.model.desc import DescStages, ModelDescription
+from airavata_cerebrum.util.desc_config import CfgKeys, ModelDescConfig
+
+V1L4_DESC_DIR = pathlib.Path(
+    __file__
+).parent.parent / "resources" / "notebooks" / "v1l4" / "description"
+
+
+class StubDescription(ModelDescription):
+    # Stages with small outputs in place of the queries and the mapping;
+    # records the stages that were run
+    stage_log: typing.List[str] = []
+
+    def download_db_data(self):
+        self.stage_log.append(DescStages.DOWNLOAD)
+        self.keep_output({"src": [{"id": 1}, {"id": 2}]}, CfgKeys.DB_CONNECT)
+
+    def db_post_ops(self):
+        self.stage_log.append(DescStages.POST_OPS)
+        db_connect_data = self.take_output(CfgKeys.DB_CONNECT)
+        self.keep_output(dict(db_connect_data), CfgKeys.SRC_DATA)
+
+    def map_source_data(self):
+        self.stage_log.append(DescStages.MAP_SRC)
+        self.take_output(CfgKeys.SRC_DATA)
+        self.keep_output({"locations": {}, "connections": {}}, CfgKeys.DB2MODEL_MAP)
+
+    def build_net_struct(self):
+        self.stage_log.append(DescStages.NET_STRUCT)
+        self.take_output(CfgKeys.DB2MODEL_MAP)
+        self.network_struct = structure.example_network()
+        self.persist_output(self.network_struct.model_dump(), CfgKeys.NETWORK_MAPPED)
+
+    def apply_custom_mod(self):
+        self.stage_log.append(DescStages.CUSTOM_MOD)
+        self.network_struct.populate_ncells(30000)
+        self.persist_output(self.network_struct.model_dump(), CfgKeys.NETWORK_STRUCT)
+
+    def build_bmtk(self):
+        self.stage_log.append(DescStages.BMTK)
+        net_dir = self.config.network_dir
+        net_dir.mkdir(parents=True, exist_ok=True)
+        with open(pathlib.Path(net_dir, "nodes.json"), "w") as out_fptr:
+            json.dump({"ncells": self.network_struct.ncells}, out_fptr)
+
+
+@pytest.fixture
+def stub_desc(tmp_path):
+    return StubDescription(
+        config=ModelDescConfig(
+            name="v1l4",
+            base_dir=tmp_path,
+            config_files={CfgKeys.CONFIG: ["config.json"]},
+            config_dir=V1L4_DESC_DIR,
+            create_model_dir=True,
+        ),
+        region_mapper=structure.RegionMapper,
+        neuron_mapper=structure.NeuronMapper,
+        connection_mapper=structure.ConnectionMapper,
+        network_builder=object,
+        stage_log=[],
+    )
+
+
+def stages_after(stage: str) -> typing.List[str]:
+    return DescStages.ORDER[DescStages.ORDER.index(stage):]
+
+
+def test_up_to_date(stub_desc):
+    stub_desc.run_pipeline()
+    assert stub_desc.stage_log == DescStages.ORDER
+    stub_desc.stage_log.clear()
+    stage_runs = stub_desc.run_pipeline()
+    assert stub_desc.stage_log == []
+    assert not any(stage_runs.values())
+    stub_desc.run_pipeline(force=True)
+    assert stub_desc.stage_log == DescStages.ORDER
+
+
+def test_missing_output_reruns_downstream(stub_desc):
+    stub_desc.run_pipeline()
+    stub_desc.stage_log.clear()
+    stub_desc.output_location(CfgKeys.DB2MODEL_MAP).unlink()
+    stub_desc.run_pipeline()
+    assert stub_desc.stage_log == stages_after(DescStages.MAP_SRC)
+
+
+def test_edited_network_reruns_downstream(stub_desc):
+    stub_desc.run_pipeline()
+    stub_desc.stage_log.clear()
+    mapped_file = stub_desc.output_location(CfgKeys.NETWORK_MAPPED)
+    with open(mapped_file) as in_fptr:
+        net_data = json.load(in_fptr)
+    net_data["locations"]["VISp4"]["region_fraction"] = 0.5
+    with open(mapped_file, "w") as out_fptr:
+        json.dump(net_data, out_fptr)
+    stub_desc.run_pipeline()
+    assert stub_desc.stage_log == stages_after(DescStages.CUSTOM_MOD)
+    assert stub_desc.network_struct.locations["VISp4"].region_fraction == 0.5
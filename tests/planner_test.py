@@ -0,0 +1,134 @@
+import collections
+import typing
+
+import traitlets
+
+from airavata_cerebrum import base, planner, register, workflow
+from airavata_cerebrum.util.cache import StepCache
+from airavata_cerebrum.util.desc_config import CfgKeys
+
+
+class ScaleQuery(base.DbQuery):
+    # Scales its input; logs the scale of each run
+    run_log: typing.List[int] = []
+
+    def __init__(self, **params: typing.Any):
+        pass
+
+    def run(self, in_iter: typing.Iterable | None, **params: typing.Any):
+        ScaleQuery.run_log.append(params["scale"])
+        return [x * params["scale"] for x in in_iter or []]
+
+    @classmethod
+    def trait_type(cls) -> type[traitlets.HasTraits]:
+        return base.EmptyTraits
+
+
+register.QUERY_REGISTER.register([ScaleQuery])
+
+
+def scale_workflow(*scales: int) -> typing.Dict[str, typing.Any]:
+    return {
+        CfgKeys.WORKFLOW: [
+            {
+                "name": register.class_qual_name(ScaleQuery),
+                "type": "query",
+                "label": "Scale by {}".format(sx),
+                "init_params": {},
+                "exec_params": {"scale": sx},
+            }
+            for sx in scales
+        ]
+    }
+
+
+SOURCE_DATA = {"db1": [1, 2, 3], "db2": [10, 20]}
+
+# Workflows over db1 share the prefix [2]; the connection repeats the
+# workflow of neuron A
+DATA2MODEL_MAP = {
+    CfgKeys.LOCATIONS: {
+        "VISp1": {
+            "A": {
+                CfgKeys.SRC_DATA: {
+                    "db1": scale_workflow(2, 3),
+                    "db2": scale_workflow(5),
+                },
+                "property": "a",
+            },
+            "B": {CfgKeys.SRC_DATA: {"db1": scale_workflow(2, 7)}},
+        },
+        "VISp4": {
+            "C": {CfgKeys.SRC_DATA: {"db1": scale_workflow(2)}},
+            "D": {CfgKeys.SRC_DATA: {"db2": scale_workflow()}},
+        },
+    },
+    CfgKeys.CONNECTIONS: {
+        "A-B": {
+            CfgKeys.SRC_DATA: {"db1": scale_workflow(2, 3)},
+            "property": "ab",
+        },
+    },
+}
+
+
+def independent_map() -> typing.Dict[str, typing.Any]:
+    return {
+        CfgKeys.LOCATIONS: workflow.map_srcdata_locations(
+            SOURCE_DATA, DATA2MODEL_MAP[CfgKeys.LOCATIONS]
+        ),
+        CfgKeys.CONNECTIONS: workflow.map_srcdata_connections(
+            SOURCE_DATA, DATA2MODEL_MAP[CfgKeys.CONNECTIONS]
+        ),
+    }
+
+
+def test_plan():
+    wf_dag = planner.WorkflowDAG()
+    for neuron_dcfg in DATA2MODEL_MAP[CfgKeys.LOCATIONS]["VISp1"].values():
+        for src_db, op_desc in neuron_dcfg[CfgKeys.SRC_DATA].items():
+            wf_dag.add(src_db, op_desc[CfgKeys.WORKFLOW])
+    assert wf_dag.nsteps == 5
+    # Scale by 2 of db1 is shared
+    assert wf_dag.nunique() == 4
+    # Labels do not change the signature of the step
+    labeled = scale_workflow(2)[CfgKeys.WORKFLOW][0]
+    assert planner.step_signature(labeled) == planner.step_signature(
+        labeled | {"label": "other"}
+    )
+
+
+def test_map_srcdata():
+    ScaleQuery.run_log = []
+    expected = independent_map()
+    assert sorted(ScaleQuery.run_log) == [2, 2, 2, 2, 3, 3, 5, 7]
+    ScaleQuery.run_log = []
+    dag_map = planner.map_srcdata(SOURCE_DATA, DATA2MODEL_MAP)
+    # Outputs are the same as those of independent runs
+    assert dag_map == expected
+    assert dag_map[CfgKeys.LOCATIONS]["VISp1"]["A"] == {
+        "db1": [6, 12, 18],
+        "db2": [50, 100],
+        "property": "a",
+    }
+    assert dag_map[CfgKeys.LOCATIONS]["VISp4"]["D"] == {"db2": [10, 20]}
+    # Each unique step is run once : the shared prefix and the repeated
+    # workflow are not run again
+    assert collections.Counter(ScaleQuery.run_log) == {2: 1, 3: 1, 5: 1, 7: 1}
+    # Fanned out outputs are separate lists
+    a_out = dag_map[CfgKeys.LOCATIONS]["VISp1"]["A"]["db1"]
+    assert a_out is not dag_map[CfgKeys.CONNECTIONS]["A-B"]["db1"]
+    # Source data is unchanged
+    assert SOURCE_DATA == {"db1": [1, 2, 3], "db2": [10, 20]}
+
+
+def test_map_srcdata_cached(tmp_path):
+    wf_ctx = workflow.WorkflowContext(step_cache=StepCache(tmp_path))
+    expected = independent_map()
+    ScaleQuery.run_log = []
+    assert planner.map_srcdata(SOURCE_DATA, DATA2MODEL_MAP, wf_ctx) == expected
+    assert len(ScaleQuery.run_log) == 4
+    # Second evaluation is served by the step cache
+    ScaleQuery.run_log = []
+    assert planner.map_srcdata(SOURCE_DATA, DATA2MODEL_MAP, wf_ctx) == expected
+    assert ScaleQuery.run_log == []
@@ -0,0 +1,136 @@
+import concurrent.futures
+import copy
+import threading
+import time
+
+import pytest
+import traitlets
+
+from airavata_cerebrum import base, register
+from airavata_cerebrum.util.policy import (
+    CancelToken,
+    StepPolicy,
+    StepTimeout,
+    WorkflowCancelled,
+    call_with_timeout,
+)
+from airavata_cerebrum.workflow import run_workflow
+
+
+def cancel_after(cancel_token: CancelToken, delay: float) -> threading.Timer:
+    cancel_timer = threading.Timer(delay, cancel_token.cancel)
+    cancel_timer.start()
+    return cancel_timer
+
+
+def test_timeout():
+    with pytest.raises(StepTimeout):
+        call_with_timeout(lambda: time.sleep(1.0), 0.1)
+    assert call_with_timeout(lambda: 42, 1.0) == 42
+
+
+def test_retries():
+    ncalls = []
+
+    def flaky_call():
+        ncalls.append(1)
+        if len(ncalls) < 3:
+            raise ValueError("Flaky")
+        return len(ncalls)
+
+    assert StepPolicy(retries=2, backoff=0.01).call(flaky_call, "flaky") == 3
+    ncalls.clear()
+    with pytest.raises(ValueError):
+        StepPolicy(retries=1, backoff=0.01).call(flaky_call, "flaky")
+
+
+def test_cancel_in_flight_call():
+    # Cancelling during a long call raises without waiting for the call
+    cancel_token = CancelToken()
+    cancel_after(cancel_token, 0.1)
+    start = time.monotonic()
+    with pytest.raises(WorkflowCancelled):
+        StepPolicy().call(lambda: time.sleep(5.0), "slow", None, cancel_token)
+    assert time.monotonic() - start < 1.0
+
+
+def test_cancel_during_backoff():
+    cancel_token = CancelToken()
+    cancel_after(cancel_token, 0.1)
+
+    def failing_call():
+        raise ValueError("Failed")
+
+    start = time.monotonic()
+    with pytest.raises(WorkflowCancelled):
+        StepPolicy(retries=3, backoff=5.0).call(
+            failing_call, "failing", None, cancel_token
+        )
+    assert time.monotonic() - start < 1.0
+
+
+def test_copies_share_state():
+    cancel_token = CancelToken()
+    assert copy.deepcopy(cancel_token) is cancel_token
+
+
+def wait_cancelled(cancel_token: CancelToken, timeout: float) -> bool:
+    return cancel_token.wait(timeout)
+
+
+def test_cancel_worker_process():
+    cancel_token = CancelToken()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=1) as executor:
+        wait_future = executor.submit(wait_cancelled, cancel_token, 10.0)
+        time.sleep(0.5)
+        start = time.monotonic()
+        cancel_token.cancel()
+        assert wait_future.result(timeout=5.0)
+        assert time.monotonic() - start < 2.0
+
+
+class FlakyQuery(base.DbQuery):
+    # Drops empty items; the first call of each item in flaky_items fails
+    flaky_items = set()
+    calls = []
+
+    def __init__(self, **params):
+        pass
+
+    def run(self, in_iter, **params):
+        for x in in_iter or []:
+            FlakyQuery.calls.append(x)
+            if x in FlakyQuery.flaky_items:
+                FlakyQuery.flaky_items.discard(x)
+                raise ValueError("Flaky item {}".format(x))
+            if x:
+                yield x * 10
+
+    @classmethod
+    def trait_type(cls) -> type[traitlets.HasTraits]:
+        return base.EmptyTraits
+
+    @classmethod
+    def per_item(cls) -> bool:
+        return True
+
+
+register.QUERY_REGISTER.register([FlakyQuery])
+
+
+def test_per_item_retries():
+    # Only the failed item is retried, and dropped items are not output
+    FlakyQuery.flaky_items = {3}
+    FlakyQuery.calls = []
+    wf_step = {
+        "name": register.class_qual_name(FlakyQuery),
+        "type": "query",
+        "init_params": {},
+        "exec_params": {},
+        "policy": {"retries": 1, "backoff": 0.01},
+    }
+    assert not FlakyQuery.item_wise()
+    assert list(run_workflow([wf_step], [1, 0, 2, None, 3, 4])) == [
+        10, 20, 30, 40
+    ]
+    assert FlakyQuery.calls == [1, 0, 2, None, 3, 3, 4]
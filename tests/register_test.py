@@ -0,0 +1,81 @@
+import json
+import pathlib
+import subprocess
+import sys
+import threading
+import time
+
+from airavata_cerebrum.register import InstancePool
+
+
+class SlowInit:
+    ninits = 0
+
+    def __init__(self, delay: float = 0.0):
+        SlowInit.ninits += 1
+        time.sleep(delay)
+        self.delay = delay
+
+
+def test_pool_shares_instances():
+    pool = InstancePool(max_size=2)
+    first = pool.get("slow", {"delay": 0.0}, SlowInit)
+    assert pool.get("slow", {"delay": 0.0}, SlowInit) is first
+    pool.get("slow", {"delay": 0.001}, SlowInit)
+    pool.get("slow", {"delay": 0.002}, SlowInit)
+    # Least recently used instance is evicted
+    assert len(pool) == 2
+    assert pool.get("slow", {"delay": 0.0}, SlowInit) is not first
+
+
+def test_slow_init_does_not_block_other_keys():
+    pool = InstancePool()
+    pool.get("slow", {"delay": 0.0}, SlowInit)
+    SlowInit.ninits = 0
+    slow_instances = []
+
+    def get_slow():
+        slow_instances.append(pool.get("slow", {"delay": 0.5}, SlowInit))
+
+    slow_threads = [threading.Thread(target=get_slow) for _ in range(4)]
+    for sthread in slow_threads:
+        sthread.start()
+    time.sleep(0.05)
+    # Pooled instances and other keys are available during the slow init
+    start = time.perf_counter()
+    pool.get("slow", {"delay": 0.0}, SlowInit)
+    pool.get("fast", {"delay": 0.0}, SlowInit)
+    assert time.perf_counter() - start < 0.25
+    for sthread in slow_threads:
+        sthread.join()
+    # Concurrent requests of a key construct a single instance
+    assert SlowInit.ninits == 2
+    assert all(sinst is slow_instances[0] for sinst in slow_instances)
+
+
+LAZY_IMPORT_CHECK = """
+import json, sys
+from airavata_cerebrum import register
+query_register = register.TypeRegister("query_register", register.base.DbQuery)
+xform_register = register.TypeRegister("xform_register", register.base.OpXFormer)
+import airavata_cerebrum.workflow
+imported = [mname for mname in register.REGISTER_MODULES if mname in sys.modules]
+xform_register.resolve("airavata_cerebrum.operations.xform.IdentityXformer")
+resolved = [mname for mname in register.REGISTER_MODULES if mname in sys.modules]
+print(json.dumps({"imported": imported, "resolved": resolved}))
+"""
+
+
+def test_register_imports_lazily():
+    # In a fresh interpreter : the modules may be imported by other tests
+    check_output = subprocess.run(
+        [sys.executable, "-c", LAZY_IMPORT_CHECK],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=pathlib.Path(__file__).parent.parent,
+    )
+    modules = json.loads(check_output.stdout.strip().splitlines()[-1])
+    assert modules["imported"] == []
+    # Resolving a key imports only the module of its class
+    assert modules["resolved"] == ["airavata_cerebrum.operations.xform"]
@@ -0,0 +1,79 @@
+import typing
+
+import traitlets
+
+from airavata_cerebrum import base, register
+from airavata_cerebrum.util.cache import StepCache
+from airavata_cerebrum.workflow import WorkflowContext, run_workflow
+
+
+class CountingQuery(base.DbQuery):
+    # Doubles its input; counts the calls of run
+    nruns = 0
+
+    def __init__(self, **params: typing.Any):
+        pass
+
+    def run(self, in_iter: typing.Iterable | None, **params: typing.Any):
+        CountingQuery.nruns += 1
+        return [x * params.get("scale", 2) for x in in_iter or []]
+
+    @classmethod
+    def trait_type(cls) -> type[traitlets.HasTraits]:
+        return base.EmptyTraits
+
+
+register.QUERY_REGISTER.register([CountingQuery])
+COUNTING_KEY = register.class_qual_name(CountingQuery)
+
+
+def counting_step(scale: int = 2) -> typing.Dict[str, typing.Any]:
+    return {
+        "name": COUNTING_KEY,
+        "type": "query",
+        "init_params": {},
+        "exec_params": {"scale": scale},
+    }
+
+
+def test_get_put(tmp_path):
+    step_cache = StepCache(tmp_path)
+    skey = step_cache.step_key("q", {"a": 1}, {"b": 2}, "in")
+    assert step_cache.get(skey) == (False, None)
+    step_cache.put(skey, [1, 2, 3])
+    assert step_cache.get(skey) == (True, [1, 2, 3])
+    # Keys depend on the params and the input
+    assert skey != step_cache.step_key("q", {"a": 1}, {"b": 3}, "in")
+    assert skey != step_cache.step_key("q", {"a": 1}, {"b": 2}, "other")
+
+
+def test_evict_least_recent(tmp_path):
+    step_cache = StepCache(tmp_path)
+    skeys = [step_cache.step_key("q", {}, {"x": sx}, "") for sx in range(3)]
+    step_cache.put(skeys[0], b"0" * 1000)
+    step_cache.put(skeys[1], b"1" * 1000)
+    entry_size = step_cache.entry_path(skeys[0]).stat().st_size
+    # Room for two entries; skeys[0] is read after skeys[1] is written
+    step_cache.max_bytes = 2 * entry_size
+    step_cache.get(skeys[0])
+    step_cache.put(skeys[2], b"2" * 1000)
+    assert step_cache.get(skeys[0])[0]
+    assert not step_cache.get(skeys[1])[0]
+    assert step_cache.get(skeys[2])[0]
+
+
+def test_workflow_replay(tmp_path):
+    wf_ctx = WorkflowContext(step_cache=StepCache(tmp_path))
+    steps = [counting_step(2), counting_step(3)]
+    CountingQuery.nruns = 0
+    assert run_workflow(steps, [1, 2], wf_ctx) == [6, 12]
+    assert CountingQuery.nruns == 2
+    # Replayed from the cache
+    assert run_workflow(steps, [1, 2], wf_ctx) == [6, 12]
+    assert CountingQuery.nruns == 2
+    # Changed params run the changed step and the steps after it
+    assert run_workflow([counting_step(2), counting_step(4)], [1, 2], wf_ctx) == [8, 16]
+    assert CountingQuery.nruns == 3
+    # Changed input runs all the steps
+    assert run_workflow(steps, [1, 3], wf_ctx) == [6, 18]
+    assert CountingQuery.nruns == 5
@@ -0,0 +1,166 @@
+import json
+import typing
+
+import pytest
+import traitlets
+
+from airavata_cerebrum import base, register
+from airavata_cerebrum.util import io as cbmio
+from airavata_cerebrum.util.desc_config import CfgKeys
+from airavata_cerebrum.workflow import (
+    run_db_connect_workflows,
+    run_ops_workflows,
+    stream_db_connect_workflows,
+    stream_ops_workflows,
+)
+
+
+class SourceQuery(base.DbQuery):
+    # Records with nested values for the given ids
+    def __init__(self, **params: typing.Any):
+        pass
+
+    def run(self, in_iter: typing.Iterable | None, **params: typing.Any):
+        for x in params["ids"]:
+            yield {"id": x, "name": "n{}".format(x), "dims": {"x": [x, x + 1]}}
+
+    @classmethod
+    def trait_type(cls) -> type[traitlets.HasTraits]:
+        return base.EmptyTraits
+
+
+class ScaleQuery(base.DbQuery):
+    # Scales the ids of the records; fails at the id fail_at, if set
+    fail_at = None
+
+    def __init__(self, **params: typing.Any):
+        pass
+
+    def run(self, in_iter: typing.Iterable | None, **params: typing.Any):
+        for rcd in in_iter or []:
+            if rcd["id"] == ScaleQuery.fail_at:
+                raise RuntimeError("Failed at id {}".format(rcd["id"]))
+            yield rcd | {"id": rcd["id"] * params["scale"]}
+
+    @classmethod
+    def trait_type(cls) -> type[traitlets.HasTraits]:
+        return base.EmptyTraits
+
+
+register.QUERY_REGISTER.register([SourceQuery, ScaleQuery])
+
+
+def query_step(query_cls: type, **exec_params: typing.Any) -> typing.Dict:
+    return {
+        "name": register.class_qual_name(query_cls),
+        "type": "query",
+        "init_params": {},
+        "exec_params": exec_params,
+    }
+
+
+def db_config(nids: typing.Dict[str, int]) -> typing.Dict[str, typing.Any]:
+    return {
+        db_name: {
+            CfgKeys.DB_CONNECT: {
+                CfgKeys.WORKFLOW: [
+                    query_step(SourceQuery, ids=list(range(nx))),
+                    query_step(ScaleQuery, scale=2),
+                    query_step(ScaleQuery, scale=3),
+                ]
+            },
+            CfgKeys.POST_OPS: {
+                CfgKeys.WORKFLOW: [query_step(ScaleQuery, scale=5)]
+            },
+        }
+        for db_name, nx in nids.items()
+    }
+
+
+@pytest.mark.parametrize("window", [1, 3, 64])
+@pytest.mark.parametrize(
+    "out_data",
+    [
+        {},
+        {"a": []},
+        {"a": [], "b": [1]},
+        {"a": [{"x": {}, "y": []}, [1, [2, {"z": "w"}]], "s", None, 1.5]},
+        {"a": list(range(7)), "b": [{"k": [x]} for x in range(7)], "c": []},
+    ],
+)
+def test_dump_json_stream(tmp_path, out_data, window):
+    for indent in [0, 4]:
+        json_file = tmp_path / "dump.json"
+        stream_file = tmp_path / "stream.json"
+        cbmio.dump_json(out_data, json_file, indent=indent)
+        cbmio.dump_json_stream(
+            ((kx, iter(vx)) for kx, vx in out_data.items()),
+            stream_file,
+            indent=indent,
+            window=window,
+        )
+        assert stream_file.read_bytes() == json_file.read_bytes()
+        assert not (tmp_path / "stream.json.part").exists()
+
+
+def test_stream_workflows(tmp_path):
+    ScaleQuery.fail_at = None
+    src_config = db_config({"db1": 5, "db2": 0, "db3": 130})
+    # Connect and post ops outputs are the same as those of the run_*
+    # functions, which are written by dump_json
+    db_output = run_db_connect_workflows(src_config)
+    assert [len(vx) for vx in db_output.values()] == [5, 0, 130]
+    cbmio.dump_json(db_output, tmp_path / "db.json", indent=4)
+    cbmio.dump_stream(
+        stream_db_connect_workflows(src_config),
+        tmp_path / "db_stream.json",
+        indent=4,
+        window=16,
+    )
+    assert (tmp_path / "db_stream.json").read_bytes() == (
+        tmp_path / "db.json"
+    ).read_bytes()
+    ops_output = run_ops_workflows(db_output, src_config, CfgKeys.POST_OPS)
+    cbmio.dump_json(ops_output, tmp_path / "ops.json", indent=4)
+    cbmio.dump_stream(
+        stream_ops_workflows(db_output, src_config, CfgKeys.POST_OPS),
+        tmp_path / "ops_stream.json",
+        indent=4,
+        window=16,
+    )
+    assert (tmp_path / "ops_stream.json").read_bytes() == (
+        tmp_path / "ops.json"
+    ).read_bytes()
+    assert cbmio.load(tmp_path / "ops_stream.json") == ops_output
+
+
+def test_stream_failure(tmp_path):
+    src_config = db_config({"db1": 5, "db2": 100})
+    out_file = tmp_path / "db_stream.json"
+    part_file = tmp_path / "db_stream.json.part"
+    ScaleQuery.fail_at = None
+    cbmio.dump_stream(
+        stream_db_connect_workflows(src_config), out_file, indent=4, window=16
+    )
+    prev_bytes = out_file.read_bytes()
+    # Failure in a step of the second database : the previous output is
+    # unchanged and the .part file has the output until the failure
+    ScaleQuery.fail_at = 41
+    with pytest.raises(RuntimeError):
+        cbmio.dump_stream(
+            stream_db_connect_workflows(src_config), out_file, indent=4, window=16
+        )
+    assert out_file.read_bytes() == prev_bytes
+    part_text = part_file.read_text()
+    with pytest.raises(json.JSONDecodeError):
+        json.loads(part_text)
+    # Items of db1 and the complete windows of db2 before the failure
+    assert part_text.startswith(prev_bytes.decode()[:prev_bytes.index(b'"db2"')])
+    assert part_text.count('"id"') == 5 + 32
+    # A successful run replaces the output and removes the .part file
+    ScaleQuery.fail_at = None
+    cbmio.dump_stream(
+        stream_db_connect_workflows(src_config), out_file, indent=4, window=16
+    )
+    assert out_file.read_bytes() == prev_bytes
+    assert not part_file.exists()
@@ -0,0 +1,131 @@
+import json
+import pathlib
+import typing
+
+import pytest
+
+from airavata_cerebrum.model import structure, sweep
+from airavata_cerebrum.model.desc import DescStages, ModelDescription
+from airavata_cerebrum.util import class_qual_name
+from airavata_cerebrum.util.desc_config import CfgKeys, ModelDescConfig
+
+V1L4_DESC_DIR = pathlib.Path(
+    __file__
+).parent.parent / "resources" / "notebooks" / "v1l4" / "description"
+
+
+class SweepDescription(ModelDescription):
+    # Stages with small outputs in place of the queries and the mapping;
+    # records the stages that were run (the log is shared by the variants)
+    stage_log: typing.List[str] = []
+
+    def download_db_data(self):
+        self.stage_log.append(DescStages.DOWNLOAD)
+        self.keep_output({"src": [{"id": 1}, {"id": 2}]}, CfgKeys.DB_CONNECT)
+
+    def db_post_ops(self):
+        self.stage_log.append(DescStages.POST_OPS)
+        db_connect_data = self.take_output(CfgKeys.DB_CONNECT)
+        self.keep_output(dict(db_connect_data), CfgKeys.SRC_DATA)
+
+    def map_source_data(self):
+        self.stage_log.append(DescStages.MAP_SRC)
+        src_data = self.take_output(CfgKeys.SRC_DATA)
+        self.keep_output(
+            {"ids": [x["id"] for x in src_data["src"]]}, CfgKeys.DB2MODEL_MAP
+        )
+
+    def build_net_struct(self):
+        self.stage_log.append(DescStages.NET_STRUCT)
+        map_data = self.take_output(CfgKeys.DB2MODEL_MAP)
+        # Stages modify their inputs
+        map_data["ids"].append(3)
+        self.network_struct = structure.example_network()
+        self.network_struct.dims = {
+            "ids": map_data["ids"],
+            "mapper": class_qual_name(self.neuron_mapper),
+        }
+        self.persist_output(self.network_struct.model_dump(), CfgKeys.NETWORK_MAPPED)
+
+    def apply_custom_mod(self):
+        self.stage_log.append(DescStages.CUSTOM_MOD)
+        return super().apply_custom_mod()
+
+    def build_bmtk(self):
+        self.stage_log.append(DescStages.BMTK)
+        net_dir = self.config.network_dir
+        net_dir.mkdir(parents=True, exist_ok=True)
+        with open(pathlib.Path(net_dir, "nodes.json"), "w") as out_fptr:
+            json.dump({"ncells": self.network_struct.ncells}, out_fptr)
+
+
+class OtherNeuronMapper(structure.NeuronMapper):
+    pass
+
+
+def sweep_desc(base_dir: pathlib.Path) -> SweepDescription:
+    return SweepDescription(
+        config=ModelDescConfig(
+            name="v1l4",
+            base_dir=base_dir,
+            config_files={CfgKeys.CONFIG: ["config.json"]},
+            config_dir=V1L4_DESC_DIR,
+            create_model_dir=True,
+        ),
+        region_mapper=structure.RegionMapper,
+        neuron_mapper=structure.NeuronMapper,
+        connection_mapper=structure.ConnectionMapper,
+        network_builder=object,
+        stage_log=[],
+    )
+
+
+def write_mods(tmp_path: pathlib.Path) -> typing.List[pathlib.Path]:
+    mod_files = []
+    for mx, fraction in enumerate([0.1, 0.2, 0.3]):
+        mod_file = tmp_path / "mod{}.json".format(mx)
+        mod_file.write_text(
+            json.dumps({"locations": {"VISp4": {"region_fraction": fraction}}})
+        )
+        mod_files.append(mod_file)
+    return mod_files
+
+
+@pytest.mark.parametrize("max_workers", [0, 2])
+@pytest.mark.parametrize("override_key", ["custom_mod", "neuron_mapper"])
+def test_sweep(tmp_path, override_key, max_workers):
+    if override_key == "custom_mod":
+        override_sets = [{"custom_mod": mfile} for mfile in write_mods(tmp_path)]
+        nshared = DescStages.ORDER.index(DescStages.CUSTOM_MOD)
+    else:
+        override_sets = [
+            {"neuron_mapper": structure.NeuronMapper},
+            {"neuron_mapper": OtherNeuronMapper},
+        ]
+        nshared = DescStages.ORDER.index(DescStages.NET_STRUCT)
+    base_desc = sweep_desc(tmp_path / "sweep")
+    var_descs = sweep.run_sweep(base_desc, override_sets, max_workers)
+    assert list(var_descs) == [
+        "v1l4_v{}".format(vx) for vx in range(len(override_sets))
+    ]
+    # The shared stages run once
+    shared = DescStages.ORDER[:nshared]
+    assert base_desc.stage_log[:nshared] == shared
+    if max_workers <= 0:
+        assert base_desc.stage_log[nshared:] == (
+            DescStages.ORDER[nshared:] * len(override_sets)
+        )
+    else:
+        # Variant stages ran in the worker processes
+        assert base_desc.stage_log == shared
+    var_dumps = [vdesc.network_struct.model_dump() for vdesc in var_descs.values()]
+    assert all(vdump != var_dumps[0] for vdump in var_dumps[1:])
+    # Variants are the same as independent runs
+    for vx, (vdesc, overrides) in enumerate(zip(var_descs.values(), override_sets)):
+        single_desc = sweep_desc(tmp_path / "single{}".format(vx)).model_copy(
+            update=overrides
+        )
+        sweep.run_stages(single_desc, DescStages.ORDER)
+        assert single_desc.stage_log == DescStages.ORDER
+        assert var_dumps[vx] == single_desc.network_struct.model_dump()
+        assert vdesc.network_struct.dims["ids"] == [1, 2, 3]
@@ -0,0 +1,47 @@
+import threading
+import time
+
+from airavata_cerebrum.util.trace import Tracer
+
+
+def test_nested_span_excludes_inner():
+    tracer = Tracer()
+    outer = tracer.new_trace("outer", "outer", "xform")
+    inner = tracer.new_trace("inner", "inner", "xform")
+    with tracer.span(outer):
+        with tracer.span(inner):
+            time.sleep(0.05)
+    assert inner.wall >= 0.05
+    assert outer.wall < 0.05
+
+
+def test_thread_spans_do_not_interleave():
+    # Spans opened in other threads are not nested in the open span of the
+    # main thread, and do not reduce its time
+    tracer = Tracer()
+    main_trace = tracer.new_trace("main", "main", "xform")
+    thread_traces = [
+        tracer.new_trace("t{}".format(tx), "t", "query") for tx in range(4)
+    ]
+    barrier = threading.Barrier(len(thread_traces) + 1)
+
+    def run_span(trace):
+        with tracer.span(trace):
+            barrier.wait()
+            time.sleep(0.05)
+
+    with tracer.span(main_trace):
+        workers = [
+            threading.Thread(target=run_span, args=(trace,))
+            for trace in thread_traces
+        ]
+        for worker in workers:
+            worker.start()
+        barrier.wait()
+        for worker in workers:
+            worker.join()
+    assert main_trace.wall >= 0.05
+    for trace in thread_traces:
+        assert trace.wall >= 0.05
+    assert len(set(trace.tid for trace in thread_traces)) == len(thread_traces)
+    assert tracer.span_stack() == []